@@ -21,6 +21,7 @@ import time
 from threading import Lock
 
 import redis
+from redisConnections.redis_pool import get_redis
 from utility import log
 from utility.create_config import create_config
 
@@ -76,9 +77,7 @@ class YangCatalogApiGlobalConfig():
         self.LOGGER = log.get_logger('api.yc_gc', '{}/yang.log'.format(self.logs_dir))
 
         self.LOGGER.info('yangcatalog configuration reloaded')
-        self.redis = redis.Redis(
-            host=self.redis_host,
-            port=self.redis_port)  # pyright: ignore
+        self.redis: redis.Redis = get_redis(config=config)
         self.check_wait_redis_connected()
 
     def check_wait_redis_connected(self):
@@ -0,0 +1,185 @@
+# Copyright The IETF Trust 2022, All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Per-worker decoded copy of the modules-data aggregate stored in Redis.
+Decoding the whole aggregate is expensive, so each API worker keeps the decoded
+modules in memory and only reloads them once the generation counter stored
+in Redis next to the aggregate changes.
+Together with the decoded modules, an inverted index over the most often searched
+module leafs is built, so exact and partial match searches do not need to scan the whole catalog.
+"""
+
+__copyright__ = 'Copyright The IETF Trust 2022, All Rights Reserved'
+__license__ = 'Apache License, Version 2.0'
+
+import threading
+import typing as t
+from dataclasses import dataclass, field
+
+from redisConnections.redisConnection import RedisConnection
+
+
+# Paths of the module leafs which are indexed, nested containers and lists are separated by '/'
+INDEXED_PATHS = (
+    'ietf/ietf-wg', 'maturity-level', 'document-name', 'author-email', 'compilation-status', 'namespace',
+    'conformance-type', 'module-type', 'organization', 'yang-version', 'name', 'revision', 'tree-type',
+    'belongs-to', 'generated-from', 'expires', 'expired', 'prefix', 'reference',
+    'dependencies/name', 'dependents/name', 'submodule/name',
+    'implementations/implementation/vendor', 'implementations/implementation/platform',
+    'implementations/implementation/software-version', 'implementations/implementation/software-flavor',
+    'implementations/implementation/os-type', 'implementations/implementation/os-version',
+    'implementations/implementation/feature-set', 'implementations/implementation/conformance-type'
+)
+TRIGRAM_LENGTH = 3
+
+
+def _leaf_values(data, path: t.Sequence[str]) -> t.Iterator[str]:
+    """ Yield all the string values found in 'data' under the 'path'. Lists on the way are searched through. """
+    if isinstance(data, list):
+        for item in data:
+            yield from _leaf_values(item, path)
+    elif not path:
+        if isinstance(data, str):
+            yield data
+    elif isinstance(data, dict):
+        yield from _leaf_values(data.get(path[0]), path[1:])
+
+
+def _trigrams(value: str) -> t.Set[str]:
+    return {value[i:i + TRIGRAM_LENGTH] for i in range(len(value) - TRIGRAM_LENGTH + 1)}
+
+
+class ModulesIndex:
+    """ Inverted index mapping value of each indexed leaf to the positions of the modules containing it.
+    Positions are indexes to the list of modules the index was built from,
+    so results can be returned in the same order as the modules are stored.
+    """
+
+    def __init__(self, modules: t.List[dict]):
+        self._terms: t.Dict[str, t.Dict[str, t.Set[int]]] = {path: {} for path in INDEXED_PATHS}
+        self._trigrams: t.Dict[str, t.Dict[str, t.Set[str]]] = {}
+        self._lock = threading.Lock()
+        for position, module in enumerate(modules):
+            for path, terms in self._terms.items():
+                for value in _leaf_values(module, path.split('/')):
+                    terms.setdefault(value, set()).add(position)
+
+    def is_indexed(self, path: str) -> bool:
+        return path in self._terms
+
+    def lookup(self, path: str, value: str, partial: bool = False) -> t.Set[int]:
+        """ Return positions of the modules which contain 'value' in the leaf on the 'path'.
+
+        Arguments:
+            :param path     (str) indexed path of the leaf
+            :param value    (str) searched value
+            :param partial  (bool) whether the leaf value only needs to contain searched value
+            :return         (set) positions of the matching modules
+        """
+        terms = self._terms[path]
+        if not partial:
+            return set(terms.get(value, ()))
+        if len(value) < TRIGRAM_LENGTH:
+            candidates = terms.keys()
+        else:
+            trigrams = self._get_trigrams(path)
+            candidates = set.intersection(*(trigrams.get(trigram, set()) for trigram in _trigrams(value)))
+        positions = set()
+        for term in candidates:
+            if value in term:
+                positions.update(terms[term])
+        return positions
+
+    def candidates(self, body: dict, partial: bool = False) -> t.Optional[t.Set[int]]:
+        """ Return positions of the modules which can match the search-filter 'body'.
+        Each indexed leaf of the body is a necessary condition, so intersection of their lookups
+        is a superset of the matching modules which still needs to be checked.
+        None is returned if the body does not contain any indexed leaf.
+        """
+        result = None
+        for path, value in self._body_leafs(body):
+            if not self.is_indexed(path):
+                continue
+            positions = self.lookup(path, value, partial)
+            result = positions if result is None else result & positions
+            if not result:
+                break
+        return result
+
+    def _body_leafs(self, data, path: str = '') -> t.Iterator[t.Tuple[str, str]]:
+        if isinstance(data, str):
+            yield path, data
+        elif isinstance(data, list):
+            for item in data:
+                yield from self._body_leafs(item, path)
+        elif isinstance(data, dict):
+            for key, value in data.items():
+                yield from self._body_leafs(value, '{}/{}'.format(path, key) if path else key)
+
+    def _get_trigrams(self, path: str) -> t.Dict[str, t.Set[str]]:
+        """ Trigram index of the terms is built lazily, only for the paths which are searched partially. """
+        trigrams = self._trigrams.get(path)
+        if trigrams is not None:
+            return trigrams
+        with self._lock:
+            trigrams = self._trigrams.get(path)
+            if trigrams is None:
+                trigrams = {}
+                for term in self._terms[path]:
+                    for trigram in _trigrams(term):
+                        trigrams.setdefault(trigram, set()).add(term)
+                self._trigrams[path] = trigrams
+        return trigrams
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    generation: t.Optional[int] = None
+    modules: t.List[dict] = field(default_factory=list)
+    index: ModulesIndex = field(default_factory=lambda: ModulesIndex([]))
+
+
+class ModulesCatalog:
+
+    def __init__(self, redis_connection: RedisConnection):
+        self._redis_connection = redis_connection
+        self._lock = threading.Lock()
+        self._snapshot = CatalogSnapshot()
+
+    def modules(self) -> t.List[dict]:
+        """ Return list of all the modules stored in the modules-data aggregate.
+        Returned modules are shared by all the requests served by this worker, so they must not be modified.
+        """
+        return self.snapshot().modules
+
+    def snapshot(self) -> CatalogSnapshot:
+        """ Return current snapshot of the catalog, reload it first if it is out of date. """
+        generation = self._redis_connection.get_modules_data_generation()
+        snapshot = self._snapshot
+        if generation is not None and generation == snapshot.generation:
+            return snapshot
+        return self.refresh()
+
+    def refresh(self) -> CatalogSnapshot:
+        """ Load and decode the modules-data aggregate from Redis and atomically swap the snapshot.
+        Concurrent callers wait for a single reload instead of decoding the aggregate several times.
+        """
+        with self._lock:
+            generation = self._redis_connection.get_modules_data_generation()
+            if generation is not None and generation == self._snapshot.generation:
+                return self._snapshot
+            modules_list = list(self._redis_connection.get_modules_data().values())
+            self._snapshot = CatalogSnapshot(generation, modules_list, ModulesIndex(modules_list))
+            return self._snapshot
@@ -19,8 +19,13 @@ from werkzeug.exceptions import abort
 
 import api.authentication.auth as auth
 from api.matomo_tracker import MatomoTrackerData, get_headers_dict, record_analytic
+from api.modules_catalog import ModulesCatalog
+from api.rendered_output_cache import DEFAULT_MAX_ENTRIES, RenderedOutputCache
 from api.sender import Sender
 from elasticsearchIndexing.es_manager import ESManager
+from redisConnections.redis_pool import get_redis
+from redisConnections.redis_comparisons_connection import RedisComparisonsConnection
+from redisConnections.redis_search_cache_connection import RedisSearchCacheConnection
 from redisConnections.redisConnection import RedisConnection
 from redisConnections.redis_users_connection import RedisUsersConnection
 from utility.confdService import ConfdService
@@ -55,6 +60,16 @@ class MyFlask(Flask):
         self.secret_key = self.config.s_flask_secret_key
         self.confdService = ConfdService()
         self.redisConnection = RedisConnection()
+        self.modules_catalog = ModulesCatalog(self.redisConnection)
+        self.comparisons = RedisComparisonsConnection()
+        self.search_cache = RedisSearchCacheConnection()
+        config_parser = self.config.config_parser
+        self.rendered_output_cache = RenderedOutputCache(
+            config_parser.get('Directory-Section', 'rendered-output-cache',
+                              fallback=os.path.join(self.config.d_cache, 'rendered-output')),
+            int(config_parser.get('Directory-Section', 'rendered-output-cache-max-entries',
+                                  fallback=DEFAULT_MAX_ENTRIES))
+        )
 
     def load_config(self):
         self.init_config()
@@ -111,16 +126,14 @@ class MyFlask(Flask):
         )
 
         self.config['G-IS-PROD'] = self.config.g_is_prod == 'True'
-        self.config['REDIS'] = Redis(
-            host=self.config.db_redis_host,
-            port=self.config.db_redis_port
-        )
+        self.config['REDIS'] = get_redis(config=self.config.config_parser)
         self.config['REDIS-USERS'] = RedisUsersConnection()
         auth.users = self.config.redis_users
         self.check_wait_redis_connected()
 
     def check_wait_redis_connected(self):
-        while not self.config.redis.ping():
+        redis: Redis = self.config.redis
+        while not redis.ping():
             time.sleep(5)
             self.logger.info('Waiting 5 seconds for redis to start')
 
@@ -52,7 +52,8 @@ from redisConnections.redisConnection import RedisConnection, key_quote
 from utility import message_factory
 from utility.create_config import create_config
 from utility.staticVariables import json_headers
-from utility.util import prepare_for_es_removal, send_for_es_indexing
+from utility.util import (prepare_for_es_removal, send_for_es_indexing,
+                          update_modules_metadata_in_es)
 
 from api.status_message import StatusMessage
 
@@ -154,8 +155,7 @@ class Receiver:
             try:
                 name, revision, organization = mod_key.split(',')
                 redis_key = '{}@{}/{}'.format(name, revision, organization)
-                raw_data = self.redisConnection.get_module(redis_key)
-                modules_data = json.loads(raw_data)
+                modules_data = self.redisConnection.get_module_dict(redis_key)
                 implementations = modules_data.get('implementations', {}).get('implementation', [])
 
                 count_of_implementations = len(implementations)
@@ -202,10 +202,10 @@ class Receiver:
                             deleted_modules.append(redis_key)
             except Exception:
                 self.LOGGER.exception('YANG file {} doesn\'t exist although it should exist'.format(mod_key))
-        raw_all_modules = self.redisConnection.get_all_modules()
-        all_modules = json.loads(raw_all_modules)
+        all_modules = self.redisConnection.get_modules_data()
 
         # Delete dependets
+        updated_modules = set()
         for module_key in modules_keys:
             name, revision, organization = module_key.split(',')
             redis_key = '{}@{}/{}'.format(name, revision, organization)
@@ -217,7 +217,9 @@ class Receiver:
                             mod_key_redis = '{}@{}/{}'.format(existing_module['name'], existing_module['revision'],
                                                               existing_module['organization'])
                             # Delete module's dependent from Redis
-                            self.redisConnection.delete_dependent(mod_key_redis, dependent['name'])
+                            if self.redisConnection.delete_dependent(mod_key_redis, dependent['name']):
+                                updated_modules.add(mod_key_redis)
+        self._update_modules_metadata_in_es(updated_modules)
 
         # Delete vendor branch from Redis
         response = self.redisConnection.delete_vendor(redis_vendor_key)
@@ -229,6 +231,18 @@ class Receiver:
                 send_for_es_indexing(body_to_send, self.LOGGER, self.indexing_paths)
         return StatusMessage.SUCCESS
 
+    def _update_modules_metadata_in_es(self, redis_keys: t.Set[str]):
+        """Copy the changed dependents of the modules from Redis to their documents in Elasticsearch,
+        so that searching does not serve stale values until the modules are indexed again.
+
+        Argument:
+            :param redis_keys   (set) name@revision/organization keys of the modules with deleted dependents
+        """
+        try:
+            update_modules_metadata_in_es(self.redisConnection, redis_keys)
+        except Exception:
+            self.LOGGER.exception('Failed to update dependents of the modules in Elasticsearch')
+
     def iterate_in_depth(self, value: dict, modules_keys: t.Set[str]):
         """Iterates through the branch to get to the level with modules.
 
@@ -280,8 +294,7 @@ class Receiver:
         try:
             path_to_delete = arguments[3]
             modules = json.loads(path_to_delete)['modules']
-            all_modules_raw = self.redisConnection.get_all_modules()
-            all_modules = json.loads(all_modules_raw)
+            all_modules = self.redisConnection.get_modules_data()
         except Exception:
             self.LOGGER.exception('Problem while processing arguments')
             return StatusMessage.FAIL, 'Server error -> Unable to parse arguments'
@@ -326,6 +339,7 @@ class Receiver:
             else:
                 modules_not_deleted.append(mod_key)
 
+        updated_modules = set()
         for mod in modules_to_delete:
             for redis_key, existing_module in all_modules.items():
                 if existing_module.get('dependents') is not None:
@@ -333,7 +347,9 @@ class Receiver:
                     dependents_dict = ['{}@{}'.format(m['name'], m.get('revision', '')) for m in dependents]
                     searched_dependent = '{}@{}'.format(mod['name'], mod.get('revision', ''))
                     if searched_dependent in dependents_dict:
-                        self.redisConnection.delete_dependent(redis_key, mod['name'])
+                        if self.redisConnection.delete_dependent(redis_key, mod['name']):
+                            updated_modules.add(redis_key)
+        self._update_modules_metadata_in_es(updated_modules - set(redis_keys_to_delete))
         modules_to_index = []
         for mod_key, redis_key in zip(mod_keys_to_delete, redis_keys_to_delete):
 
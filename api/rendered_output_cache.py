@@ -0,0 +1,136 @@
+# Copyright The IETF Trust 2022, All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Content addressed on-disk cache of the outputs rendered from the yang files, e.g. yang trees.
+Outputs are stored under a key created from the hash of the yang file content, pyang version
+and name of the renderer, so a changed file or pyang upgrade never returns a stale output.
+The key is also used as the ETag of the response.
+Cache is shared by all the API workers, least recently used outputs are evicted once
+the number of stored outputs exceeds the configured maximum. The number is checked after each tenth
+of the maximum is stored by the worker, so the limit can be temporarily exceeded.
+"""
+
+__copyright__ = 'Copyright The IETF Trust 2022, All Rights Reserved'
+__license__ = 'Apache License, Version 2.0'
+
+import hashlib
+import os
+import threading
+import typing as t
+import uuid
+from collections import OrderedDict
+
+import pyang
+
+BLOCK_SIZE = 65536
+DEFAULT_MAX_ENTRIES = 5000
+FILE_HASHES_MEMO_SIZE = 10000
+
+
+class RenderedOutputCache:
+
+    def __init__(self, cache_dir: str, max_entries: int = DEFAULT_MAX_ENTRIES):
+        """
+        Arguments:
+            :param cache_dir    (str) directory where the rendered outputs are stored
+            :param max_entries  (int) maximum number of the stored outputs
+        """
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self._versions = 'pyang {}'.format(pyang.__version__)
+        # Hashes of the files are remembered by their path, modification time and size, so an unchanged file
+        # does not need to be read again
+        self._file_hashes: t.OrderedDict[t.Tuple[str, int, int], str] = OrderedDict()
+        self._lock = threading.Lock()
+        self._stored_since_eviction = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def key(self, renderer: str, path: str) -> t.Optional[str]:
+        """ Return key of the output rendered by 'renderer' from the file on 'path'.
+        None is returned if the file does not exist.
+        """
+        file_hash = self._hash_file(path)
+        if file_hash is None:
+            return None
+        return hashlib.sha256('{}\n{}\n{}'.format(renderer, self._versions, file_hash).encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> t.Optional[str]:
+        path = self._entry_path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                output = f.read()
+        except FileNotFoundError:
+            return None
+        try:
+            # Modification time is used to track recently used outputs
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        return output
+
+    def set(self, key: str, output: str):
+        path = self._entry_path(key)
+        temp_path = '{}.{}.tmp'.format(path, uuid.uuid4().hex)
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(output)
+        os.replace(temp_path, path)
+        with self._lock:
+            self._stored_since_eviction += 1
+            if self._stored_since_eviction < max(1, self.max_entries // 10):
+                return
+            self._stored_since_eviction = 0
+        self._evict()
+
+    def _evict(self):
+        """ Remove least recently used outputs if there are more than 'max_entries' of them.
+        A tenth of the maximum is removed at once, as the directory is only listed after each tenth
+        of the maximum is stored.
+        """
+        entries = [entry for entry in os.scandir(self.cache_dir) if entry.name.endswith('.html')]
+        if len(entries) <= self.max_entries:
+            return
+        entries.sort(key=lambda entry: entry.stat().st_mtime)
+        for entry in entries[:len(entries) - self.max_entries + self.max_entries // 10]:
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                pass
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, '{}.html'.format(key))
+
+    def _hash_file(self, path: str) -> t.Optional[str]:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        memo_key = (path, stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            file_hash = self._file_hashes.get(memo_key)
+            if file_hash is not None:
+                self._file_hashes.move_to_end(memo_key)
+                return file_hash
+        file_hash = hashlib.sha256()
+        try:
+            with open(path, 'rb') as f:
+                for block in iter(lambda: f.read(BLOCK_SIZE), b''):
+                    file_hash.update(block)
+        except FileNotFoundError:
+            return None
+        with self._lock:
+            self._file_hashes[memo_key] = file_hash.hexdigest()
+            if len(self._file_hashes) > FILE_HASHES_MEMO_SIZE:
+                self._file_hashes.popitem(last=False)
+        return file_hash.hexdigest()
@@ -128,7 +128,7 @@ def health_check_redis():
         result = ac.redis.ping()
         if result:
             bp.LOGGER.info('Redis ping responsed successfully')
-            response = {'info': 'Success'}
+            response = {'info': 'Success', 'search-cache': app.search_cache.stats()}
         else:
             bp.LOGGER.error('Redis ping failed to respond')
             response = {'error': 'Unable to ping Redis'}
@@ -333,8 +333,8 @@ def health_check_redis_admin():
 
     try:
         redis_key = 'yang-catalog@2018-04-03/ietf'
-        result = app.redisConnection.get_module(redis_key)
-        if result == '{}':
+        result = app.redisConnection.get_module_dict(redis_key)
+        if not result:
             response = {'info': 'Not OK - Redis is not filled',
                         'status': 'problem',
                         'message': 'Cannot get yang-catalog@2018-04-03/ietf'}
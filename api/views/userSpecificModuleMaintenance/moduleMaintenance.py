@@ -549,8 +549,7 @@ def get_user_access_rights(username: str, is_vendor: bool = False):
 
 def get_mod_redis(module: dict):
     redis_key = '{}@{}/{}'.format(module.get('name'), module.get('revision'), module.get('organization'))
-    redis_module = app.redisConnection.get_module(redis_key)
-    return json.loads(redis_module)
+    return app.redisConnection.get_module_dict(redis_key)
 
 
 def organization_by_namespace(namespace: str):
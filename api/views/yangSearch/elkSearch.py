@@ -17,16 +17,18 @@ __copyright__ = 'Copyright The IETF Trust 2021, All Rights Reserved'
 __license__ = 'Apache License, Version 2.0'
 __email__ = 'miroslav.kovac@pantheon.tech'
 
+import base64
+import hashlib
 import json
 import os
 import typing as t
 
 import gevent
-import gevent.queue
 from api.views.yangSearch.response_row import ResponseRow
 from api.views.yangSearch.search_params import SearchParams
-from elasticsearch import ConnectionTimeout
-from elasticsearchIndexing.es_manager import ESManager
+from elasticsearch import ConnectionTimeout, NotFoundError, TransportError
+from elasticsearchIndexing.es_manager import (LATEST_REVISION_FIELD,
+                                              ESManager, yindex_metadata)
 from elasticsearchIndexing.models.es_indices import ESIndices
 from redisConnections.redisConnection import RedisConnection
 from utility import log
@@ -34,6 +36,40 @@ from utility.staticVariables import OUTPUT_COLUMNS
 
 RESPONSE_SIZE = 2000
 RESERVED_CHARACTERS = ['"', '<']
+# Point in time is kept only for the time between two requests for the pages of a search
+PIT_KEEP_ALIVE = '1m'
+# Sub-search columns which can be checked by Elasticsearch, with the keyword fields holding their values
+SUBSEARCH_FIELDS = {
+    'module-name': 'module.keyword',
+    'organization': 'organization.keyword',
+    'schema-type': 'statement.keyword',
+    'maturity': 'maturity-level',
+    'compilation-status': 'compilation-status',
+}
+
+
+class InvalidContinuationToken(Exception):
+    """Continuation token of the search is malformed, of a different search or its search has expired."""
+
+
+class ModuleFields(t.NamedTuple):
+    """Module-level fields of the module stored in Redis, shared by all its search results."""
+    maturity: str
+    dependents: int
+    compilation_status: str
+    namespace: str
+    yang_version: t.Optional[str]
+
+    @classmethod
+    def from_metadata(cls, metadata: dict) -> 'ModuleFields':
+        """ Create the fields from the module-level fields as stored in index: yindex. """
+        return cls(
+            maturity=metadata['maturity-level'],
+            dependents=metadata['dependents'],
+            compilation_status=metadata['compilation-status'],
+            namespace=metadata['namespace'],
+            yang_version=metadata.get('yang-version'),
+        )
 
 
 class ElkSearch:
@@ -63,11 +99,15 @@ class ElkSearch:
         self._searched_term = searched_term
         self._es_manager = es_manager
         self._redis_connection = redis_connection
-        self._current_scroll_id = None
-        self._latest_revisions = {}
+        self._pit_id = None
+        # Sort values of the last hit processed by the search if there are more rows after it
+        self.search_after: t.Optional[list] = None
         self._remove_columns = list(set(OUTPUT_COLUMNS) - set(self._search_params.output_columns))
-        self._row_hashes = []
+        self._row_hashes: t.Set[str] = set()
+        self._reject: t.Set[str] = set()
+        self._modules: t.Dict[str, t.Optional[ModuleFields]] = {}
         self._missing_modules = []
+        self._subsearch_in_query = False
         self.timeout = False
         log_file_path = os.path.join(logs_dir, 'yang.log')
         self.LOGGER = log.get_logger('yc-elasticsearch', log_file_path)
@@ -94,8 +134,8 @@ class ElkSearch:
         all three may exist
         - lowercase may be changed with sensitive giving us an option to search for case sensitive text. If we
         use lowercase everything will be automatically put to lowercase and so we don't care about case sensitivity.
-        - aggs (or aggregations) are used to find latest revisions of a module if we are searching for latest
-        revisions only.
+        - filter contains the latest revision flag if we are searching for latest revisions only and the conditions
+        on yang versions, MIB modules and sub-search, see _construct_filter().
         This query looks as follows:
         {
           "query": {
@@ -119,22 +159,15 @@ class ElkSearch:
                     ]
                   }
                 }
-              ]
-            }
-          },
-          "aggs": {
-            "groupby": {
-              "terms": {
-                "field": "module.keyword",
-                "size": 2000
-              },
-              "aggs": {
-                "latest-revision": {
-                  "max": {
-                    "field": "revision"
+              ],
+              "filter": [
+                {
+                  "term": {
+                    "is-latest-revision": true
                   }
-                }
-              }
+                },
+                ...
+              ]
             }
           }
         }
@@ -158,70 +191,147 @@ class ElkSearch:
                 should_query[self._search_params.query_type][
                     '{}.{}'.format(searched_field, sensitive)] = self._searched_term
             search_in.append(should_query)
+        self.query['query']['bool']['filter'] = self._construct_filter()
         self.LOGGER.debug('Constructed query:\n{}'.format(self.query))
 
-    def search(self):
+    def _construct_filter(self) -> t.List[dict]:
         """
-        Search using query produced. This search is done in parallel. We are making two searches at the same time.
-        One search is being done as a scroll search. Elastic search does not allow us to get more then some number
-        of results per search. If we want to search through all the results we have to use scroll but this does not
-        give us an output of aggregations. That is why we have to create second normal search where we don t care about
-        finding of search but we get only get aggregations from response. These two searches may run in parallel.
+        Filter the hits by the latest revision flag and the module-level fields copied to the documents from Redis.
+        Sub-search is part of the filter only if all of its columns are stored as keywords.
+        Documents indexed before the module-level fields were added pass their conditions
+        and are checked with the data from Redis.
+        """
+        filters = [{'terms': {'yang-version': self._search_params.yang_versions}}]
+        if not self._search_params.include_mibs:
+            filters.append({'bool': {'must_not': {'wildcard': {'namespace': '*yang:smiv2:*'}}}})
+        sub_searches = self._search_params.sub_search
+        self._subsearch_in_query = all(
+            column in SUBSEARCH_FIELDS for sub_search in sub_searches for column in sub_search
+        )
+        if sub_searches and self._subsearch_in_query:
+            filters.append({
+                'bool': {
+                    'should': [{'bool': {'filter': _subsearch_conditions(sub_search)}} for sub_search in sub_searches],
+                    'minimum_should_match': 1
+                }
+            })
+        module_filter = {
+            'bool': {
+                'should': [
+                    {'bool': {'must_not': {'exists': {'field': 'compilation-status'}}}},
+                    {'bool': {'filter': filters}}
+                ],
+                'minimum_should_match': 1
+            }
+        }
+        if self._search_params.latest_revision:
+            return [{'term': {LATEST_REVISION_FIELD: True}}, module_filter]
+        return [module_filter]
 
-        Next we have to process the given response in self._process_hits definition. And while processing it we can
-        use scroll search to get next batch of result from search to process if it will be needed.
+    def search(self, page_size: int = RESPONSE_SIZE, continuation_token: t.Optional[str] = None):
+        """
+        Search using query produced. Hits are read in batches from a point in time of the index using search_after,
+        so the pages of the search are consistent and nothing is left in Elasticsearch after the point in time
+        expires, even if the search is abandoned. Latest revisions are flagged in the documents,
+        so only the matching hits are transferred.
 
-        :return list of rows containing dictionary that is filled with output for each column for yangcatalog search
+        Next we have to process the given batch in self._process_hits definition. And while processing it
+        the next batch is searched in parallel, if it will be needed.
+
+        Arguments:
+            :param page_size            (int) Maximum number of returned rows
+            :param continuation_token   (Optional[str]) Token returned with the previous page of the same search
+        :return tuple of the list of rows containing dictionary that is filled with output for each column
+            for yangcatalog search and the continuation token of the next page, None if there are no more rows
         """
-        hits = gevent.queue.JoinableQueue()
-        process_first_search = gevent.spawn(self._first_scroll, hits)
+        if continuation_token is None:
+            if not self._open_point_in_time():
+                return [], None
+            search_after = None
+        else:
+            search_after = self._decode_token(continuation_token)
+        response_rows = []
+        hits = self._search_after(search_after, page_size)
+        while hits:
+            next_search = None
+            if len(hits) == page_size:
+                next_search = gevent.spawn(self._search_after, hits[-1]['sort'], page_size)
+            processed = self._process_hits(hits, response_rows, page_size)
+            search_after = hits[processed - 1]['sort']
+            if len(response_rows) >= page_size:
+                self.LOGGER.debug('ElkSearch finished page with len {}'.format(len(response_rows)))
+                if next_search is not None:
+                    next_search.kill()
+                if processed < len(hits) or next_search is not None:
+                    self.search_after = search_after
+                    return response_rows, self._encode_token(search_after)
+                break
+            if next_search is None:
+                break
+            hits = next_search.get()
+        if self.timeout:
+            # Let the client continue after the last processed hit
+            self.search_after = search_after
+            return response_rows, self._encode_token(search_after)
+        self._es_manager.close_point_in_time(self._pit_id)
+        return response_rows, None
 
-        self.LOGGER.debug('Running first search in parallel')
-        if self._search_params.latest_revision:
-            self.LOGGER.debug('Processing aggregations search in parallel')
-            self._resolve_aggregations()
-            self.LOGGER.debug('Aggregations processed joining the search')
-        process_first_search.join()
-        hits = hits.get()
-        processed_rows = self._process_hits(hits, [])
-        if self._current_scroll_id is not None:
-            self._es_manager.clear_scroll(self._current_scroll_id)
-        return processed_rows, len(hits) == RESPONSE_SIZE
-
-    def _process_hits(self, hits: list, response_rows: list, reject=None):
-        if reject is None:
-            reject = []
-        if not hits:
-            return response_rows
-        secondary_hits = gevent.queue.JoinableQueue()
-        process_scroll_search = gevent.spawn(self._continue_scrolling, secondary_hits)
-        for hit in hits:
+    def continuation_token(self, search_after: t.Optional[list]) -> t.Optional[str]:
+        """ Return continuation token of the search after the hit with the sort values in a new point in time,
+        e.g. for the page of the search returned from a cache. None if the point in time could not be opened.
+        """
+        if not self._open_point_in_time():
+            return None
+        return self._encode_token(search_after)
+
+    def _open_point_in_time(self) -> bool:
+        try:
+            self._pit_id = self._es_manager.open_point_in_time(ESIndices.YINDEX, PIT_KEEP_ALIVE)
+        except TransportError:
+            # ConnectionTimeout included
+            self.LOGGER.exception('Error while opening point in time in Elasticsearch')
+            self.timeout = True
+            return False
+        return True
+
+    def _process_hits(self, hits: list, response_rows: list, page_size: int) -> int:
+        """ Add rows of the hits to the response rows until there is page_size of them.
+        Return the number of the processed hits.
+        """
+        rows = []
+        for position, hit in enumerate(hits):
             row = ResponseRow(elastic_hit=hit['_source'])
             module_key = '{}@{}/{}'.format(row.module_name, row.revision, row.organization)
-            if module_key in reject:
+            if module_key in self._reject:
                 continue
+            module = None
+            if 'compilation-status' in hit['_source']:
+                module = ModuleFields.from_metadata(hit['_source'])
+            rows.append((position, row, module_key, module))
+        self._load_modules({module_key for _, _, module_key, module in rows
+                            if module is None and module_key not in self._modules})
 
-            module_latest_revision = self._latest_revisions.get(row.module_name, '').replace('02-28', '02-29')
-            if self._search_params.latest_revision and row.revision != module_latest_revision:
-                reject.append(module_key)
+        for position, row, module_key, module in rows:
+            if module_key in self._reject:
                 continue
-
-            module_data = self._redis_connection.get_module(module_key)
-            module_data = json.loads(module_data)
-            if not module_data:
+            # Documents with the module-level fields were already filtered by Elasticsearch
+            filtered = module is not None
+            module = module or self._modules[module_key]
+            if module is None:
                 self.LOGGER.error('Failed to get module from Redis, but found in Elasticsearch: {}'.format(module_key))
-                reject.append(module_key)
+                self._reject.add(module_key)
                 self._missing_modules.append(module_key)
                 continue
-            row.maturity = module_data.get('maturity-level', '')
-            row.dependents = len(module_data.get('dependents', []))
-            row.compilation_status = module_data.get('compilation-status', 'unknown')
+            row.maturity = module.maturity
+            row.dependents = module.dependents
+            row.compilation_status = module.compilation_status
             row.create_representation()
 
-            if self._rejects_mibs_or_versions(module_key, reject, module_data):
+            if not filtered and self._rejects_mibs_or_versions(module_key, self._reject, module):
                 continue
 
-            if not row.meets_subsearch_condition(self._search_params.sub_search):
+            if not (filtered and self._subsearch_in_query) \
+                    and not row.meets_subsearch_condition(self._search_params.sub_search):
                 continue
 
             row.create_output(self._remove_columns)
@@ -232,66 +342,81 @@ class ElkSearch:
                         'Trimmed output row {} already exists in response rows - cutting this one out'
                         .format(row.output_row))
                     continue
-                self._row_hashes.append(row_hash)
+                self._row_hashes.add(row_hash)
             response_rows.append(row.output_row)
-            if len(response_rows) >= RESPONSE_SIZE or self._current_scroll_id is None:
-                self.LOGGER.debug('ElkSearch finished with len {} and scroll id {}'
-                                  .format(len(response_rows), self._current_scroll_id))
-                process_scroll_search.kill()
-                return response_rows
+            if len(response_rows) >= page_size:
+                return position + 1
+        return len(hits)
 
-        process_scroll_search.join()
-        return self._process_hits(secondary_hits.get(), response_rows, reject)
+    def _load_modules(self, module_keys: t.Set[str]):
+        """ Load module-level fields of the modules from Redis with a single request
+        and keep them for the rest of the search. None is kept for the modules missing in Redis.
+        """
+        if not module_keys:
+            return
+        module_keys = sorted(module_keys)
+        for module_key, module_data in zip(module_keys, self._redis_connection.get_modules(module_keys)):
+            if not module_data:
+                self._modules[module_key] = None
+                continue
+            self._modules[module_key] = ModuleFields.from_metadata(yindex_metadata(module_data))
 
-    def _first_scroll(self, hits):
-        elk_response = {}
+    def _search_after(self, search_after: t.Optional[list], size: int) -> list:
         try:
-            query_no_agg = self.query.copy()
-            query_no_agg.pop('aggs', '')
-            elk_response = self._es_manager.generic_search(ESIndices.YINDEX, query_no_agg,
-                                                           response_size=RESPONSE_SIZE, use_scroll=True)
+            elk_response = self._es_manager.point_in_time_search(self.query, self._pit_id, PIT_KEEP_ALIVE, size,
+                                                                 search_after)
         except ConnectionTimeout:
             self.LOGGER.exception('Error while searching in Elasticsearch')
-            elk_response['hits'] = {'hits': []}
             self.timeout = True
+            return []
+        except NotFoundError:
+            raise InvalidContinuationToken('Search expired, start it again without the continuation token')
+        self._pit_id = elk_response.get('pit_id', self._pit_id)
         self.LOGGER.debug('search complete with {} hits'.format(len(elk_response['hits']['hits'])))
-        self._current_scroll_id = elk_response.get('_scroll_id')
-        hits.put(elk_response['hits']['hits'])
+        return elk_response['hits']['hits']
 
-    def _continue_scrolling(self, hits):
-        if self._current_scroll_id is None:
-            hits.put([])
-            return
-        elk_response = {}
-        try:
-            elk_response = self._es_manager.scroll(self._current_scroll_id)
-        except ConnectionTimeout:
-            self.LOGGER.exception('Error while scrolling in Elasticsearch')
-            elk_response['hits'] = {'hits': []}
-            self.timeout = True
-        self._current_scroll_id = elk_response.get('_scroll_id')
-        hits.put(elk_response['hits']['hits'])
+    def _search_hash(self) -> str:
+        return hashlib.sha256(json.dumps(self.query, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def _encode_token(self, search_after: t.Optional[list]) -> str:
+        token = {'pit': self._pit_id, 'after': search_after, 'search': self._search_hash()}
+        return base64.urlsafe_b64encode(json.dumps(token).encode('utf-8')).decode('ascii')
 
-    def _resolve_aggregations(self):
-        response = {'aggregations': {'groupby': {'buckets': []}}}
+    def _decode_token(self, continuation_token: str) -> t.Optional[list]:
+        """ Restore the point in time of the search from the token and return sort values of the last processed hit. """
         try:
-            response = self._es_manager.generic_search(ESIndices.YINDEX, self.query)
-        except ConnectionTimeout:
-            self.LOGGER.exception('Error while resolving aggregations')
-        aggregations = response['aggregations']['groupby']['buckets']
-        for agg in aggregations:
-            self._latest_revisions[agg['key']] = agg['latest-revision']['value_as_string'].split('T')[0]
-
-    def _rejects_mibs_or_versions(self, module_key: str, reject: t.List[str], module_data: dict) -> bool:
-        if not self._search_params.include_mibs and 'yang:smiv2:' in module_data.get('namespace', ''):
-            reject.append(module_key)
+            token = json.loads(base64.urlsafe_b64decode(continuation_token.encode('ascii')))
+            self._pit_id, search_after, search_hash = token['pit'], token['after'], token['search']
+        except (ValueError, KeyError, TypeError):
+            raise InvalidContinuationToken('Invalid continuation token')
+        if search_hash != self._search_hash():
+            raise InvalidContinuationToken('Continuation token belongs to a different search')
+        return search_after
+
+    def _rejects_mibs_or_versions(self, module_key: str, reject: t.Set[str], module: ModuleFields) -> bool:
+        if not self._search_params.include_mibs and 'yang:smiv2:' in module.namespace:
+            reject.add(module_key)
             return True
-        if module_data.get('yang-version') not in self._search_params.yang_versions:
-            reject.append(module_key)
+        if module.yang_version not in self._search_params.yang_versions:
+            reject.add(module_key)
             return True
         return False
 
 
+def _subsearch_conditions(sub_search: dict) -> t.List[dict]:
+    """ Return the conditions of a single sub-search which all must be met,
+    each value is searched case-insensitively as a part of the column's value.
+    """
+    conditions = []
+    for column, values in sub_search.items():
+        for value in values if isinstance(values, list) else [values]:
+            escaped = ''.join('\\{}'.format(char) if char in '\\*?' else char for char in value)
+            conditions.append({
+                'wildcard': {SUBSEARCH_FIELDS[column]: {'value': '*{}*'.format(escaped), 'case_insensitive': True}}
+            })
+    return conditions
+
+
 def _escape_reserved_characters(term: str) -> str:
     """ If the number of double quotes is odd, the sequence is not closed, so escaping characters is needed."""
     for char in RESERVED_CHARACTERS:
@@ -21,11 +21,13 @@ import json
 import os
 import re
 import typing as t
+from dataclasses import asdict
 from logging import Logger
 
 import utility.log as log
 from api.my_flask import app
-from api.views.yangSearch.elkSearch import ElkSearch
+from api.views.yangSearch.elkSearch import (RESPONSE_SIZE, ElkSearch,
+                                            InvalidContinuationToken)
 from api.views.yangSearch.search_params import SearchParams
 from elasticsearchIndexing.models.es_indices import ESIndices
 from elasticsearchIndexing.models.keywords_names import KeywordsNames
@@ -33,10 +35,9 @@ from flask.blueprints import Blueprint
 from flask.globals import request
 from flask.helpers import make_response
 from flask.json import jsonify
-from pyang import plugin
 from utility.staticVariables import (MODULE_PROPERTIES_ORDER, OUTPUT_COLUMNS,
                                      SCHEMA_TYPES)
-from utility.yangParser import create_context
+from utility.yangParser import get_context_pool
 from werkzeug.exceptions import abort
 
 
@@ -100,18 +101,12 @@ def tree_module_revision(module_name: str, revision: t.Optional[str] = None):
             revision = revisions[0]
 
         path_to_yang = '{}/{}@{}.yang'.format(ac.d_save_file_dir, module_name, revision)
-        plugin.plugins = []
-        plugin.init([])
-        ctx = create_context(ac.d_yang_models_dir)
-        ctx.opts.lint_namespace_prefixes = []
-        ctx.opts.lint_modulename_prefixes = []
-
-        for plug in plugin.plugins:
-            plug.setup_ctx(ctx)
         try:
             with open(path_to_yang, 'r') as f:
-                module_context = ctx.add_module(path_to_yang, f.read())
-                assert module_context
+                yang_file_content = f.read()
+            with get_context_pool(ac.d_yang_models_dir).context() as ctx:
+                module_context = ctx.add_module(path_to_yang, yang_file_content)
+            assert module_context
         except Exception:
             msg = 'File {} was not found'.format(path_to_yang)
             bp.LOGGER.exception(msg)
@@ -255,12 +250,37 @@ def search():
         output_columns=is_list_in(payload, 'output-columns', OUTPUT_COLUMNS),
         sub_search=each_key_in(payload, 'sub-search', OUTPUT_COLUMNS)
     )
+    page_size = is_int_in_range(payload, 'page-size', RESPONSE_SIZE, 1, RESPONSE_SIZE)
+    continuation_token = payload.get('continuation-token')
+    if continuation_token is not None and not isinstance(continuation_token, str):
+        abort(400, description='Value of key "continuation-token" must be string')
     elk_search = ElkSearch(searched_term, ac.d_logs, ac.es_manager, app.redisConnection, search_params)
     elk_search.construct_query()
+    # Only the first pages are cached, the following ones are read from the point in time of the search
+    cache_key = None
+    cache_generation = 0
+    if continuation_token is None:
+        cache_key = app.search_cache.key(searched_term, {**asdict(search_params), 'page-size': page_size})
+        cached, cache_generation = app.search_cache.get(cache_key)
+        if cached is not None:
+            response = cached['response']
+            response['continuation-token'] = None
+            if cached['search-after'] is not None:
+                response['continuation-token'] = elk_search.continuation_token(cached['search-after'])
+            response['timeout'] = elk_search.timeout
+            return make_response(jsonify(response), 200)
     response = {}
-    response['rows'], response['max-hits'] = elk_search.search()
+    try:
+        response['rows'], response['continuation-token'] = elk_search.search(page_size, continuation_token)
+    except InvalidContinuationToken as e:
+        abort(400, description=str(e))
+    response['max-hits'] = response['continuation-token'] is not None
     response['warning'] = elk_search.alerts()
     response['timeout'] = elk_search.timeout
+    if cache_key is not None and not elk_search.timeout:
+        cached_response = {key: value for key, value in response.items() if key != 'continuation-token'}
+        cached_result = {'response': cached_response, 'search-after': elk_search.search_after}
+        app.search_cache.set(cache_key, cache_generation, cached_result)
     return make_response(jsonify(response), 200)
 
 
@@ -388,12 +408,11 @@ def module_details(module: str, revision: t.Optional[str] = None, warnings: bool
 
     # get module from Redis
     module_key = '{}@{}/{}'.format(module, revision, organization)
-    module_data = app.redisConnection.get_module(module_key)
-    if module_data == '{}':
+    module_data = app.redisConnection.get_module_dict(module_key)
+    if not module_data:
         if warnings:
             return {'warning': 'module {} does not exists in API'.format(module_key)}
         abort(404, description='Provided module does not exist')
-    module_data = json.loads(module_data)
     response['metadata'] = module_data
     return response
 
@@ -549,6 +568,13 @@ def is_boolean(payload: dict, key: str, default: bool):
     return obj
 
 
+def is_int_in_range(payload: dict, key: str, default: int, minimum: int, maximum: int):
+    obj = payload.get(key, default)
+    if not isinstance(obj, int) or isinstance(obj, bool) or not minimum <= obj <= maximum:
+        abort(400, 'Value of key "{}" must be integer from {} to {}'.format(key, minimum, maximum))
+    return obj
+
+
 def is_string_in(payload: dict, key: str, default: str, one_of: t.List[str]):
     obj = payload.get(key, default)
     if not isinstance(obj, str) or obj not in one_of:
@@ -584,10 +610,9 @@ def each_key_in(payload: dict, payload_key: str, keys: t.List[str]):
 
 def get_module_data(module_key: str):
     bp.LOGGER.info('searching for module {}'.format(module_key))
-    module_data = app.redisConnection.get_module(module_key)
-    if module_data == '{}':
+    module_data = app.redisConnection.get_module_dict(module_key)
+    if not module_data:
         abort(404, description='Provided module does not exist')
-    module_data = json.loads(module_data)
     return module_data
 
 
@@ -17,10 +17,11 @@ __copyright__ = 'Copyright The IETF Trust 2020, All Rights Reserved'
 __license__ = 'Apache License, Version 2.0'
 __email__ = 'miroslav.kovac@pantheon.tech'
 
-import collections
 import io
 import json
 import os
+import typing as t
+from itertools import chain
 from operator import contains, eq
 
 import jinja2
@@ -28,13 +29,15 @@ import requests
 from api.my_flask import app
 from flask.blueprints import Blueprint
 from flask.globals import request
+from flask.helpers import make_response
 from flask.wrappers import Response
 from flask_deprecate import deprecate_route
 from markupsafe import escape
-from pyang import error, plugin
 from pyang.plugins.tree import emit_tree
-from utility.util import context_check_update_from
-from utility.yangParser import create_context
+from redisConnections.redis_comparisons_connection import CHECK_UPDATE_FROM, DIFF_FILE, DIFF_TREE
+from redisConnections.redisConnection import key_quote
+from utility.util import check_update_from_output, context_check_update_from
+from utility.yangParser import get_context_pool
 from werkzeug.exceptions import abort
 
 
@@ -75,7 +78,6 @@ def search(value: str):
     """
     path = value
     app.logger.info('Searching for {}'.format(value))
-    split = value.split('/')[:-1]
     key = '/'.join(value.split('/')[:-1])
     value = value.split('/')[-1]
     module_keys = ['ietf/ietf-wg', 'maturity-level', 'document-name', 'author-email', 'compilation-status', 'namespace',
@@ -83,17 +85,13 @@ def search(value: str):
                    'belongs-to', 'generated-from', 'expires', 'expired', 'prefix', 'reference']
     for module_key in module_keys:
         if key == module_key:
-            data = modules_data().get('module')
-            if data is None:
+            snapshot = app.modules_catalog.snapshot()
+            if not snapshot.modules:
                 abort(404, description='No module found in Redis database')
-            passed_data = []
-            for module in data:
-                count = -1
-                process(module, passed_data, value, module, split, count)
-
-            if len(passed_data) > 0:
-                modules = json.JSONDecoder(object_pairs_hook=collections.OrderedDict) \
-                    .decode(json.dumps(passed_data))
+            positions = snapshot.index.lookup(key, value)
+            modules = [snapshot.modules[position] for position in sorted(positions)]
+
+            if len(modules) > 0:
                 return {
                     'yang-catalog:modules': {
                         'module': modules
@@ -147,11 +145,12 @@ def rpc_search(body: dict = {}):
         body = request.json
         from_api = True
     app.logger.info('Searching and filtering modules based on RPC {}'.format(json.dumps(body)))
-    data = modules_data().get('module', {})
+    snapshot = app.modules_catalog.snapshot()
     body = body.get('input', {})
     if body:
         matched_modules = []
-        operator = contains if body.get('partial') is not None else eq
+        partial = body.get('partial') is not None
+        operator = contains if partial else eq
 
         def matches(module, body):
             if not isinstance(module, type(body)):
@@ -174,17 +173,22 @@ def rpc_search(body: dict = {}):
                     return True
                 return False
 
+        # Use index to narrow down the modules, candidates still need to be fully matched against the body
+        candidates = snapshot.index.candidates(body, partial)
+        if candidates is None:
+            data = snapshot.modules
+        else:
+            data = [snapshot.modules[position] for position in sorted(candidates)]
         for module in data:
             if matches(module, body):
                 matched_modules.append(module)
         if from_api and len(matched_modules) == 0:
             abort(404, description='No modules found with provided input')
         else:
-            modules = json.JSONDecoder(object_pairs_hook=collections.OrderedDict) \
-                .decode(json.dumps(matched_modules))
+            # Modules are shared with the in-memory catalog, callers have to copy them before any modification
             return {
                 'yang-catalog:modules': {
-                    'module': modules
+                    'module': matched_modules
                 }
             }
     else:
@@ -206,7 +210,8 @@ def get_organizations():
 
 @bp.route('/services/file1=<name1>@<revision1>/check-update-from/file2=<name2>@<revision2>', methods=['GET'])
 def create_update_from(name1: str, revision1: str, name2: str, revision2: str) -> str:
-    """Create output from pyang tool with option --check-update-from for two modules with revisions
+    """Create output from pyang tool with option --check-update-from for two modules with revisions.
+    Output precomputed during the semantic version derivation is returned if available.
 
     Arguments:
         :param name1:            (str) name of the first module
@@ -215,26 +220,13 @@ def create_update_from(name1: str, revision1: str, name2: str, revision2: str) -
         :param revision2:        (str) revision of the second module in format YYYY-MM-DD
         :return                  (str) preformatted HTML with corresponding data
     """
-    new_schema = '{}/{}@{}.yang'.format(ac.d_save_file_dir, name1, revision1)
-    old_schema = '{}/{}@{}.yang'.format(ac.d_save_file_dir, name2, revision2)
-    ctx, _ = context_check_update_from(old_schema, new_schema, ac.d_yang_models_dir, ac.d_save_file_dir)
-
-    errors = []
-    for ctx_err in ctx.errors:
-        ref = '{}:{}:'.format(ctx_err[0].ref, ctx_err[0].line)
-        err_message = error.err_to_str(ctx_err[1], ctx_err[2])
-        err = '{} {}\n'.format(ref, err_message)
-        errors.append(err)
-
-    return '<html><body><pre>{}</pre></body></html>'.format(''.join(errors))
+    return stored_comparison(CHECK_UPDATE_FROM, name1, revision1, name2, revision2, render_update_from)
 
 
 @bp.route('/services/diff-file/file1=<name1>@<revision1>/file2=<name2>@<revision2>', methods=['GET'])
 def create_diff_file(name1: str, revision1: str, name2: str, revision2: str) -> str:
     """Create preformated HTML which contains diff between two yang file.
-    Dump content of yang files into tempporary schema-file-diff.txt file.
-    Make GET request to URL https://www.ietf.org/rfcdiff/rfcdiff.pyht?url1=<file1>&url2=<file2>'.
-    Output of rfcdiff tool then represents response of the method.
+    Output stored by the previous request for the same files is returned if available.
 
     Arguments:
         :param name1:            (str) name of the first module
@@ -243,44 +235,13 @@ def create_diff_file(name1: str, revision1: str, name2: str, revision2: str) ->
         :param revision2:        (str) revision of the second module in format YYYY-MM-DD
         :return                  (str) preformatted HTML with corresponding data
     """
-    schema1 = '{}/{}@{}.yang'.format(ac.d_save_file_dir, name1, revision1)
-    schema2 = '{}/{}@{}.yang'.format(ac.d_save_file_dir, name2, revision2)
-    file_name1 = 'schema1-file-diff.txt'
-    yang_file_1_content = ''
-    try:
-        with open(schema1, 'r', encoding='utf-8', errors='strict') as f:
-            yang_file_1_content = f.read()
-    except FileNotFoundError:
-        app.logger.warn('File {}@{}.yang was not found.'.format(name1, revision1))
-
-    with open('{}/{}'.format(ac.w_save_diff_dir, file_name1), 'w+') as f:
-        f.write('<pre>{}</pre>'.format(yang_file_1_content))
-
-    file_name2 = 'schema2-file-diff.txt'
-    yang_file_2_content = ''
-    try:
-        with open(schema2, 'r', encoding='utf-8', errors='strict') as f:
-            yang_file_2_content = f.read()
-    except FileNotFoundError:
-        app.logger.warn('File {}@{}.yang was not found.'.format(name2, revision2))
-    with open('{}/{}'.format(ac.w_save_diff_dir, file_name2), 'w+') as f:
-        f.write('<pre>{}</pre>'.format(yang_file_2_content))
-    tree1 = '{}/compatibility/{}'.format(ac.w_my_uri, file_name1)
-    tree2 = '{}/compatibility/{}'.format(ac.w_my_uri, file_name2)
-    diff_url = ('https://www.ietf.org/rfcdiff/rfcdiff.pyht?url1={}&url2={}'
-                .format(tree1, tree2))
-    response = requests.get(diff_url)
-    os.remove('{}/{}'.format(ac.w_save_diff_dir, file_name1))
-    os.remove('{}/{}'.format(ac.w_save_diff_dir, file_name2))
-    return '<html><body>{}</body></html>'.format(response.text)
+    return stored_comparison(DIFF_FILE, name1, revision1, name2, revision2, render_diff_file)
 
 
 @bp.route('/services/diff-tree/file1=<name1>@<revision1>/file2=<file2>@<revision2>', methods=['GET'])
 def create_diff_tree(name1: str, revision1: str, file2: str, revision2: str) -> str:
     """Create preformated HTML which contains diff between two yang trees.
-    Dump content of yang files into tempporary schema-tree-diff.txt file.
-    Make GET request to URL https://www.ietf.org/rfcdiff/rfcdiff.pyht?url1=<file1>&url2=<file2>'.
-    Output of rfcdiff tool then represents response of the method.
+    Output stored by the previous request for the same files is returned if available.
 
     Arguments:
         :param name1:            (str) name of the first module
@@ -289,54 +250,7 @@ def create_diff_tree(name1: str, revision1: str, file2: str, revision2: str) ->
         :param revision2:        (str) revision of the second module in format YYYY-MM-DD
         :return                  (str) preformatted HTML with corresponding data
     """
-    schema1 = '{}/{}@{}.yang'.format(ac.d_save_file_dir, name1, revision1)
-    schema2 = '{}/{}@{}.yang'.format(ac.d_save_file_dir, file2, revision2)
-    plugin.plugins = []
-    plugin.init([])
-    ctx = create_context('{}:{}'.format(ac.d_yang_models_dir, ac.d_save_file_dir))
-    ctx.opts.lint_namespace_prefixes = []
-    ctx.opts.lint_modulename_prefixes = []
-    ctx.lax_quote_checks = True
-    ctx.lax_xpath_checks = True
-    for p in plugin.plugins:
-        p.setup_ctx(ctx)
-
-    with open(schema1, 'r') as ff:
-        a = ctx.add_module(schema1, ff.read())
-    ctx.errors = []
-    if ctx.opts.tree_path is not None:
-        path = ctx.opts.tree_path.split('/')
-        if path[0] == '':
-            path = path[1:]
-    else:
-        path = None
-
-    ctx.validate()
-    f = io.StringIO()
-    emit_tree(ctx, [a], f, ctx.opts.tree_depth, ctx.opts.tree_line_length, path)
-    stdout = f.getvalue()
-    file_name1 = 'schema1-tree-diff.txt'
-    full_path_file1 = '{}/{}'.format(ac.w_save_diff_dir, file_name1)
-    with open(full_path_file1, 'w+') as ff:
-        ff.write('<pre>{}</pre>'.format(stdout))
-    with open(schema2, 'r') as ff:
-        a = ctx.add_module(schema2, ff.read())
-    ctx.validate()
-    f = io.StringIO()
-    emit_tree(ctx, [a], f, ctx.opts.tree_depth, ctx.opts.tree_line_length, path)
-    stdout = f.getvalue()
-    file_name2 = 'schema2-tree-diff.txt'
-    full_path_file2 = '{}/{}'.format(ac.w_save_diff_dir, file_name2)
-    with open(full_path_file2, 'w+') as ff:
-        ff.write('<pre>{}</pre>'.format(stdout))
-    tree1 = '{}/compatibility/{}'.format(ac.w_my_uri, file_name1)
-    tree2 = '{}/compatibility/{}'.format(ac.w_my_uri, file_name2)
-    diff_url = ('https://www.ietf.org/rfcdiff/rfcdiff.pyht?url1={}&url2={}'
-                .format(tree1, tree2))
-    response = requests.get(diff_url)
-    os.unlink(full_path_file1)
-    os.unlink(full_path_file2)
-    return '<html><body>{}</body></html>'.format(response.text)
+    return stored_comparison(DIFF_TREE, name1, revision1, file2, revision2, render_diff_tree)
 
 
 @bp.route('/get-common', methods=['POST'])
@@ -395,6 +309,8 @@ def compare():
 
     new_mods = []
     for mod_new in modules_new:
+        # Shallow copy is enough to add 'reason-to-show' without modifying the shared module
+        mod_new = dict(mod_new)
         new_rev = mod_new['revision']
         new_name = mod_new['name']
         found = False
@@ -515,7 +431,7 @@ def search_vendor_statistics(vendor: str) -> dict:
         :return         (dict) statistics of the vendor's os-types, os-versions and platforms
     """
     app.logger.info('Searching for vendors')
-    data = vendors_data(False).get('vendor', {})
+    data = vendors_data().get('vendor', {})
     ven_data = None
     for d in data:
         if d['name'] == vendor:
@@ -560,7 +476,6 @@ def search_vendors(value: str) -> dict:
     """
     original_value = value
     app.logger.info('Searching for specific vendors {}'.format(original_value))
-    vendors_data = get_vendors()
 
     value = '/vendors/{}'.format(value).rstrip('/')
     part_names = ['vendor', 'platform', 'software-version', 'software-flavor']
@@ -568,19 +483,22 @@ def search_vendors(value: str) -> dict:
     for part_name in part_names[::-1]:
         value, _, parts[part_name] = value.partition('/{}s/{}/'.format(part_name, part_name))
     if not parts['vendor']:
-        return vendors_data
-    vendors_data = {'vendors': vendors_data}
+        return get_vendors()
+    # Only the searched subtree is read from Redis using the vendors index
+    quoted_parts = []
     previous_part_name = ''
     for part_name in part_names:
         if not (part := parts[part_name]):
             break
         previous_part_name = part_name
-        for chunk in vendors_data['{}s'.format(part_name)][part_name]:
-            if chunk['name'] == part:
-                vendors_data = chunk
-                break
-        else:
+        quoted_parts.append(key_quote(part))
+        if not app.redisConnection.vendor_path_exists(quoted_parts):
             abort(404, description='No {}s found on path {}'.format(part_name, original_value))
+    vendors_data = {'vendors': {'vendor': app.redisConnection.create_vendors_data_dict('/'.join(quoted_parts))}}
+    for part_name in part_names[:len(quoted_parts)]:
+        if not (chunks := vendors_data['{}s'.format(part_name)][part_name]):
+            abort(404, description='No {}s found on path {}'.format(part_name, original_value))
+        vendors_data = chunks[0]
     return {'yang-catalog:{}'.format(previous_part_name): [vendors_data]}
 
 
@@ -596,9 +514,9 @@ def search_module(name: str, revision: str, organization: str) -> dict:
             see if the job is still on or Failed or Finished successfully
     """
     app.logger.info('Searching for module {}, {}, {}'.format(name, revision, organization))
-    module_data_redis = app.redisConnection.get_module('{}@{}/{}'.format(name, revision, organization))
-    if module_data_redis != '{}':
-        return {'module': [json.JSONDecoder(object_pairs_hook=collections.OrderedDict).decode(module_data_redis)]}
+    module_data_redis = app.redisConnection.get_module_dict('{}@{}/{}'.format(name, revision, organization))
+    if module_data_redis:
+        return {'module': [module_data_redis]}
     abort(404, description='Module {}@{}/{} not found'.format(name, revision, organization))
 
 
@@ -608,10 +526,18 @@ def get_modules():
         :return response to the request with all the modules
     """
     app.logger.info('Searching for modules')
-    data = modules_data()
-    if data is None or data == {}:
+    if request.args.get('latest-revision'):
+        # Latest revision filter needs the whole response body, so the response is not streamed
+        data = modules_data()
+        if data is None or data == {}:
+            abort(404, description='No module is loaded')
+        return data
+    modules_batches = app.redisConnection.iter_modules_json()
+    first_batch = next(modules_batches, None)
+    if first_batch is None:
         abort(404, description='No module is loaded')
-    return data
+    body = chain(['{"module": ['], stream_modules_json(first_batch, modules_batches), [']}'])
+    return Response(body, mimetype='application/json')
 
 
 @bp.route('/search/vendors', methods=['GET'])
@@ -632,59 +558,68 @@ def get_catalog():
         :return response to the request with all the data (modules and vendors)
     """
     app.logger.info('Searching for catalog data')
-    data = catalog_data()
-    if data is None or data == {}:
-        abort(404, description='No data loaded to YangCatalog')
-    else:
+    if request.args.get('latest-revision'):
+        # Latest revision filter needs the whole response body, so the response is not streamed
+        data = catalog_data()
+        if data is None or data == {}:
+            abort(404, description='No data loaded to YangCatalog')
         return data
+    modules_batches = app.redisConnection.iter_modules_json()
+    first_batch = next(modules_batches, None)
+    vendors_json = app.redisConnection.get_all_vendors()
+    if vendors_json == '{}':
+        vendors_json = None
+    if first_batch is None and vendors_json is None:
+        abort(404, description='No data loaded to YangCatalog')
+    return Response(stream_catalog_json(first_batch, modules_batches, vendors_json), mimetype='application/json')
 
 
 @bp.route('/services/tree/<name>@<revision>.yang', methods=['GET'])
-def create_tree(name: str, revision: str) -> str:
+def create_tree(name: str, revision: str):
     """
     Return yang tree representation of yang module with corresponding module name and revision.
+    Rendered tree is cached and answered from the cache for the same content of the yang file.
 
     Arguments:
         :param name     (str) name of the module
         :param revision (str) revision of the module in format YYYY-MM-DD
-        :return         (str) preformatted HTML with corresponding data
+        :return         (Response) preformatted HTML with corresponding data
     """
     path_to_yang = '{}/{}@{}.yang'.format(ac.d_save_file_dir, name, revision)
-    plugin.plugins = []
-    plugin.init([])
-    ctx = create_context('{}:{}'.format(ac.d_yang_models_dir, ac.d_save_file_dir))
-    ctx.opts.lint_namespace_prefixes = []
-    ctx.opts.lint_modulename_prefixes = []
-
-    for p in plugin.plugins:
-        p.setup_ctx(ctx)
+    return cached_output('tree', path_to_yang, lambda: render_tree(name, revision, path_to_yang))
+
+
+def render_tree(name: str, revision: str, path_to_yang: str) -> str:
     try:
         with open(path_to_yang, 'r') as f:
-            a = ctx.add_module(path_to_yang, f.read())
+            yang_file_content = f.read()
     except FileNotFoundError:
         abort(400, description='File {} was not found'.format(path_to_yang))
-    if ctx.opts.tree_path is not None:
-        path = ctx.opts.tree_path.split('/')
-        if path[0] == '':
-            path = path[1:]
-    else:
-        path = None
+    with get_context_pool('{}:{}'.format(ac.d_yang_models_dir, ac.d_save_file_dir)).context() as ctx:
+        a = ctx.add_module(path_to_yang, yang_file_content)
+        if ctx.opts.tree_path is not None:
+            path = ctx.opts.tree_path.split('/')
+            if path[0] == '':
+                path = path[1:]
+        else:
+            path = None
 
-    ctx.validate()
-    f = io.StringIO()
-    emit_tree(ctx, [a], f, ctx.opts.tree_depth, ctx.opts.tree_line_length, path)
-    stdout = f.getvalue()
+        ctx.validate()
+        f = io.StringIO()
+        emit_tree(ctx, [a], f, ctx.opts.tree_depth, ctx.opts.tree_line_length, path)
+        stdout = f.getvalue()
+        errors_count = len(ctx.errors)
     context = {
         'title': 'YANG Tree {}@{}'.format(name, revision)
     }
-    if stdout == '' and len(ctx.errors) != 0:
+    if stdout == '' and errors_count != 0:
         context['message'] = 'This yang file contains major errors and therefore tree can not be created.'
         return create_bootstrap(context, 'danger.html')
-    elif stdout != '' and len(ctx.errors) != 0:
+    elif stdout != '' and errors_count != 0:
         context['message'] = 'This yang file contains some errors, but tree was created.'
         context['text'] = stdout
         return create_bootstrap(context, 'warning.html')
-    elif stdout == '' and len(ctx.errors) == 0:
+    elif stdout == '' and errors_count == 0:
         context['message'] = 'This yang file does not contain any tree.'
         return create_bootstrap(context, 'info.html')
     else:
@@ -693,16 +628,21 @@ def create_tree(name: str, revision: str) -> str:
 
 
 @bp.route('/services/reference/<name>@<revision>.yang', methods=['GET'])
-def create_reference(name: str, revision: str) -> str:
+def create_reference(name: str, revision: str):
     """
     Return reference of yang file with corresponding module name and revision.
+    Escaped content is cached and answered from the cache for the same content of the yang file.
 
     Arguments:
         :param name     (str) name of the module
         :param revision (str) revision of the module in format YYYY-MM-DD
-        :return         (str) preformatted HTML with corresponding data
+        :return         (Response) preformatted HTML with corresponding data
     """
     path_to_yang = '{}/{}@{}.yang'.format(ac.d_save_file_dir, name, revision)
+    return cached_output('reference', path_to_yang, lambda: render_reference(name, revision, path_to_yang))
+
+
+def render_reference(name: str, revision: str, path_to_yang: str) -> str:
     context = {
         'title': 'Reference {}@{}'.format(name, revision)
     }
@@ -717,6 +657,142 @@ def create_reference(name: str, revision: str) -> str:
 
 
 # HELPER DEFINITIONS
+def stored_comparison(service: str, name1: str, revision1: str, name2: str, revision2: str,
+                      compare: t.Callable[[str, str, str, str], t.Tuple[str, bool]]) -> str:
+    """Return output of the 'service' comparing two modules from the comparisons store.
+    Output is created by calling 'compare' on a miss and stored if 'compare' reports it as complete.
+    """
+    output = app.comparisons.get(service, name1, revision1, name2, revision2)
+    if output is not None:
+        return output
+    output, complete = compare(name1, revision1, name2, revision2)
+    if complete:
+        app.comparisons.set(service, name1, revision1, name2, revision2, output)
+    return output
+
+
+def render_update_from(name1: str, revision1: str, name2: str, revision2: str) -> t.Tuple[str, bool]:
+    new_schema = '{}/{}@{}.yang'.format(ac.d_save_file_dir, name1, revision1)
+    old_schema = '{}/{}@{}.yang'.format(ac.d_save_file_dir, name2, revision2)
+    with get_context_pool('{}:{}'.format(ac.d_yang_models_dir, ac.d_save_file_dir)).context() as ctx:
+        context_check_update_from(old_schema, new_schema, ac.d_yang_models_dir, ac.d_save_file_dir, ctx)
+        return check_update_from_output(ctx), True
+
+
+def render_diff_file(name1: str, revision1: str, name2: str, revision2: str) -> t.Tuple[str, bool]:
+    """Dump content of yang files into tempporary schema-file-diff.txt file.
+    Make GET request to URL https://www.ietf.org/rfcdiff/rfcdiff.pyht?url1=<file1>&url2=<file2>'.
+    Output of rfcdiff tool then represents the output. Output is complete only if both files exist
+    and the rfcdiff tool responded successfully.
+    """
+    schema1 = '{}/{}@{}.yang'.format(ac.d_save_file_dir, name1, revision1)
+    schema2 = '{}/{}@{}.yang'.format(ac.d_save_file_dir, name2, revision2)
+    complete = True
+    file_name1 = 'schema1-file-diff.txt'
+    yang_file_1_content = ''
+    try:
+        with open(schema1, 'r', encoding='utf-8', errors='strict') as f:
+            yang_file_1_content = f.read()
+    except FileNotFoundError:
+        complete = False
+        app.logger.warn('File {}@{}.yang was not found.'.format(name1, revision1))
+
+    with open('{}/{}'.format(ac.w_save_diff_dir, file_name1), 'w+') as f:
+        f.write('<pre>{}</pre>'.format(yang_file_1_content))
+
+    file_name2 = 'schema2-file-diff.txt'
+    yang_file_2_content = ''
+    try:
+        with open(schema2, 'r', encoding='utf-8', errors='strict') as f:
+            yang_file_2_content = f.read()
+    except FileNotFoundError:
+        complete = False
+        app.logger.warn('File {}@{}.yang was not found.'.format(name2, revision2))
+    with open('{}/{}'.format(ac.w_save_diff_dir, file_name2), 'w+') as f:
+        f.write('<pre>{}</pre>'.format(yang_file_2_content))
+    tree1 = '{}/compatibility/{}'.format(ac.w_my_uri, file_name1)
+    tree2 = '{}/compatibility/{}'.format(ac.w_my_uri, file_name2)
+    diff_url = ('https://www.ietf.org/rfcdiff/rfcdiff.pyht?url1={}&url2={}'
+                .format(tree1, tree2))
+    response = requests.get(diff_url)
+    os.remove('{}/{}'.format(ac.w_save_diff_dir, file_name1))
+    os.remove('{}/{}'.format(ac.w_save_diff_dir, file_name2))
+    return '<html><body>{}</body></html>'.format(response.text), complete and response.ok
+
+
+def render_diff_tree(name1: str, revision1: str, name2: str, revision2: str) -> t.Tuple[str, bool]:
+    """Dump trees of yang files into tempporary schema-tree-diff.txt file.
+    Make GET request to URL https://www.ietf.org/rfcdiff/rfcdiff.pyht?url1=<file1>&url2=<file2>'.
+    Output of rfcdiff tool then represents the output. Output is complete only if the rfcdiff tool
+    responded successfully.
+    """
+    schema1 = '{}/{}@{}.yang'.format(ac.d_save_file_dir, name1, revision1)
+    schema2 = '{}/{}@{}.yang'.format(ac.d_save_file_dir, name2, revision2)
+    with get_context_pool('{}:{}'.format(ac.d_yang_models_dir, ac.d_save_file_dir)).context() as ctx:
+        ctx.lax_quote_checks = True
+        ctx.lax_xpath_checks = True
+
+        with open(schema1, 'r') as ff:
+            a = ctx.add_module(schema1, ff.read())
+        ctx.errors = []
+        if ctx.opts.tree_path is not None:
+            path = ctx.opts.tree_path.split('/')
+            if path[0] == '':
+                path = path[1:]
+        else:
+            path = None
+
+        ctx.validate()
+        f = io.StringIO()
+        emit_tree(ctx, [a], f, ctx.opts.tree_depth, ctx.opts.tree_line_length, path)
+        stdout = f.getvalue()
+        file_name1 = 'schema1-tree-diff.txt'
+        full_path_file1 = '{}/{}'.format(ac.w_save_diff_dir, file_name1)
+        with open(full_path_file1, 'w+') as ff:
+            ff.write('<pre>{}</pre>'.format(stdout))
+        with open(schema2, 'r') as ff:
+            a = ctx.add_module(schema2, ff.read())
+        ctx.validate()
+        f = io.StringIO()
+        emit_tree(ctx, [a], f, ctx.opts.tree_depth, ctx.opts.tree_line_length, path)
+        stdout = f.getvalue()
+    file_name2 = 'schema2-tree-diff.txt'
+    full_path_file2 = '{}/{}'.format(ac.w_save_diff_dir, file_name2)
+    with open(full_path_file2, 'w+') as ff:
+        ff.write('<pre>{}</pre>'.format(stdout))
+    tree1 = '{}/compatibility/{}'.format(ac.w_my_uri, file_name1)
+    tree2 = '{}/compatibility/{}'.format(ac.w_my_uri, file_name2)
+    diff_url = ('https://www.ietf.org/rfcdiff/rfcdiff.pyht?url1={}&url2={}'
+                .format(tree1, tree2))
+    response = requests.get(diff_url)
+    os.unlink(full_path_file1)
+    os.unlink(full_path_file2)
+    return '<html><body>{}</body></html>'.format(response.text), response.ok
+
+
+def cached_output(renderer: str, path_to_yang: str, render: t.Callable[[], str]):
+    """Return output of the 'renderer' for the yang file on 'path_to_yang' from the rendered output cache.
+    Output is rendered by calling 'render' and stored to the cache on a miss.
+    Key of the cached output is used as the ETag, so clients already holding the output get 304 response.
+    Output is not cached if the file does not exist.
+    """
+    cache = app.rendered_output_cache
+    key = cache.key(renderer, path_to_yang)
+    if key is None:
+        return render()
+    if request.if_none_match.contains(key):
+        response = Response(status=304)
+        response.set_etag(key)
+        return response
+    output = cache.get(key)
+    if output is None:
+        output = render()
+        cache.set(key, output)
+    response = make_response(output)
+    response.set_etag(key)
+    return response
+
+
 def filter_using_api(res_row, payload):
     try:
         if 'filter' not in payload or 'module-metadata-filter' not in payload['filter']:
@@ -858,60 +934,45 @@ def search_recursive(output: set, module: dict, leaf: str, resolved: set):
             output.add(meta_data)
 
 
-def process(data, passed_data, value, module, split, count) -> bool:
-    """Iterates recursively through the data to find only modules
-    that are searched for
-
-    Arguments:
-        :param data:        (dict) module that is searched
-        :param passed_data: (list) data that contain value searched
-            for are saved in this variable
-        :param value:       (str) value searched for
-        :param module:      (dict) module that is searched
-        :param split:       (str) key value that conatins value searched for
-        :param count:       (int) if split contains '/' then we need to know
-            which part of the path are we searching.
-        :return             (bool) whether a match was found
-    """
-    if isinstance(data, str):
-        if data == value:
-            passed_data.append(module)
-            return True
-    elif isinstance(data, list):
-        for part in data:
-            if process(part, passed_data, value, module, split, count):
-                break
-    elif isinstance(data, dict):
-        if data:
-            count += 1
-            return process(data.get(split[count]), passed_data, value, module, split, count)
-    return False
-
-
 def modules_data():
-    """Get all the modules data from Redis.
+    """Get all the modules data from the modules catalog kept in memory of the worker.
     Empty dictionary is returned if no data is stored under specified key.
     """
-    data = app.redisConnection.get_all_modules()
-    if data != '{}':
-        modules = json.loads(data)
-        modules_list = [module for module in modules.values()]
-        data = json.dumps({'module': modules_list})
-
-    return json.JSONDecoder(object_pairs_hook=collections.OrderedDict).decode(data)
-
-
-def vendors_data(clean_data=True):
+    modules = app.modules_catalog.modules()
+    if not modules:
+        return {}
+    return {'module': modules}
+
+
+def stream_modules_json(first_batch: t.List[str], modules_batches: t.Iterator[t.List[str]]) -> t.Iterator[str]:
+    """Yield items of JSON array of the modules batch by batch, so the whole array is never held in memory."""
+    yield ', '.join(first_batch)
+    for batch in modules_batches:
+        yield ', '
+        yield ', '.join(batch)
+
+
+def stream_catalog_json(first_batch: t.Optional[t.List[str]], modules_batches: t.Iterator[t.List[str]],
+                        vendors_json: t.Optional[str]) -> t.Iterator[str]:
+    """Yield JSON of the whole catalog. Modules are streamed batch by batch, vendors are copied as stored."""
+    yield '{"yang-catalog:catalog": {'
+    if first_batch is not None:
+        yield '"modules": {"module": ['
+        yield from stream_modules_json(first_batch, modules_batches)
+        yield ']}'
+        if vendors_json is not None:
+            yield ', '
+    if vendors_json is not None:
+        yield '"vendors": '
+        yield vendors_json
+    yield '}}'
+
+
+def vendors_data():
     """Get all the vendors data from Redis.
     Empty dictionary is returned if no data is stored under specified key.
     """
-    data = app.redisConnection.get_all_vendors()
-
-    if clean_data:
-        json_data = json.JSONDecoder(object_pairs_hook=collections.OrderedDict).decode(data)
-    else:
-        json_data = json.loads(data)
-    return json_data
+    return app.redisConnection.get_vendors_dict()
 
 
 def catalog_data():
@@ -931,7 +992,7 @@ def catalog_data():
     if catalog_data != {}:
         catalog_data = {'yang-catalog:catalog': catalog_data}
 
-    return json.JSONDecoder(object_pairs_hook=collections.OrderedDict).decode(json.dumps(catalog_data))
+    return catalog_data
 
 
 def create_bootstrap(context: dict, template: str):
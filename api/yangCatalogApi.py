@@ -128,7 +128,7 @@ def load_to_memory():
 
 
 def load():
-    """Load modules data from Redis individual keys to modules-data"""
+    """Make sure modules-data aggregate exists, reload vendors data and refresh the modules catalog"""
     if app.waiting_for_reload:
         special_id = app.special_id
         app.special_id_counter[special_id] += 1
@@ -156,14 +156,17 @@ def load():
             app.logger.info('Special ids {}'.format(app.special_id_counter))
     with lock_for_load:
         app.logger.info('Application not locked for reload')
-        app.redisConnection.reload_modules_cache()
+        # modules-data aggregate is maintained incrementally, rebuild it only if it is missing
+        if not app.redisConnection.modules_data_exists():
+            app.redisConnection.reload_modules_cache()
         app.redisConnection.reload_vendors_cache()
+        app.modules_catalog.refresh()
         app.logger.info('Cache loaded successfully')
         app.loading = False
 
 
 def load_app_first_time():
-    while app.redisConnection.get_module('yang-catalog@2018-04-03/ietf') == '{}':
+    while not app.redisConnection.get_module_dict('yang-catalog@2018-04-03/ietf'):
         sec = 30
         app.logger.info('yang-catalog@2018-04-03 not loaded yet - waiting for {} seconds'.format(sec))
         time.sleep(sec)
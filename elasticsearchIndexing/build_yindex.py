@@ -20,45 +20,117 @@ __email__ = 'miroslav.kovac@pantheon.tech, jclarke@cisco.com'
 import io
 import json
 import logging
+import typing as t
 
-from elasticsearch import ConnectionError, ConnectionTimeout, RequestError
-from pyang import plugin
+from elasticsearch import ConnectionError, ConnectionTimeout
+from pyang.statements import Statement
 from pyang.util import get_latest_revision
 from utility import yangParser
-from utility.util import validate_revision
+from utility.util import get_yang, validate_revision
 
+from elasticsearchIndexing.es_bulk_sink import ESBulkSink
 from elasticsearchIndexing.es_manager import ESManager
 from elasticsearchIndexing.models.es_indices import ESIndices
 from elasticsearchIndexing.pyang_plugin.json_tree import emit_tree
 from elasticsearchIndexing.pyang_plugin.yang_catalog_index_es import \
     IndexerPlugin
 
-ES_CHUNK_SIZE = 100
+MODULES_PER_CONTEXT = 20
 
 
-def build_indices(es_manager: ESManager, module: dict, save_file_dir: str, json_ytree: str,
-                  LOGGER: logging.Logger):
-    name_revision = '{}@{}'.format(module['name'], module['revision'])
+class ParsedModule(t.NamedTuple):
+    """Documents of the module for index: yindex and names with revisions of the module and its submodules."""
+    yindexes: t.List[dict]
+    submodules: t.List[t.Dict[str, str]]
+
+
+def parse_module(module: dict, save_file_dir: str, json_ytree: str, LOGGER: logging.Logger) -> ParsedModule:
+    """ Parse and validate the module, write its json tree to the json_ytree directory
+    and return the documents to be indexed.
+
+    Arguments:
+        :param module           (dict) module with 'name', 'revision' and 'path' to its yang file
+        :param save_file_dir    (str) directory with all the yang files
+        :param json_ytree       (str) directory to write the json tree to
+        :param LOGGER           (logging.Logger) logger to log the errors to
+        :return                 (ParsedModule) yindex documents and the submodules to delete from index: yindex
+    """
+    result = parse_modules([module], save_file_dir, json_ytree, LOGGER)[0]
+    if isinstance(result, Exception):
+        raise result
+    return result
+
 
-    plugin.init([])
-    ctx = yangParser.create_context(save_file_dir)
-    ctx.opts.lint_namespace_prefixes = []
-    ctx.opts.lint_modulename_prefixes = []
-    for plug in plugin.plugins:
-        plug.setup_ctx(ctx)
-
-    with open(module['path'], 'r') as reader:
-        parsed_module = ctx.add_module(module['path'], reader.read())
-    if parsed_module is None:
-        raise Exception('Unable to pyang parse module')
+def parse_modules(modules: t.List[dict], save_file_dir: str, json_ytree: str,
+                  LOGGER: logging.Logger) -> t.List[t.Union[ParsedModule, Exception]]:
+    """ Parse and validate the modules, write their json trees to the json_ytree directory
+    and return the documents to be indexed.
+
+    Up to MODULES_PER_CONTEXT modules are added to one pooled pyang context and validated at once,
+    so the modules they import are parsed and validated only once. Module is never added to the same context
+    as modules importing it, even indirectly, as their augmentations would become part of its documents.
+    If validation of the shared context fails, its modules are parsed again one by one.
+
+    Arguments:
+        :param modules          (List[dict]) modules with 'name', 'revision' and 'path' to their yang files
+        :param save_file_dir    (str) directory with all the yang files
+        :param json_ytree       (str) directory to write the json trees to
+        :param LOGGER           (logging.Logger) logger to log the errors to
+        :return                 (List[Union[ParsedModule, Exception]]) parsed documents of each module,
+            or the exception raised while parsing it
+    """
+    results: t.Dict[int, t.Union[ParsedModule, Exception]] = {}
+    context_pool = yangParser.get_context_pool(save_file_dir)
+    for group in _context_groups(modules):
+        try:
+            with context_pool.context() as ctx:
+                results.update(_parse_group(ctx, [(i, modules[i]) for i in group], json_ytree, LOGGER))
+        except Exception as e:
+            if len(group) == 1:
+                results[group[0]] = e
+                continue
+            LOGGER.exception('Problem while validating {} modules together, parsing them one by one'.format(len(group)))
+            for i in group:
+                try:
+                    with context_pool.context() as ctx:
+                        results.update(_parse_group(ctx, [(i, modules[i])], json_ytree, LOGGER))
+                except Exception as e:
+                    results[i] = e
+    return [results[i] for i in range(len(modules))]
+
+
+def _parse_group(ctx: yangParser.OptsContext, modules: t.List[t.Tuple[int, dict]], json_ytree: str,
+                 LOGGER: logging.Logger) -> t.Dict[int, t.Union[ParsedModule, Exception]]:
+    results: t.Dict[int, t.Union[ParsedModule, Exception]] = {}
+    parsed_modules = {}
+    for i, module in modules:
+        with open(module['path'], 'r') as reader:
+            parsed_module = ctx.add_module(module['path'], reader.read())
+        if parsed_module is None:
+            results[i] = Exception('Unable to pyang parse module')
+        else:
+            parsed_modules[i] = parsed_module
     ctx.validate()
 
+    ctx.opts.yang_index_make_module_table = True
+    ctx.opts.yang_index_no_schema = True
+    for i, module in modules:
+        if i not in parsed_modules:
+            continue
+        try:
+            results[i] = _emit_module(ctx, module, parsed_modules[i], json_ytree, LOGGER)
+        except Exception as e:
+            results[i] = e
+    return results
+
+
+def _emit_module(ctx: yangParser.OptsContext, module: dict, parsed_module: Statement, json_ytree: str,
+                 LOGGER: logging.Logger) -> ParsedModule:
+    name_revision = '{}@{}'.format(module['name'], module['revision'])
     submodules = [parsed_module]
     _find_submodules(ctx, submodules, parsed_module)
 
     f = io.StringIO()
-    ctx.opts.yang_index_make_module_table = True
-    ctx.opts.yang_index_no_schema = True
     indexer_plugin = IndexerPlugin()
     indexer_plugin.emit(ctx, [parsed_module], f)
 
@@ -72,47 +144,107 @@ def build_indices(es_manager: ESManager, module: dict, save_file_dir: str, json_
             LOGGER.exception('unable to create ytree for module {}'.format(name_revision))
             writer.write('')
 
+    return ParsedModule(
+        [document for documents in yindexes.values() for document in documents],
+        [{'name': subm.arg, 'revision': validate_revision(get_latest_revision(subm))} for subm in submodules]
+    )
+
+
+def _context_groups(modules: t.List[dict]) -> t.List[t.List[int]]:
+    """ Split indexes of the modules to groups which can share one pyang context. """
+    dependencies_cache: t.Dict[str, t.Set[str]] = {}
+    groups: t.List[t.Tuple[t.List[int], t.Set[str], t.Set[str]]] = []
+    for i, module in enumerate(modules):
+        dependencies = _dependencies(module['path'], dependencies_cache)
+        for members, names, group_dependencies in groups:
+            if (len(members) < MODULES_PER_CONTEXT and module['name'] not in names | group_dependencies
+                    and not dependencies & names):
+                members.append(i)
+                names.add(module['name'])
+                group_dependencies.update(dependencies)
+                break
+        else:
+            groups.append(([i], {module['name']}, set(dependencies)))
+    return [members for members, _, _ in groups]
+
+
+def _dependencies(path: str, cache: t.Dict[str, t.Set[str]]) -> t.Set[str]:
+    """ Names of all the modules and submodules the yang file imports or includes, even indirectly. """
+    if path in cache:
+        return cache[path]
+    dependencies: t.Set[str] = set()
+    paths = [path]
+    while paths:
+        current = paths.pop()
+        if current in cache:
+            dependencies.update(cache[current])
+            continue
+        try:
+            header = yangParser.parse_header(current)
+        except (yangParser.ParseException, OSError):
+            continue
+        for name in header.imports + header.includes:
+            if name in dependencies:
+                continue
+            dependencies.add(name)
+            dependency_path = get_yang(name)
+            if dependency_path is not None:
+                paths.append(dependency_path)
+    cache[path] = dependencies
+    return dependencies
+
+
+def index_modules(es_manager: ESManager, sink: ESBulkSink, modules: t.List[t.Tuple[dict, ParsedModule]],
+                  LOGGER: logging.Logger, metadata: t.Optional[t.Dict[str, dict]] = None):
+    """ Replace documents of the parsed modules in all the indices.
+    Existing documents are deleted by a single query per index, new ones are sent to the sink
+    and the method returns after all of them are indexed and the latest revisions of their modules are flagged.
+
+    Arguments:
+        :param es_manager   (ESManager) manager used to delete the existing documents
+        :param sink         (ESBulkSink) sink to send the new documents to
+        :param modules      (List[Tuple[dict, ParsedModule]]) modules with 'name', 'revision' and 'organization'
+            and their parsed documents
+        :param LOGGER       (logging.Logger) logger to log the progress to
+        :param metadata     (Optional[Dict[str, dict]]) module-level fields added to the yindex documents,
+            by the Redis keys of their modules as returned by document_module_key()
+    """
+    metadata = metadata or {}
     attempts = 3
     while attempts > 0:
         try:
-            # Remove exisiting modules from all indices
-            LOGGER.debug('deleting data from index: modules')
-            es_manager.delete_from_indices(module)
-
-            # Remove existing submodules from index: yindex
-            for subm in submodules:
-                subm_n = subm.arg
-                rev = get_latest_revision(subm)
-                subm_r = validate_revision(rev)
-                submodule = {
-                    'name': subm_n,
-                    'revision': subm_r
-                }
-                try:
-                    LOGGER.debug('deleting data from index: yindex')
-                    es_manager.delete_from_index(ESIndices.YINDEX, submodule)
-                except RequestError:
-                    LOGGER.exception('Problem while deleting {}@{}'.format(subm_n, subm_r))
-
-            # Bulk new modules to index: yindex
-            for key in yindexes:
-                chunks = [yindexes[key][i:i + ES_CHUNK_SIZE] for i in range(0, len(yindexes[key]), ES_CHUNK_SIZE)]
-                for idx, chunk in enumerate(chunks, start=1):
-                    LOGGER.debug('pushing data to index: yindex {} out of {}'.format(idx, len(chunks)))
-                    es_manager.bulk_modules(ESIndices.YINDEX, chunk)
-
-            # Index new modules to index: autocomplete
-            LOGGER.debug('pushing data to index: autocomplete')
-            del module['path']
-            es_manager.index_module(ESIndices.AUTOCOMPLETE, module)
+            # Remove existing modules from all indices and their submodules from index: yindex
+            LOGGER.debug('deleting {} modules from all indices'.format(len(modules)))
+            es_manager.delete_modules_from_indices([module for module, _ in modules])
+            submodules = {(submodule['name'], submodule['revision']): submodule
+                          for _, parsed in modules for submodule in parsed.submodules}
+            es_manager.delete_modules_from_index(ESIndices.YINDEX, list(submodules.values()))
             break
-        except (ConnectionTimeout, ConnectionError) as e:
-            attempts -= attempts
+        except (ConnectionTimeout, ConnectionError):
+            attempts -= 1
             if attempts > 0:
-                LOGGER.warning('module {} timed out'.format(name_revision))
+                LOGGER.warning('deleting {} modules timed out'.format(len(modules)))
             else:
-                LOGGER.exception('module {} timed out too many times failing'.format(name_revision))
-                raise e
+                LOGGER.exception('deleting {} modules timed out too many times failing'.format(len(modules)))
+                raise
+
+    LOGGER.debug('pushing data to indices: yindex and autocomplete')
+    for module, parsed in modules:
+        for document in parsed.yindexes:
+            sink.add(ESIndices.YINDEX, {**document, **metadata.get(document_module_key(document), {})})
+        sink.add(ESIndices.AUTOCOMPLETE,
+                 {'name': module['name'], 'revision': module['revision'], 'organization': module['organization']})
+    sink.flush()
+    names = {module['name'] for module, _ in modules}
+    names.update(document['module'] for _, parsed in modules for document in parsed.yindexes)
+    es_manager.update_latest_revisions(sorted(names))
+
+
+def document_module_key(document: dict) -> str:
+    """ Return Redis key of the module or submodule the yindex document belongs to. """
+    # Revision 02-29 is stored as 02-28 in Elasticsearch
+    revision = document['revision'].replace('02-28', '02-29')
+    return '{}@{}/{}'.format(document['module'], revision, document['organization'])
 
 
 def _find_submodules(ctx, submodules, module):
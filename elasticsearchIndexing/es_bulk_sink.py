@@ -0,0 +1,130 @@
+# Copyright The IETF Trust 2022, All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+__copyright__ = 'Copyright The IETF Trust 2022, All Rights Reserved'
+__license__ = 'Apache License, Version 2.0'
+
+import json
+import threading
+import typing as t
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from elasticsearch import ConnectionError, ConnectionTimeout
+
+from elasticsearchIndexing.es_manager import ESManager
+from elasticsearchIndexing.models.es_indices import ESIndices
+
+DEFAULT_MAX_CHUNK_BYTES = 10 * 1024 * 1024
+DEFAULT_MAX_CHUNK_ACTIONS = 5000
+BULK_ATTEMPTS = 3
+
+
+class ESBulkSink:
+    """
+    Long-lived sink of the documents to be indexed by the Elasticsearch bulk API.
+    Documents are buffered and sent in chunks limited by their serialized size, so chunks
+    of small documents contain many of them and chunks of large documents few.
+    At most 'threads' bulk requests are sent concurrently by a thread pool kept for the sink's whole life.
+    """
+
+    def __init__(self, es_manager: ESManager, threads: t.Optional[int] = None,
+                 max_chunk_bytes: int = DEFAULT_MAX_CHUNK_BYTES, max_chunk_actions: int = DEFAULT_MAX_CHUNK_ACTIONS):
+        """
+        Arguments:
+            :param es_manager           (ESManager) manager whose client and logger are used
+            :param threads              (Optional[int]) number of concurrent bulk requests,
+                General-Section threads by default
+            :param max_chunk_bytes      (int) maximum size of the serialized documents sent in one request
+            :param max_chunk_actions    (int) maximum number of the documents sent in one request
+        """
+        self.es = es_manager.es
+        self.request_timeout = es_manager.elk_request_timeout
+        self.LOGGER = es_manager.LOGGER
+        self.max_chunk_bytes = max_chunk_bytes
+        self.max_chunk_actions = max_chunk_actions
+        self.indexed = 0
+        self.failed = 0
+        threads = threads or es_manager.threads
+        self._executor = ThreadPoolExecutor(max_workers=threads)
+        # Limit the number of serialized chunks waiting in memory
+        self._slots = threading.BoundedSemaphore(2 * threads)
+        self._lock = threading.Lock()
+        self._pending: t.List[Future] = []
+        self._buffer: t.List[str] = []
+        self._buffer_bytes = 0
+
+    def add(self, index: ESIndices, document: dict):
+        """ Add the document to be indexed in the index, the document is sent once its chunk is full. """
+        action = '{}\n{}\n'.format(json.dumps({'index': {'_index': index.value}}), json.dumps(document))
+        size = len(action.encode('utf-8'))
+        if self._buffer and (self._buffer_bytes + size > self.max_chunk_bytes
+                             or len(self._buffer) >= self.max_chunk_actions):
+            self._send()
+        self._buffer.append(action)
+        self._buffer_bytes += size
+
+    def flush(self):
+        """ Send all the buffered documents and wait until all the sent chunks are indexed.
+        Exception of the first failed request is raised after all the requests finished.
+        """
+        if self._buffer:
+            self._send()
+        pending, self._pending = self._pending, []
+        errors = [future.exception() for future in pending]
+        for error in errors:
+            if error is not None:
+                raise error
+
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            self._executor.shutdown()
+
+    def __enter__(self) -> 'ESBulkSink':
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _send(self):
+        body = ''.join(self._buffer)
+        count = len(self._buffer)
+        self._buffer = []
+        self._buffer_bytes = 0
+        self._slots.acquire()
+        future = self._executor.submit(self._bulk, body, count)
+        future.add_done_callback(lambda _: self._slots.release())
+        self._pending.append(future)
+
+    def _bulk(self, body: str, count: int):
+        for attempt in range(1, BULK_ATTEMPTS + 1):
+            try:
+                response = self.es.bulk(body=body, request_timeout=self.request_timeout)
+                break
+            except (ConnectionTimeout, ConnectionError):
+                if attempt == BULK_ATTEMPTS:
+                    self.LOGGER.exception('Bulk request of {} documents timed out too many times'.format(count))
+                    raise
+                self.LOGGER.warning('Bulk request of {} documents timed out'.format(count))
+        failed = 0
+        if response.get('errors'):
+            for item in response['items']:
+                info = item.get('index', {})
+                if 'error' in info:
+                    failed += 1
+                    self.LOGGER.error('Elasticsearch document failed with info: {}'.format(info))
+        with self._lock:
+            self.indexed += count - failed
+            self.failed += failed
@@ -19,6 +19,7 @@ __email__ = 'slavomir.mazur@pantheon.tech'
 
 import json
 import os
+import typing as t
 
 import utility.log as log
 from elasticsearch import Elasticsearch
@@ -30,6 +31,42 @@ from utility.create_config import create_config
 from elasticsearchIndexing.models.es_indices import ESIndices
 from elasticsearchIndexing.models.keywords_names import KeywordsNames
 
+# Keep the number of clauses of the delete query below the default indices.query.bool.max_clause_count
+DELETE_CHUNK_SIZE = 500
+# Module-level fields of the modules stored in Redis which are copied to each of their documents in index: yindex
+YINDEX_METADATA_FIELDS = ['maturity-level', 'dependents', 'compilation-status', 'namespace', 'yang-version']
+# Flag of the documents of the latest revision of their module in index: yindex
+LATEST_REVISION_FIELD = 'is-latest-revision'
+# Unique field of the documents in index: yindex used as the search results sort tiebreaker
+SORT_ID_FIELD = 'sort-hash-id'
+# Fields added to index: yindex after its creation
+YINDEX_ADDED_FIELDS = YINDEX_METADATA_FIELDS + [LATEST_REVISION_FIELD, SORT_ID_FIELD]
+LATEST_REVISION_SCRIPT = (
+    "boolean latest = ctx._source.revision == params.latest[ctx._source.module];"
+    "if (ctx._source['is-latest-revision'] == latest) { ctx.op = 'noop'; }"
+    "else { ctx._source['is-latest-revision'] = latest; }"
+)
+UPDATE_METADATA_SCRIPT = (
+    "def key = ctx._source.module + '@' + ctx._source.revision + '/' + ctx._source.organization;"
+    "def metadata = params.modules[key];"
+    "if (metadata == null) { ctx.op = 'noop'; } else { ctx._source.putAll(metadata); }"
+)
+
+
+def yindex_metadata(module: dict) -> dict:
+    """ Return module-level fields of the module stored in Redis in the form stored in index: yindex.
+
+    Argument:
+        :param module   (dict) module as stored in Redis
+    """
+    return {
+        'maturity-level': module.get('maturity-level', ''),
+        'dependents': len(module.get('dependents', [])),
+        'compilation-status': module.get('compilation-status', 'unknown'),
+        'namespace': module.get('namespace', ''),
+        'yang-version': module.get('yang-version'),
+    }
+
 
 class ESManager:
     def __init__(self) -> None:
@@ -102,6 +139,14 @@ class ESManager:
         """
         return self.es.indices.put_mapping(index=index.value, body=body, ignore=403)
 
+    def update_yindex_mapping(self) -> dict:
+        """ Add mapping of the fields added after its creation to the existing index: yindex. """
+        index_json_path = os.path.join(os.environ['BACKEND'], 'elasticsearchIndexing/json/initialize_yindex_index.json')
+        with open(index_json_path, encoding='utf-8') as reader:
+            properties = json.load(reader)['mappings']['properties']
+        body = {'properties': {field: properties[field] for field in YINDEX_ADDED_FIELDS}}
+        return self.put_index_mapping(ESIndices.YINDEX, body)
+
     def get_index_mapping(self, index: ESIndices) -> dict:
         """ Get mapping for provided index.
 
@@ -165,6 +210,82 @@ class ESManager:
         for index in ESIndices:
             self.delete_from_index(index, module)
 
+    def delete_modules_from_index(self, index: ESIndices, modules: t.List[dict]):
+        """ Delete all the modules from the index with as few delete_by_query requests as possible.
+
+        Arguments:
+            :param index        (ESIndices) Target index from which to delete modules
+            :param modules      (List[dict]) Modules to delete, each with 'name' and 'revision'
+        """
+        self.LOGGER.info(f'Deleting {len(modules)} modules from index: "{index}"')
+        for i in range(0, len(modules), DELETE_CHUNK_SIZE):
+            delete_modules_query = {'query': self._get_modules_query(index, modules[i:i + DELETE_CHUNK_SIZE])}
+            self.es.delete_by_query(index=index.value, body=delete_modules_query, conflicts='proceed',
+                                    request_timeout=self.elk_request_timeout)
+
+    def delete_modules_from_indices(self, modules: t.List[dict]):
+        for index in ESIndices:
+            self.delete_modules_from_index(index, modules)
+
+    def update_module_metadata(self, index: ESIndices, modules: t.List[dict]):
+        """ Update module-level fields of all the documents of the modules in the index
+        with as few update_by_query requests as possible.
+
+        Arguments:
+            :param index        (ESIndices) Target index in which to update documents
+            :param modules      (List[dict]) modules as stored in Redis, their 'revision' must be in the form
+                stored in Elasticsearch
+        """
+        self.LOGGER.info(f'Updating metadata of {len(modules)} modules in index: "{index}"')
+        for i in range(0, len(modules), DELETE_CHUNK_SIZE):
+            chunk = modules[i:i + DELETE_CHUNK_SIZE]
+            metadata = {
+                '{}@{}/{}'.format(module['name'], module['revision'], module['organization']): yindex_metadata(module)
+                for module in chunk
+            }
+            update_query = {
+                'query': self._get_modules_query(index, chunk),
+                'script': {'source': UPDATE_METADATA_SCRIPT, 'lang': 'painless', 'params': {'modules': metadata}}
+            }
+            self.es.update_by_query(index=index.value, body=update_query, conflicts='proceed',
+                                    request_timeout=self.elk_request_timeout)
+
+    def update_latest_revisions(self, names: t.List[str]):
+        """ Set the latest revision flag of all the documents of the modules in index: yindex,
+        only the documents of the latest revision of each module are flagged.
+
+        Argument:
+            :param names        (List[str]) names of the modules whose documents were indexed or deleted
+        """
+        self.LOGGER.info(f'Updating latest revisions of {len(names)} modules in index: "{ESIndices.YINDEX}"')
+        # Make the documents indexed just before searchable
+        self.es.indices.refresh(index=ESIndices.YINDEX.value)
+        for i in range(0, len(names), DELETE_CHUNK_SIZE):
+            chunk = names[i:i + DELETE_CHUNK_SIZE]
+            latest_revisions_query = {
+                'query': {'terms': {'module.keyword': chunk}},
+                'aggs': {
+                    'groupby': {
+                        'terms': {'field': 'module.keyword', 'size': len(chunk)},
+                        'aggs': {'latest-revision': {'max': {'field': 'revision'}}}
+                    }
+                }
+            }
+            response = self.es.search(index=ESIndices.YINDEX.value, body=latest_revisions_query, size=0,
+                                      request_timeout=self.elk_request_timeout)
+            latest = {
+                bucket['key']: bucket['latest-revision']['value_as_string'].split('T')[0]
+                for bucket in response['aggregations']['groupby']['buckets']
+            }
+            if not latest:
+                continue
+            update_query = {
+                'query': {'terms': {'module.keyword': sorted(latest)}},
+                'script': {'source': LATEST_REVISION_SCRIPT, 'lang': 'painless', 'params': {'latest': latest}}
+            }
+            self.es.update_by_query(index=ESIndices.YINDEX.value, body=update_query, conflicts='proceed',
+                                    request_timeout=self.elk_request_timeout)
+
     def index_module(self, index: ESIndices, document: dict) -> dict:
         """ Creates or updates a 'document' in an selcted index.
 
@@ -285,6 +406,29 @@ class ESManager:
         return self.es.search(index=index.value, body=query, request_timeout=self.elk_request_timeout,
                               size=response_size)
 
+    def open_point_in_time(self, index: ESIndices, keep_alive: str) -> str:
+        """ Open point in time of the index and return its id. """
+        return self.es.open_point_in_time(index=index.value, params={'keep_alive': keep_alive})['id']
+
+    def close_point_in_time(self, pit_id: str):
+        return self.es.close_point_in_time(body={'id': pit_id}, ignore=(404, ))
+
+    def point_in_time_search(self, query: dict, pit_id: str, keep_alive: str, response_size: int,
+                             search_after: t.Optional[list] = None) -> dict:
+        """ Search in the point in time, which is kept alive for another keep_alive period.
+
+        Arguments:
+            :param query            (dict) Query with the sort ending with a unique field
+            :param pit_id           (str) Id of the point in time
+            :param keep_alive       (str) Time for which the point in time is extended
+            :param response_size    (int) Number of hits to return
+            :param search_after     (Optional[list]) Sort values of the last hit of the previous search
+        """
+        body = {**query, 'pit': {'id': pit_id, 'keep_alive': keep_alive}}
+        if search_after is not None:
+            body['search_after'] = search_after
+        return self.es.search(body=body, size=response_size, request_timeout=self.elk_request_timeout)
+
     def clear_scroll(self, scroll_id: str):
         return self.es.clear_scroll(scroll_id=scroll_id, ignore=(404, ))
 
@@ -327,3 +471,18 @@ class ESManager:
         name_revision_query['query']['bool']['must'][1]['match_phrase']['revision']['query'] = module['revision']
 
         return name_revision_query
+
+    def _get_modules_query(self, index: ESIndices, modules: t.List[dict]) -> dict:
+        # TODO: Remove this IF after reindexing and unification of both indices
+        name_field = 'module.keyword' if index in [ESIndices.MODULES, ESIndices.YINDEX] else 'name.keyword'
+        return {
+            'bool': {
+                'filter': [{'terms': {name_field: sorted({module['name'] for module in modules})}}],
+                'should': [
+                    {'bool': {'filter': [{'term': {name_field: module['name']}},
+                                         {'term': {'revision': module['revision']}}]}}
+                    for module in modules
+                ],
+                'minimum_should_match': 1
+            }
+        }
@@ -24,15 +24,23 @@ import os
 import shutil
 import sys
 import typing as t
+from concurrent.futures import Future, ProcessPoolExecutor
 
 import requests
+from redis import RedisError
+from redisConnections.redis_search_cache_connection import \
+    RedisSearchCacheConnection
+from redisConnections.redisConnection import RedisConnection
 from utility import log, repoutil
 from utility.create_config import create_config
 from utility.scriptConfig import Arg, BaseScriptConfig
 from utility.util import fetch_module_by_schema, validate_revision
 
-from elasticsearchIndexing.build_yindex import build_indices
-from elasticsearchIndexing.es_manager import ESManager
+from elasticsearchIndexing.build_yindex import (ParsedModule,
+                                                document_module_key,
+                                                index_modules, parse_modules)
+from elasticsearchIndexing.es_bulk_sink import ESBulkSink
+from elasticsearchIndexing.es_manager import ESManager, yindex_metadata
 from elasticsearchIndexing.models.es_indices import ESIndices
 
 
@@ -47,6 +55,18 @@ class ScriptConfig(BaseScriptConfig):
                 'type': str,
                 'default': os.environ['YANGCATALOG_CONFIG_PATH']
             },
+            {
+                'flag': '--workers',
+                'help': 'Number of processes parsing the modules in parallel. Default: 1',
+                'type': int,
+                'default': 1
+            },
+            {
+                'flag': '--batch-size',
+                'help': 'Number of modules deleted from and pushed to Elasticsearch together. Default: 100',
+                'type': int,
+                'default': 100
+            },
         ]
         super().__init__(help, args, None if __name__ == '__main__' else [])
 
@@ -95,10 +115,13 @@ class ProcessChangedMods:
         self._backup_cache_files(self.changes_cache_path)
         os.unlink(self.lock_file)
 
-        if self.delete_cache:
-            self._delete_modules_from_es()
-        if self.changes_cache:
-            self._change_modules_in_es()
+        try:
+            if self.delete_cache:
+                self._delete_modules_from_es()
+            if self.changes_cache:
+                self._change_modules_in_es()
+        finally:
+            self._invalidate_search_cache()
 
         os.unlink(self.lock_file_cron)
         self.logger.info('Job finished successfully')
@@ -118,12 +141,21 @@ class ProcessChangedMods:
         self.logger.info('Trying to initialize Elasticsearch indices')
         for index in ESIndices:
             if self.es_manager.index_exists(index):
+                if index == ESIndices.YINDEX:
+                    self.es_manager.update_yindex_mapping()
                 continue
             create_result = self.es_manager.create_index(index)
             self.logger.info(f'Index {index.value} created with message:\n{create_result}')
         logging.getLogger('elasticsearch').setLevel(logging.ERROR)
 
+    def _invalidate_search_cache(self):
+        try:
+            RedisSearchCacheConnection().increase_generation()
+        except RedisError:
+            self.logger.exception('Failed to invalidate cached search results')
+
     def _delete_modules_from_es(self):
+        names = set()
         for module in self.delete_cache:
             name, rev_org = module.split('@')
             revision, organization = rev_org.split('/')
@@ -135,41 +167,38 @@ class ProcessChangedMods:
                 'organization': organization,
             }
             self.es_manager.delete_from_indices(module)
+            names.add(name)
+        self.es_manager.update_latest_revisions(sorted(names))
 
     def _change_modules_in_es(self):
         recursion_limit = sys.getrecursionlimit()
         sys.setrecursionlimit(50000)
+        modules = []
+        for module_key, module_path in self.changes_cache.items():
+            name, rev_org = module_key.split('@')
+            revision, organization = rev_org.split('/')
+            revision = validate_revision(revision)
+            modules.append((module_key, {
+                'name': name,
+                'revision': revision,
+                'organization': organization,
+                'path': module_path
+            }))
+        self.redis_connection = RedisConnection()
+        batches = [modules[i:i + self.args.batch_size] for i in range(0, len(modules), self.args.batch_size)]
         try:
-            for module_count, (module_key, module_path) in enumerate(self.changes_cache.items(), 1):
-                name, rev_org = module_key.split('@')
-                revision, organization = rev_org.split('/')
-                revision = validate_revision(revision)
-                name_revision = f'{name}@{revision}'
-
-                module = {
-                    'name': name,
-                    'revision': revision,
-                    'organization': organization,
-                    'path': module_path
-                }
-                self.logger.info(
-                    f'yindex on module {name_revision}. module {module_count} out of {len(self.changes_cache)}'
-                )
-
-                try:
-                    self._check_file_availability(module)
-                    build_indices(self.es_manager, module, self.save_file_dir, self.json_ytree, self.logger)
-                except Exception:
-                    self.logger.exception(f'Problem while processing module {module_key}')
-                    try:
-                        with open(self.failed_changes_cache_path, 'r') as reader:
-                            failed_modules = json.load(reader)
-                    except (FileNotFoundError, json.decoder.JSONDecodeError):
-                        failed_modules = {}
-                    if module_key not in failed_modules:
-                        failed_modules[module_key] = module_path
-                    with open(self.failed_changes_cache_path, 'w') as writer:
-                        json.dump(failed_modules, writer)
+            with ProcessPoolExecutor(max_workers=self.args.workers, initializer=_init_worker) as executor, \
+                    ESBulkSink(self.es_manager) as sink:
+                # Modules of the next batch are parsed while the current batch is being indexed
+                futures = self._parse_batch(executor, batches[0], 0) if batches else []
+                for batch_number, batch in enumerate(batches):
+                    next_futures = []
+                    if batch_number + 1 < len(batches):
+                        next_futures = self._parse_batch(executor, batches[batch_number + 1],
+                                                         (batch_number + 1) * self.args.batch_size)
+                    self._index_batch(batch, futures, sink)
+                    futures = next_futures
+                self.logger.info(f'{sink.indexed} documents indexed, {sink.failed} documents failed')
         except Exception:
             sys.setrecursionlimit(recursion_limit)
             os.unlink(self.lock_file_cron)
@@ -179,6 +208,86 @@ class ProcessChangedMods:
 
         sys.setrecursionlimit(recursion_limit)
 
+    def _parse_batch(self, executor: ProcessPoolExecutor, batch: t.List[t.Tuple[str, dict]],
+                     start: int) -> t.List[t.Optional[t.Tuple[Future, int]]]:
+        """ Submit available modules of the batch to be parsed, split among the workers.
+        Return future of the worker's results together with the position in them for each module of the batch,
+        or None if the module's file is not available.
+        """
+        available = []
+        for index, (module_key, module) in enumerate(batch):
+            self.logger.info(
+                f'yindex on module {module["name"]}@{module["revision"]}. '
+                f'module {start + index + 1} out of {len(self.changes_cache)}'
+            )
+            try:
+                self._check_file_availability(module)
+            except Exception:
+                self.logger.exception(f'Problem while processing module {module_key}')
+                continue
+            available.append(index)
+        results: t.List[t.Optional[t.Tuple[Future, int]]] = [None] * len(batch)
+        chunk_size = max(1, -(-len(available) // self.args.workers))
+        for i in range(0, len(available), chunk_size):
+            chunk = available[i:i + chunk_size]
+            future = executor.submit(parse_modules, [batch[index][1] for index in chunk], self.save_file_dir,
+                                     self.json_ytree, self.logger)
+            for position, index in enumerate(chunk):
+                results[index] = (future, position)
+        return results
+
+    def _index_batch(self, batch: t.List[t.Tuple[str, dict]], futures: t.List[t.Optional[t.Tuple[Future, int]]],
+                     sink: ESBulkSink):
+        parsed_modules = []
+        failed_modules = []
+        for (module_key, module), result in zip(batch, futures):
+            if result is None:
+                failed_modules.append((module_key, module['path']))
+                continue
+            future, position = result
+            try:
+                parsed = future.result()[position]
+                if isinstance(parsed, Exception):
+                    raise parsed
+                parsed_modules.append((module_key, module, parsed))
+            except Exception:
+                self.logger.exception(f'Problem while processing module {module_key}')
+                failed_modules.append((module_key, module['path']))
+        if parsed_modules:
+            try:
+                index_modules(self.es_manager, sink, [(module, parsed) for _, module, parsed in parsed_modules],
+                              self.logger, self._load_metadata([parsed for _, _, parsed in parsed_modules]))
+            except Exception:
+                self.logger.exception(f'Problem while indexing {len(parsed_modules)} modules')
+                failed_modules.extend((module_key, module['path']) for module_key, module, _ in parsed_modules)
+        if failed_modules:
+            self._store_failed_modules(failed_modules)
+
+    def _load_metadata(self, parsed_modules: t.List[ParsedModule]) -> t.Dict[str, dict]:
+        """ Load module-level fields of all the modules and submodules documented in the batch
+        from Redis with a single request. Documents are indexed without them if Redis is not available.
+        """
+        module_keys = sorted({document_module_key(document) for parsed in parsed_modules
+                              for document in parsed.yindexes})
+        try:
+            modules = self.redis_connection.get_modules(module_keys)
+        except RedisError:
+            self.logger.exception('Failed to load metadata of the modules from Redis')
+            return {}
+        return {module_key: yindex_metadata(module) for module_key, module in zip(module_keys, modules) if module}
+
+    def _store_failed_modules(self, modules: t.List[t.Tuple[str, str]]):
+        try:
+            with open(self.failed_changes_cache_path, 'r') as reader:
+                failed_modules = json.load(reader)
+        except (FileNotFoundError, json.decoder.JSONDecodeError):
+            failed_modules = {}
+        for module_key, module_path in modules:
+            if module_key not in failed_modules:
+                failed_modules[module_key] = module_path
+        with open(self.failed_changes_cache_path, 'w') as writer:
+            json.dump(failed_modules, writer)
+
     def _load_changes_cache(self, changes_cache_path: str):
         changes_cache = {}
 
@@ -229,6 +338,10 @@ class ProcessChangedMods:
             raise Exception(f'Unable to retrieve content of {module["name"]}@{module["revision"]}')
 
 
+def _init_worker():
+    sys.setrecursionlimit(50000)
+
+
 def main(script_config: BaseScriptConfig = ScriptConfig()):
     ProcessChangedMods(script_config).start_processing_changed_mods()
 
@@ -183,11 +183,11 @@ def index_printer(stmt):
         'properties': json.dumps(subs),
     }
     vals['sdo'] = vals['organization'] in SDOS
-    # TODO: What is this field used for?
-    # text = '{} {} {} {} {} {} {} {} {}'.format(vals['module'], vals['revision'], vals['organization'],
-    #                                            vals['path'], vals['statement'], vals['argument'],
-    #                                            vals['description'], vals['sdo'], vals['properties'])
-    # vals['sort-hash-id'] = hashlib.sha256(text.encode('utf-8')).hexdigest()
+    # Tiebreaker of the search results sort, so they can be paginated with search_after
+    text = '{} {} {} {} {} {} {} {} {}'.format(vals['module'], vals['revision'], vals['organization'],
+                                               vals['path'], vals['statement'], vals['argument'],
+                                               vals['description'], vals['sdo'], vals['properties'])
+    vals['sort-hash-id'] = hashlib.sha256(text.encode('utf-8')).hexdigest()
     _values['yindex'].append(vals)
 
 
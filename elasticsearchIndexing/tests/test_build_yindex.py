@@ -0,0 +1,145 @@
+# Copyright The IETF Trust 2022, All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+__copyright__ = 'Copyright The IETF Trust 2022, All Rights Reserved'
+__license__ = 'Apache License, Version 2.0'
+
+import logging
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from elasticsearchIndexing.build_yindex import (ParsedModule, _context_groups,
+                                                document_module_key,
+                                                index_modules, parse_module,
+                                                parse_modules)
+from elasticsearchIndexing.es_manager import yindex_metadata
+from elasticsearchIndexing.models.es_indices import ESIndices
+
+MODULES = {
+    'base-module': '''module base-module {
+  namespace "urn:test:base-module";
+  prefix base;
+  revision 2022-01-01;
+  container base {
+    leaf name { type string; }
+  }
+}
+''',
+    'augmenting-module': '''module augmenting-module {
+  namespace "urn:test:augmenting-module";
+  prefix aug;
+  import base-module { prefix base; }
+  revision 2022-01-01;
+  augment "/base:base" {
+    leaf augmented { type string; }
+  }
+}
+''',
+    'other-module': '''module other-module {
+  namespace "urn:test:other-module";
+  prefix other;
+  revision 2022-01-01;
+  leaf other { type int32; }
+}
+''',
+    'invalid-module': '''module invalid-module {
+  namespace "urn:test:invalid-module";
+  prefix inv;
+  revision 2022-01-01;
+  leaf invalid { type string;
+}
+''',
+}
+
+
+class TestBuildYindexClass(unittest.TestCase):
+    def setUp(self):
+        self.save_file_dir = tempfile.mkdtemp()
+        self.json_ytree = tempfile.mkdtemp()
+        self.modules = {}
+        for name, text in MODULES.items():
+            path = os.path.join(self.save_file_dir, '{}@2022-01-01.yang'.format(name))
+            with open(path, 'w') as f:
+                f.write(text)
+            self.modules[name] = {'name': name, 'revision': '2022-01-01', 'organization': 'ietf', 'path': path}
+        get_yang_patcher = mock.patch('elasticsearchIndexing.build_yindex.get_yang',
+                                      side_effect=lambda name: self.modules[name]['path'])
+        get_yang_patcher.start()
+        self.addCleanup(get_yang_patcher.stop)
+        self.logger = logging.getLogger(__name__)
+
+    def tearDown(self):
+        shutil.rmtree(self.save_file_dir)
+        shutil.rmtree(self.json_ytree)
+
+    def test_context_groups(self):
+        modules = [self.modules['base-module'], self.modules['augmenting-module'], self.modules['other-module']]
+
+        self.assertEqual(_context_groups(modules), [[0, 2], [1]])
+
+    def test_parse_modules_same_as_parse_module(self):
+        names = ['base-module', 'augmenting-module', 'other-module']
+
+        results = parse_modules([self.modules[name] for name in names], self.save_file_dir, self.json_ytree,
+                                self.logger)
+        trees = {name: self.read_tree(name) for name in names}
+
+        for name, result in zip(names, results):
+            self.assertEqual(result, parse_module(self.modules[name], self.save_file_dir, self.json_ytree,
+                                                  self.logger))
+            self.assertEqual(trees[name], self.read_tree(name))
+        base_paths = [document['path'] for document in results[0].yindexes]
+        self.assertFalse(any('augmented' in path for path in base_paths))
+
+    def test_parse_modules_invalid_module(self):
+        modules = [self.modules['other-module'], self.modules['invalid-module'], self.modules['base-module']]
+
+        results = parse_modules(modules, self.save_file_dir, self.json_ytree, self.logger)
+
+        self.assertIsInstance(results[0], ParsedModule)
+        self.assertIsInstance(results[1], Exception)
+        self.assertIsInstance(results[2], ParsedModule)
+        self.assertEqual(results[2].submodules, [{'name': 'base-module', 'revision': '2022-01-01'}])
+
+    def test_index_modules_with_metadata(self):
+        module = self.modules['base-module']
+        parsed = parse_module(module, self.save_file_dir, self.json_ytree, self.logger)
+        redis_module = {'name': 'base-module', 'revision': '2022-01-01', 'organization': 'ietf',
+                        'maturity-level': 'ratified', 'dependents': [{'name': 'augmenting-module'}],
+                        'compilation-status': 'passed', 'namespace': 'urn:test:base-module', 'yang-version': '1.0'}
+        metadata = {document_module_key(parsed.yindexes[0]): yindex_metadata(redis_module)}
+        es_manager = mock.MagicMock()
+        sink = mock.MagicMock()
+
+        index_modules(es_manager, sink, [(module, parsed)], self.logger, metadata)
+
+        documents = [call.args[1] for call in sink.add.call_args_list if call.args[0] == ESIndices.YINDEX]
+        self.assertEqual(len(documents), len(parsed.yindexes))
+        for document in documents:
+            self.assertEqual(document['dependents'], 1)
+            self.assertEqual(document['compilation-status'], 'passed')
+            self.assertEqual(document['yang-version'], '1.0')
+        self.assertNotIn('dependents', parsed.yindexes[0])
+        es_manager.update_latest_revisions.assert_called_once_with(['base-module'])
+
+    def read_tree(self, name: str) -> str:
+        with open(os.path.join(self.json_ytree, '{}@2022-01-01.json'.format(name))) as f:
+            return f.read()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+# Copyright The IETF Trust 2022, All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+__copyright__ = 'Copyright The IETF Trust 2022, All Rights Reserved'
+__license__ = 'Apache License, Version 2.0'
+
+import json
+import unittest
+from unittest import mock
+
+from elasticsearch import ConnectionTimeout
+from elasticsearchIndexing.es_bulk_sink import ESBulkSink
+from elasticsearchIndexing.es_manager import ESManager
+from elasticsearchIndexing.models.es_indices import ESIndices
+
+
+class TestESBulkSinkClass(unittest.TestCase):
+
+    def setUp(self):
+        self.es_manager = ESManager()
+        self.es_manager.es = mock.MagicMock()
+        self.es_manager.es.bulk.return_value = {'errors': False, 'items': []}
+
+    def test_chunks_limited_by_size(self):
+        document = {'module': 'ietf-rip', 'description': 'x' * 100}
+        action_size = len('{}\n{}\n'.format(json.dumps({'index': {'_index': 'yindex'}}), json.dumps(document)))
+
+        with ESBulkSink(self.es_manager, threads=2, max_chunk_bytes=3 * action_size) as sink:
+            for _ in range(7):
+                sink.add(ESIndices.YINDEX, document)
+
+        bodies = [call.kwargs['body'] for call in self.es_manager.es.bulk.call_args_list]
+        self.assertEqual(sorted(body.count('\n') // 2 for body in bodies), [1, 3, 3])
+        self.assertEqual(sink.indexed, 7)
+
+    def test_chunks_limited_by_actions(self):
+        with ESBulkSink(self.es_manager, threads=1, max_chunk_actions=2) as sink:
+            for i in range(5):
+                sink.add(ESIndices.AUTOCOMPLETE, {'name': 'module-{}'.format(i)})
+            sink.flush()
+            self.assertEqual(self.es_manager.es.bulk.call_count, 3)
+
+    def test_failed_documents_counted(self):
+        self.es_manager.es.bulk.return_value = {
+            'errors': True,
+            'items': [
+                {'index': {'status': 201}},
+                {'index': {'status': 400, 'error': {'type': 'mapper_parsing_exception'}}}
+            ]
+        }
+
+        with ESBulkSink(self.es_manager, threads=1) as sink:
+            sink.add(ESIndices.YINDEX, {'module': 'ietf-rip'})
+            sink.add(ESIndices.YINDEX, {'module': 'ietf-rip', 'revision': 'invalid'})
+
+        self.assertEqual((sink.indexed, sink.failed), (1, 1))
+
+    def test_flush_raises_after_retries(self):
+        self.es_manager.es.bulk.side_effect = ConnectionTimeout('TIMEOUT', 'timed out', None)
+        sink = ESBulkSink(self.es_manager, threads=1)
+        sink.add(ESIndices.YINDEX, {'module': 'ietf-rip'})
+
+        with self.assertRaises(ConnectionTimeout):
+            sink.close()
+        self.assertEqual(self.es_manager.es.bulk.call_count, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -203,6 +203,18 @@ class TestESManagerAutocompleteIndexClass(TestESManagerClass):
         self.assertIn('deleted', delete_result)
         self.assertNotEqual(delete_result['deleted'], 0)
 
+    def test_delete_modules_from_index(self):
+        ietf_restconf_module = {'name': 'ietf-restconf', 'revision': '2017-01-26'}
+        self.es_manager.delete_modules_from_index(self.test_index, [self.ietf_rip_module, ietf_restconf_module])
+        self.es.indices.refresh(index=self.test_index.value)
+
+        self.assertFalse(self.es_manager.document_exists(self.test_index, self.ietf_rip_module))
+        self.assertFalse(self.es_manager.document_exists(self.test_index, ietf_restconf_module))
+        ietf_rip_older_module = {'name': 'ietf-rip', 'revision': '2018-02-03'}
+        self.assertTrue(self.es_manager.document_exists(self.test_index, ietf_rip_older_module))
+        self.assertEqual(self.es_manager.get_documents_count(self.test_index),
+                         len(self.test_data['autocomplete_modules']) - 2)
+
     def test_document_exists(self):
         in_es = self.es_manager.document_exists(self.test_index, self.ietf_rip_module)
 
@@ -24,7 +24,8 @@ from collections import OrderedDict
 
 import redis
 
-from redisConnections.redisConnection import RedisConnection
+from redisConnections.redisConnection import (MODULES_DATA_GENERATION_KEY, MODULES_DATA_KEY,
+                                              RedisConnection)
 from utility.create_config import create_config
 
 
@@ -66,8 +67,12 @@ def load_catalog_data():
     vendors = catalog_data_json.get('vendors', {})
 
     # Fill Redis db=1 with modules data
-    modules_data = {create_module_key(module): module for module in modules.get('module', [])}
-    redisConnection.set_redis_module(modules_data, 'modules-data')
+    modules_data = {
+        create_module_key(module): redisConnection.codec.encode(module) for module in modules.get('module', [])
+    }
+    if modules_data:
+        redisConnection.modulesDB.hset(MODULES_DATA_KEY, mapping=modules_data)
+        redisConnection.modulesDB.incr(MODULES_DATA_GENERATION_KEY)
     print(f'{len(modules.get("module", []))} modules set in Redis.')
     redisConnection.populate_implementation(vendors.get('vendor', []))
     redisConnection.reload_vendors_cache()
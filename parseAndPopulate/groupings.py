@@ -25,6 +25,9 @@ import os
 import typing as t
 import unicodedata
 import xml.etree.ElementTree as ET
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 
 import utility.log as log
 from git import InvalidGitRepositoryError
@@ -38,14 +41,68 @@ from parseAndPopulate.dir_paths import DirPaths
 from parseAndPopulate.dumper import Dumper
 from parseAndPopulate.file_hasher import FileHasher
 from parseAndPopulate.models.schema_parts import SchemaParts
-from parseAndPopulate.modules import SdoModule, VendorModule
+from parseAndPopulate.modules import Module, SdoModule, VendorModule
+
+
+class ModuleJob(t.NamedTuple):
+    """Arguments of a single module construction, which can be done in a worker process."""
+    name: str
+    path: str
+    kwargs: dict
+    # Data needed by the grouping once the module is constructed
+    context: t.Any = None
+
+
+class SchemasSnapshot(Mapping):
+    """
+    Read only view of the schema URLs as they were when the module with the given index was constructed
+    by the serial parsing. Schema URLs are only ever added, so the view only needs to hide the URLs added
+    after the module's own URL.
+    """
+
+    def __init__(self, schemas: dict, positions: t.Dict[str, int], limit: int):
+        self._schemas = schemas
+        self._positions = positions
+        self._limit = limit
+
+    def __getitem__(self, name_revision: str) -> t.Optional[str]:
+        if self._positions.get(name_revision, self._limit) >= self._limit:
+            raise KeyError(name_revision)
+        return self._schemas[name_revision]
+
+    def __iter__(self):
+        return (name_revision for name_revision in self._schemas if name_revision in self)
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+
+_worker_schemas: dict = {}
+_worker_positions: t.Dict[str, int] = {}
+
+
+def _init_worker(schemas: dict, positions: t.Dict[str, int]):
+    global _worker_schemas, _worker_positions
+    _worker_schemas = schemas
+    _worker_positions = positions
+
+
+def _construct_module(module_cls: t.Type[Module], job: ModuleJob, schemas_limit: int, dir_paths: DirPaths) -> Module:
+    schemas = SchemasSnapshot(_worker_schemas, _worker_positions, schemas_limit)
+    # Already parsed modules are not known in the worker, so each module is parsed completely.
+    # Dumper only extends implementations of an already added module, so the result is the same.
+    module = module_cls(job.name, job.path, schemas, dir_paths, {}, **job.kwargs)
+    # Neither the parsed statements nor the schemas are needed any more and they would be pickled back
+    module._parsed_yang = None
+    module._schemas = None
+    return module
 
 
 class ModuleGrouping:
     """Base class for a grouping of modules to be parsed togeather."""
 
     def __init__(self, directory: str, dumper: Dumper, file_hasher: FileHasher,
-                 api: bool, dir_paths: DirPaths):
+                 api: bool, dir_paths: DirPaths, workers: int = 1):
         """
         Arguments:
             :param directory            (str) the directory containing the files
@@ -53,6 +110,8 @@ class ModuleGrouping:
             :param file_hasher          (FileHasher) FileHasher object
             :param api                  (bool) whether the request came from API or not
             :param dir_paths            (DirPaths) paths to various needed directories according to configuration
+            :param workers              (int) number of processes parsing the modules, modules are parsed
+                in the current process if 1
         """
 
         global LOGGER
@@ -64,6 +123,7 @@ class ModuleGrouping:
         self.api = api
         self.file_hasher = file_hasher
         self.directory = directory
+        self.workers = workers
         self._submodule_map = {}
         for submodule in Repo(dir_paths['yang_models']).submodules:
             url = submodule.url.replace(github_url, GITHUB_RAW).removesuffix('.git')
@@ -109,6 +169,44 @@ class ModuleGrouping:
     def parse_and_load(self):
         """Parse the modules and load the extracted data into the dumper."""
 
+    def _construct_modules(self, module_cls: t.Type[Module], jobs: t.Iterable[ModuleJob]) \
+            -> t.Iterator[t.Tuple[ModuleJob, t.Callable[[], Module]]]:
+        """
+        Construct modules described by the jobs. Yield each job together with a function returning
+        the constructed module, or raising the exception raised by its construction.
+
+        If there is a single worker, each module is constructed once its job is created, as the jobs
+        may update the schema URLs used by the following modules. Otherwise all the jobs are created first,
+        modules are constructed by a pool of processes and yielded in the order of their jobs,
+        each constructed with the schema URLs that were known when its job was created.
+        So the result is the same as if the modules were constructed serially.
+
+        Arguments:
+            :param module_cls   (Type[Module]) class of the constructed modules
+            :param jobs         (Iterable[ModuleJob]) arguments of the modules' construction
+        """
+        if self.workers <= 1:
+            for job in jobs:
+                yield job, partial(module_cls, job.name, job.path, self._schemas, self.dir_paths,
+                                   self.dumper.yang_modules, **job.kwargs)
+            return
+        jobs_with_limits = [(job, len(self._schemas)) for job in jobs]
+        if not jobs_with_limits:
+            return
+        positions = {name_revision: position for position, name_revision in enumerate(self._schemas)}
+        LOGGER.info('Parsing {} modules using {} workers'.format(len(jobs_with_limits), self.workers))
+        with ProcessPoolExecutor(self.workers, initializer=_init_worker,
+                                 initargs=(self._schemas, positions)) as executor:
+            futures = [executor.submit(_construct_module, module_cls, job, limit, self.dir_paths)
+                       for job, limit in jobs_with_limits]
+            for (job, _), future in zip(jobs_with_limits, futures):
+                yield job, partial(self._module_result, future)
+
+    def _module_result(self, future) -> Module:
+        module = future.result()
+        module._schemas = self._schemas
+        return module
+
     def _update_schema_urls(self, name: str, revision: str, path: str, schema_parts: SchemaParts):
         name_revision = '{}@{}'.format(name, revision)
         if name_revision in self._schemas:
@@ -147,9 +245,9 @@ class SdoDirectory(ModuleGrouping):
     """Regular SDO directory containing yang modules."""
 
     def __init__(self, directory: str, dumper: Dumper, file_hasher: FileHasher,
-                 api: bool, dir_paths: DirPaths, path_to_name_rev: dict):
+                 api: bool, dir_paths: DirPaths, path_to_name_rev: dict, workers: int = 1):
         self.path_to_name_rev = path_to_name_rev
-        super().__init__(directory, dumper, file_hasher, api, dir_paths)
+        super().__init__(directory, dumper, file_hasher, api, dir_paths, workers)
 
     def parse_and_load(self, repo: t.Optional[repoutil.RepoUtil] = None):
         """
@@ -167,6 +265,15 @@ class SdoDirectory(ModuleGrouping):
         self._dump_schema_cache()
 
     def _parse_and_load_api(self):
+        for job, construct in self._construct_modules(SdoModule, self._api_jobs()):
+            try:
+                yang = construct()
+            except ParseException:
+                LOGGER.exception('ParseException while parsing {}'.format(job.path))
+                continue
+            self.dumper.add_module(yang)
+
+    def _api_jobs(self) -> t.Iterator[ModuleJob]:
         LOGGER.debug('Parsing sdo files sent via API')
         commit_hash = None
         with open(os.path.join(self.dir_paths['json'], 'request-data.json'), 'r') as f:
@@ -201,15 +308,18 @@ class SdoDirectory(ModuleGrouping):
             schema_base = schema_parts.schema_base
             name, revision = self.path_to_name_rev[path]
             self._update_schema_urls(name, revision, path, schema_parts)
+            yield ModuleJob(name, path, {'aditional_info': sdo})
+
+    def _parse_and_load_not_api(self):
+        for job, construct in self._construct_modules(SdoModule, self._not_api_jobs()):
             try:
-                yang = SdoModule(name, path, self._schemas, self.dir_paths,
-                                 self.dumper.yang_modules, aditional_info=sdo)
+                yang = construct()
             except ParseException:
-                LOGGER.exception('ParseException while parsing {}'.format(path))
+                LOGGER.exception('ParseException while parsing {}'.format(job.path))
                 continue
             self.dumper.add_module(yang)
 
-    def _parse_and_load_not_api(self):
+    def _not_api_jobs(self) -> t.Iterator[ModuleJob]:
         LOGGER.debug('Parsing sdo files from directory')
         commit_hash = None
         self._load_yangmodels_repo()
@@ -237,25 +347,29 @@ class SdoDirectory(ModuleGrouping):
                 LOGGER.info('Parsing {} {} out of {}'.format(file_name, i, sdos_count))
                 name, revision = self.path_to_name_rev[path]
                 self._update_schema_urls(name, revision, path, schema_parts)
-                try:
-                    yang = SdoModule(name, path, self._schemas, self.dir_paths,
-                                     self.dumper.yang_modules)
-                except ParseException:
-                    LOGGER.exception('ParseException while parsing {}'.format(path))
-                    continue
-                self.dumper.add_module(yang)
+                yield ModuleJob(name, path, {})
 
 
 class IanaDirectory(SdoDirectory):
     """Directory containing IANA modules."""
 
     def __init__(self, directory: str, dumper: Dumper, file_hasher: FileHasher,
-                 api: bool, dir_paths: DirPaths, path_to_name_rev: dict):
-        super().__init__(directory, dumper, file_hasher, api, dir_paths, path_to_name_rev)
+                 api: bool, dir_paths: DirPaths, path_to_name_rev: dict, workers: int = 1):
+        super().__init__(directory, dumper, file_hasher, api, dir_paths, path_to_name_rev, workers)
         self.root = ET.parse(os.path.join(directory, 'yang-parameters.xml')).getroot()
 
     def parse_and_load(self):
         """Parse all IANA-maintained modules listed in the yang-parameters.xml file."""
+        for job, construct in self._construct_modules(SdoModule, self._iana_jobs()):
+            try:
+                yang = construct()
+            except ParseException:
+                LOGGER.exception('ParseException while parsing {}'.format(job.path))
+                continue
+            self.dumper.add_module(yang)
+        self._dump_schema_cache()
+
+    def _iana_jobs(self) -> t.Iterator[ModuleJob]:
         tag = self.root.tag
         namespace = tag.split('registry')[0]
         modules = self.root.iter('{}record'.format(namespace))
@@ -293,22 +407,15 @@ class IanaDirectory(SdoDirectory):
 
                 LOGGER.info('Parsing module {}'.format(name))
                 self._update_schema_urls(name, revision, path, schema_parts)
-                try:
-                    yang = SdoModule(data['name'], path, self._schemas, self.dir_paths,
-                                     self.dumper.yang_modules, additional_info)
-                except ParseException:
-                    LOGGER.exception('ParseException while parsing {}'.format(path))
-                    continue
-                self.dumper.add_module(yang)
-        self._dump_schema_cache()
+                yield ModuleJob(data['name'], path, {'aditional_info': additional_info})
 
 
 class VendorGrouping(ModuleGrouping):
 
     def __init__(self, directory: str, xml_file: str, dumper: Dumper, file_hasher: FileHasher,
-                 api: bool, dir_paths: DirPaths, name_rev_to_path: dict):
+                 api: bool, dir_paths: DirPaths, name_rev_to_path: dict, workers: int = 1):
         self.name_rev_to_path = name_rev_to_path
-        super().__init__(directory, dumper, file_hasher, api, dir_paths)
+        super().__init__(directory, dumper, file_hasher, api, dir_paths, workers)
 
         self.submodule_name = None
         self.found_capabilities = False
@@ -498,7 +605,30 @@ class VendorCapabilities(VendorGrouping):
             LOGGER.exception(f'Missing attribute, likely caused by a broken path in {self.directory}/platform-metadata.json')
 
         platform_name = self.platform_data[0].get('platform', '')
-        # Parse modules
+        jobs = self._capability_jobs(modules, platform_name, schema_parts)
+        for job, construct in self._construct_modules(VendorModule, jobs):
+            try:
+                try:
+                    yang = construct()
+                except ParseException:
+                    LOGGER.exception('ParseException while parsing {}'.format(job.path))
+                    continue
+                yang.add_vendor_information(self.platform_data, 'implement',
+                                            self.capabilities, self.netconf_versions)
+                self.dumper.add_module(yang)
+                key = '{}@{}/{}'.format(yang.name, yang.revision, yang.organization)
+                keys.add(key)
+                set_of_names.add(yang.name)
+            except FileNotFoundError:
+                LOGGER.warning('File {} not found in the repository'.format(job.name))
+
+        for key in keys:
+            self._parse_imp_inc(self.dumper.yang_modules[key].submodule, set_of_names, True, schema_parts)
+            self._parse_imp_inc(self.dumper.yang_modules[key].imports, set_of_names, False, schema_parts)
+        self._dump_schema_cache()
+
+    def _capability_jobs(self, modules: t.Iterable[ET.Element], platform_name: str,
+                         schema_parts: SchemaParts) -> t.Iterator[ModuleJob]:
         for module in modules:
             module.text = module.text or ''
             if 'module=' not in module.text:
@@ -523,26 +653,7 @@ class VendorCapabilities(VendorGrouping):
             if (name, revision) in self.name_rev_to_path:
                 path = self.name_rev_to_path[name, revision]
             self._update_schema_urls(name, revision, path, schema_parts)
-            try:
-                try:
-                    yang = VendorModule(name, path, self._schemas, self.dir_paths,
-                                        self.dumper.yang_modules, data=module_and_more)
-                except ParseException:
-                    LOGGER.exception('ParseException while parsing {}'.format(path))
-                    continue
-                yang.add_vendor_information(self.platform_data, 'implement',
-                                            self.capabilities, self.netconf_versions)
-                self.dumper.add_module(yang)
-                key = '{}@{}/{}'.format(yang.name, yang.revision, yang.organization)
-                keys.add(key)
-                set_of_names.add(yang.name)
-            except FileNotFoundError:
-                LOGGER.warning('File {} not found in the repository'.format(name))
-
-        for key in keys:
-            self._parse_imp_inc(self.dumper.yang_modules[key].submodule, set_of_names, True, schema_parts)
-            self._parse_imp_inc(self.dumper.yang_modules[key].imports, set_of_names, False, schema_parts)
-        self._dump_schema_cache()
+            yield ModuleJob(name, path, {'data': module_and_more})
 
 
 class VendorYangLibrary(VendorGrouping):
@@ -563,6 +674,29 @@ class VendorYangLibrary(VendorGrouping):
         schema_parts = SchemaParts(
             repo_owner=self.repo_owner, repo_name=self.repo_name,
             commit_hash=self.commit_hash, submodule_name=self.submodule_name)
+        for job, construct in self._construct_modules(VendorModule, self._yang_library_jobs(modules, schema_parts)):
+            conformance_type = job.context
+            try:
+                try:
+                    yang = construct()
+                except ParseException:
+                    LOGGER.exception('ParseException while parsing {}'.format(job.path))
+                    continue
+
+                yang.add_vendor_information(self.platform_data, conformance_type,
+                                            self.capabilities, self.netconf_versions)
+                self.dumper.add_module(yang)
+                keys.add('{}@{}/{}'.format(yang.name, yang.revision, yang.organization))
+                set_of_names.add(yang.name)
+            except FileNotFoundError:
+                LOGGER.warning('File {} not found in the repository'.format(job.name))
+
+        for key in keys:
+            self._parse_imp_inc(self.dumper.yang_modules[key].submodule, set_of_names, True, schema_parts)
+            self._parse_imp_inc(self.dumper.yang_modules[key].imports, set_of_names, False, schema_parts)
+        self._dump_schema_cache()
+
+    def _yang_library_jobs(self, modules: ET.Element, schema_parts: SchemaParts) -> t.Iterator[ModuleJob]:
         for yang in modules:
             if 'module-set-id' in yang.tag:
                 continue
@@ -600,23 +734,4 @@ class VendorYangLibrary(VendorGrouping):
             if (name, revision) in self.name_rev_to_path:
                 path = self.name_rev_to_path[name, revision]
             self._update_schema_urls(name, revision, path, schema_parts)
-            try:
-                try:
-                    yang = VendorModule(name, path, self._schemas, 
-                                        self.dir_paths, self.dumper.yang_modules, data=yang_lib_info)
-                except ParseException:
-                    LOGGER.exception('ParseException while parsing {}'.format(path))
-                    continue
-
-                yang.add_vendor_information(self.platform_data, conformance_type,
-                                            self.capabilities, self.netconf_versions)
-                self.dumper.add_module(yang)
-                keys.add('{}@{}/{}'.format(yang.name, yang.revision, yang.organization))
-                set_of_names.add(yang.name)
-            except FileNotFoundError:
-                LOGGER.warning('File {} not found in the repository'.format(name))
-
-        for key in keys:
-            self._parse_imp_inc(self.dumper.yang_modules[key].submodule, set_of_names, True, schema_parts)
-            self._parse_imp_inc(self.dumper.yang_modules[key].imports, set_of_names, False, schema_parts)
-        self._dump_schema_cache()
+            yield ModuleJob(name, path, {'data': yang_lib_info}, context=conformance_type)
@@ -26,7 +26,7 @@ import typing as t
 
 from utility import log, yangParser
 from utility.create_config import create_config
-from utility.util import get_yang, resolve_revision
+from utility.util import get_yang
 
 from parseAndPopulate.dir_paths import DirPaths
 from parseAndPopulate.models.dependency import Dependency
@@ -192,10 +192,8 @@ class VendorModule(Module):
                 if yang_file is None:
                     deviation['revision'] = '1970-01-01'
                 else:
-                    try:
-                        deviation['revision'] = resolve_revision(os.path.abspath(yang_file))
-                    except FileNotFoundError:
-                        deviation['revision'] = '1970-01-01'
+                    # Files in the save-file-dir are saved as <name>@<revision>.yang
+                    deviation['revision'] = yang_file.split('@')[-1].removesuffix('.yang')
                 self.deviations.append(deviation)
 
         elif isinstance(data, dict):  # dict parsed out from a ietf-yang-library file
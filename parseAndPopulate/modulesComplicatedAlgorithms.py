@@ -40,12 +40,14 @@ import requests
 from elasticsearchIndexing.pyang_plugin.json_tree import emit_tree as emit_json_tree
 from pyang import plugin
 from pyang.plugins.tree import emit_tree
+from redis.exceptions import RedisError
+from redisConnections.redis_comparisons_connection import CHECK_UPDATE_FROM, RedisComparisonsConnection
 from redisConnections.redisConnection import RedisConnection
 from utility import log, message_factory
 from utility.confdService import ConfdService
 from utility.staticVariables import json_headers
 from utility.util import (
-    context_check_update_from, fetch_module_by_schema, get_yang, revision_to_date
+    check_update_from_output, context_check_update_from, fetch_module_by_schema, get_yang, revision_to_date
 )
 from utility.yangParser import create_context
 
@@ -120,6 +122,7 @@ class ModulesComplicatedAlgorithms:
         self.json_ytree = json_ytree
         self._trees: dict[str, dict[str, str]] = defaultdict(dict)
         self._unavailable_modules = []
+        self._comparisons = RedisComparisonsConnection()
         LOGGER.info('get all existing modules')
         response = requests.get('{}/search/modules'.format(self._yangcatalog_api_prefix),
                                 headers=json_headers)
@@ -513,6 +516,13 @@ class ModulesComplicatedAlgorithms:
             else:
                 assert False
 
+        def store_update_from(new: ModuleSemverMetadata, old: ModuleSemverMetadata, output: str):
+            """Persist the check-update-from output, so the API service does not need to compute it again."""
+            try:
+                self._comparisons.set(CHECK_UPDATE_FROM, new.name, new.revision, old.name, old.revision, output)
+            except RedisError:
+                LOGGER.exception('Failed to store check-update-from output of {}@{}'.format(new.name, new.revision))
+
         def get_trees(new: ModuleSemverMetadata, old: ModuleSemverMetadata) -> t.Optional[t.Tuple[str, str]]:
             new_name_revision = '{}@{}'.format(new.name, new.revision)
             old_name_revision = '{}@{}'.format(old.name, old.revision)
@@ -527,6 +537,7 @@ class ModulesComplicatedAlgorithms:
                 ctx, new_schema_ctx = context_check_update_from(old_schema, new_schema,
                                                                 self._yang_models,
                                                                 self._save_file_dir)
+                store_update_from(new, old, check_update_from_output(ctx))
                 if len(ctx.errors) == 0:
                     if os.path.exists(new_tree_path) and os.path.exists(old_tree_path):
                         with open(new_tree_path) as nf, open(old_tree_path) as of:
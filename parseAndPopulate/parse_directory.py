@@ -28,6 +28,8 @@ __email__ = 'miroslav.kovac@pantheon.tech'
 
 import fnmatch
 import glob
+import hashlib
+import json
 import os
 import shutil
 import time
@@ -42,7 +44,7 @@ from parseAndPopulate.groupings import (IanaDirectory, SdoDirectory,
                                         VendorCapabilities, VendorYangLibrary)
 from utility.create_config import create_config
 from utility.scriptConfig import Arg, BaseScriptConfig
-from utility.util import parse_name, parse_revision, strip_comments, find_files
+from utility.util import resolve_name_revision
 
 
 class ScriptConfig(BaseScriptConfig):
@@ -96,6 +98,20 @@ class ScriptConfig(BaseScriptConfig):
                 'type': str,
                 'default': '/var/yang/all_modules'
             },
+            {
+                'flag': '--hard-link',
+                'help': 'Hard link the yang files to the save-file-dir instead of copying them '
+                        'if the file system allows it.',
+                'action': 'store_true',
+                'default': False
+            },
+            {
+                'flag': '--workers',
+                'help': 'Number of processes parsing the modules in parallel. Modules are parsed '
+                        'in the main process if set to 1.',
+                'type': int,
+                'default': 1
+            },
             {
                 'flag': '--config-path',
                 'help': 'Set path to config file',
@@ -131,12 +147,16 @@ def main(scriptConf=None):
                             args.save_file_hash, dir_paths['log'])
 
     LOGGER.info('Saving all yang files so the save-file-dir')
-    name_rev_to_path, path_to_name_rev = save_files(args.dir, dir_paths['save'])
+    # API runs parse a new temporary directory each time, which a manifest would never match
+    manifest_path = None
+    if args.save_file_hash and not args.api:
+        manifest_path = manifest_path_for(dir_paths['cache'], args.dir)
+    name_rev_to_path, path_to_name_rev = save_files(args.dir, dir_paths['save'], manifest_path, args.hard_link, LOGGER)
     LOGGER.info('Starting to iterate through files')
     if args.sdo:
-        parse_sdo(args.dir, dumper, file_hasher, args.api, dir_paths, path_to_name_rev, LOGGER)
+        parse_sdo(args.dir, dumper, file_hasher, args.api, dir_paths, path_to_name_rev, LOGGER, args.workers)
     else:
-        parse_vendor(args.dir, dumper, file_hasher, args.api, dir_paths, name_rev_to_path, LOGGER)
+        parse_vendor(args.dir, dumper, file_hasher, args.api, dir_paths, name_rev_to_path, LOGGER, args.workers)
     dumper.dump_modules(dir_paths['json'])
     dumper.dump_vendors(dir_paths['json'])
 
@@ -148,63 +168,126 @@ def main(scriptConf=None):
         file_hasher.dump_tmp_hashed_files_list(file_hasher.updated_hashes, dir_paths['json'])
 
 
-def save_files(search_directory: str, save_file_dir: str) -> t.Tuple[t.Dict[str, str], t.Dict[str, str]]:
+def save_files(search_directory: str, save_file_dir: str, manifest_path: t.Optional[str] = None,
+               hard_link: bool = False, logger: t.Optional[Logger] = None) \
+        -> t.Tuple[t.Dict[str, str], t.Dict[str, str]]:
     """
     Copy all found yang files to the save_file_dir.
     Return dicts with data containing the original locations of the files,
     which is later needed for parsing.
 
+    Files are saved only if the save_file_dir does not contain the name@revision yet.
+    If manifest_path is provided, the name and revision resolved from each file are stored in it together
+    with the file's modification time and size, so files which did not change since the last run are not read again.
+    Manifest only keeps the files found by this run, use manifest_path_for() to get a manifest per search directory.
+
     Arguments:
         :param search_directory                         (str) Directory to process
         :param save_file_dir                            (str) Directory to save yang files to
+        :param manifest_path                            (Optional[str]) Path to the json file with names and
+            revisions of the already processed files
+        :param hard_link                                (bool) Whether to hard link the files instead of copying them,
+            files are copied if the file system does not support it
+        :param logger                                   (Optional[Logger]) Logger to report the counts of the files to
         :return (name_rev_to_path, path_to_name_rev)    (Tuple[Dict[str, str], Dict[str, str]])
             name_rev_to_path: needed by parse_vendor()
             path_to_name_rev: needed by parse_sdo()
     """
+    manifest = _load_manifest(manifest_path) if manifest_path else {}
+    updated_manifest = {}
     name_rev_to_path = {}
     path_to_name_rev = {}
+    scanned = copied = linked = 0
     for yang_file in glob.glob(os.path.join(search_directory, '**/*.yang'), recursive=True):
-        with open(yang_file) as f:
-            text = f.read()
-            text = strip_comments(text)
-            name = parse_name(text)
-            revision = parse_revision(text)
-            save_file_path = os.path.join(save_file_dir, '{}@{}.yang'.format(name, revision))
-            # To construct and save a schema url, we need the original path, module name, and revision.
-            # SDO metadata only provides the path, vendor metadata only provides the name and revision.
-            # We need mappings both ways to retrieve the missing data.
-            name_rev_to_path[name, revision] = yang_file
-            path_to_name_rev[yang_file] = name, revision
-            if not os.path.exists(save_file_path):
+        scanned += 1
+        stat = os.stat(yang_file)
+        entry = manifest.get(yang_file)
+        if entry is not None and entry[:2] == [stat.st_mtime_ns, stat.st_size]:
+            name, revision = entry[2:]
+        else:
+            name, revision = resolve_name_revision(yang_file)
+        updated_manifest[yang_file] = [stat.st_mtime_ns, stat.st_size, name, revision]
+        save_file_path = os.path.join(save_file_dir, '{}@{}.yang'.format(name, revision))
+        # To construct and save a schema url, we need the original path, module name, and revision.
+        # SDO metadata only provides the path, vendor metadata only provides the name and revision.
+        # We need mappings both ways to retrieve the missing data.
+        name_rev_to_path[name, revision] = yang_file
+        path_to_name_rev[yang_file] = name, revision
+        if not os.path.exists(save_file_path):
+            if hard_link and _link_file(yang_file, save_file_path):
+                linked += 1
+            else:
                 shutil.copy(yang_file, save_file_path)
+                copied += 1
+    if manifest_path and updated_manifest != manifest:
+        _dump_manifest(manifest_path, updated_manifest)
+    if logger:
+        logger.info('Yang files scanned: {}, copied: {}, linked: {}, skipped: {}'.format(
+            scanned, copied, linked, scanned - copied - linked))
     return name_rev_to_path, path_to_name_rev
 
 
+def manifest_path_for(cache_dir: str, search_directory: str) -> str:
+    """ Return path to the save_files() manifest of the search directory in the cache directory. """
+    directory_hash = hashlib.sha1(os.path.realpath(search_directory).encode('utf-8')).hexdigest()
+    return os.path.join(cache_dir, 'save_files_manifest_{}.json'.format(directory_hash))
+
+
+def _link_file(src: str, dst: str) -> bool:
+    """ Hard link src to dst, return False if the file system does not allow it. """
+    try:
+        os.link(src, dst)
+    except FileExistsError:
+        return True
+    except OSError:
+        return False
+    return True
+
+
+def _load_manifest(path: str) -> t.Dict[str, list]:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _dump_manifest(path: str, manifest: t.Dict[str, list]):
+    tmp_path = '{}.{}.tmp'.format(path, os.getpid())
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, path)
+
+
 def parse_sdo(search_directory: str, dumper: Dumper, file_hasher: FileHasher, api: bool,
-              dir_paths: DirPaths, path_to_name_rev: dict, logger: Logger):
+              dir_paths: DirPaths, path_to_name_rev: dict, logger: Logger, workers: int = 1):
     """Parse all yang modules in an SDO directory."""
     logger.info('Parsing SDO directory {}'.format(search_directory))
     if os.path.isfile(os.path.join(search_directory, 'yang-parameters.xml')):
         logger.info('Found yang-parameters.xml file, parsing IANA directory')
-        grouping = IanaDirectory(search_directory, dumper, file_hasher, api, dir_paths, path_to_name_rev)
+        grouping = IanaDirectory(search_directory, dumper, file_hasher, api, dir_paths, path_to_name_rev,
+                                 workers=workers)
     else:
-        grouping = SdoDirectory(search_directory, dumper, file_hasher, api, dir_paths, path_to_name_rev)
+        grouping = SdoDirectory(search_directory, dumper, file_hasher, api, dir_paths, path_to_name_rev,
+                                workers=workers)
     grouping.parse_and_load()
 
 
 def parse_vendor(search_directory: str, dumper: Dumper, file_hasher: FileHasher, api: bool,
-                 dir_paths: DirPaths, name_rev_to_path: dict, logger: Logger):
+                 dir_paths: DirPaths, name_rev_to_path: dict, logger: Logger, workers: int = 1):
     """Parse all yang modules in a vendor directory."""
     for root, _, files in os.walk(search_directory):
         for basename in files:
             if fnmatch.fnmatch(basename, '*capabilit*.xml'):
                 path = os.path.join(root, basename)
                 logger.info(f'Found xml metadata file "{path}"')
-                grouping = VendorCapabilities(root, path, dumper, file_hasher, api, dir_paths, name_rev_to_path)
+                grouping = VendorCapabilities(root, path, dumper, file_hasher, api, dir_paths, name_rev_to_path,
+                                              workers=workers)
             elif fnmatch.fnmatch(basename, '*ietf-yang-library*.xml'):
                 path = os.path.join(root, basename)
                 logger.info(f'Found xml metadata file "{path}"')
-                grouping = VendorYangLibrary(root, path, dumper, file_hasher, api, dir_paths, name_rev_to_path)
+                grouping = VendorYangLibrary(root, path, dumper, file_hasher, api, dir_paths, name_rev_to_path,
+                                             workers=workers)
             else:
                 continue
             try:
@@ -45,13 +45,17 @@ import utility.log as log
 from parseAndPopulate import parse_directory
 from parseAndPopulate.file_hasher import FileHasher
 from parseAndPopulate.modulesComplicatedAlgorithms import ModulesComplicatedAlgorithms
+from redis import RedisError
+from redisConnections.redis_search_cache_connection import \
+    RedisSearchCacheConnection
 from redisConnections.redisConnection import RedisConnection
 from utility.confdService import ConfdService
 from utility.create_config import create_config
 from utility.message_factory import MessageFactory
 from utility.scriptConfig import Arg, BaseScriptConfig
 from utility.staticVariables import json_headers
-from utility.util import prepare_for_es_indexing, send_for_es_indexing
+from utility.util import (prepare_for_es_indexing, send_for_es_indexing,
+                          update_modules_metadata_in_es)
 
 
 class ScriptConfig(BaseScriptConfig):
@@ -127,6 +131,19 @@ class ScriptConfig(BaseScriptConfig):
                 'help': 'Skip running time-consuming complicated resolvers.',
                 'action': 'store_true',
                 'default': False
+            },
+            {
+                'flag': '--workers',
+                'help': 'Number of processes parsing the modules in parallel. Default: 1',
+                'type': int,
+                'default': 1
+            },
+            {
+                'flag': '--hard-link',
+                'help': 'Hard link the yang files to the save-file-dir instead of copying them '
+                        'if the file system allows it. Default: False',
+                'action': 'store_true',
+                'default': False
             }
         ]
         super().__init__(help, args, None if __name__ == '__main__' else [])
@@ -137,7 +154,7 @@ class Populate:
             self,
             args: Namespace,
             config: ConfigParser = create_config(),
-            redis_connection: RedisConnection = RedisConnection(),
+            redis_connection: t.Optional[RedisConnection] = None,
             confd_service: ConfdService = ConfdService(),
             message_factory: t.Optional[MessageFactory] = None,
     ):
@@ -158,7 +175,7 @@ class Populate:
         self.json_ytree = self.config.get('Directory-Section', 'json-ytree')
         self.yangcatalog_api_prefix = self.config.get('Web-Section', 'yangcatalog-api-prefix')
 
-        self.redis_connection = redis_connection
+        self.redis_connection = redis_connection or RedisConnection()
         self.confd_service = confd_service
         self.message_factory = message_factory
 
@@ -190,7 +207,9 @@ class Populate:
                 self.logger.info('Waiting for cache reload to finish')
                 self.process_reload_cache.join()
             else:
-                self._run_complicated_algorithms()
+                modules = modules + self._run_complicated_algorithms()
+            self._update_modules_metadata_in_es(modules)
+            self._invalidate_search_cache()
             self.logger.info(
                 (
                     f'Populate took {int(time.time() - self.start_time)} seconds with the main and '
@@ -226,7 +245,9 @@ class Populate:
                 ('save_file_dir', self.args.save_file_dir),
                 ('api', self.args.api),
                 ('sdo', self.args.sdo),
-                ('save_file_hash', not self.args.force_parsing)
+                ('save_file_hash', not self.args.force_parsing),
+                ('workers', self.args.workers),
+                ('hard_link', self.args.hard_link)
             )
             for attr, value in options:
                 setattr(script_conf.args, attr, value)
@@ -287,7 +308,7 @@ class Populate:
             )
         self.logger.info('Cache reloaded successfully')
 
-    def _run_complicated_algorithms(self):
+    def _run_complicated_algorithms(self) -> list:
         self.logger.info('Running ModulesComplicatedAlgorithms from populate.py script')
         recursion_limit = sys.getrecursionlimit()
         sys.setrecursionlimit(50000)
@@ -302,6 +323,24 @@ class Populate:
         sys.setrecursionlimit(recursion_limit)
         self.logger.info('Populating with new data of complicated algorithms')
         complicated_algorithms.populate()
+        return [revision for name in complicated_algorithms.new_modules.values() for revision in name.values()]
+
+    def _update_modules_metadata_in_es(self, modules: list):
+        """ Copy module-level fields of the changed modules, as merged in Redis, to their documents in Elasticsearch.
+        Documents of the new modules are indexed with them later by process-changed-mods.py.
+        """
+        module_keys = ['{}@{}/{}'.format(module['name'], module['revision'], module['organization'])
+                       for module in modules]
+        try:
+            update_modules_metadata_in_es(self.redis_connection, module_keys)
+        except Exception:
+            self.logger.exception('Failed to update metadata of the modules in Elasticsearch')
+
+    def _invalidate_search_cache(self):
+        try:
+            RedisSearchCacheConnection().increase_generation()
+        except RedisError:
+            self.logger.exception('Failed to invalidate cached search results')
 
     def _update_files_hashes(self):
         path = os.path.join(self.json_dir, 'temp_hashes.json')
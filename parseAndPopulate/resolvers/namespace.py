@@ -1,12 +1,10 @@
 import logging
-import os
 import typing as t
 
 from parseAndPopulate.resolvers.resolver import Resolver
 from pyang.statements import Statement
-from utility import yangParser
 from utility.staticVariables import MISSING_ELEMENT
-from utility.util import get_yang
+from utility.util import get_yang_metadata
 
 """ 
 This resolver resolves yang module 'namespace' property.
@@ -37,17 +35,15 @@ class NamespaceResolver(Resolver):
             return MISSING_ELEMENT
 
         self.logger.debug('Getting parent namespace - {} is a submodule'.format(self.name_revision))
-        yang_file = get_yang(self.belongs_to)
-        if yang_file is None:
+        parent = get_yang_metadata(self.belongs_to)
+        if parent is None:
             self.logger.error('Parent module not found - unable to resolve namespace')
             return MISSING_ELEMENT
 
-        try:
-            parsed_yang_parent = yangParser.parse(os.path.abspath(yang_file))
-            return parsed_yang_parent.search(self.property_name)[0].arg
-        except IndexError:
+        if parent.namespace is None:
             self.logger.error('Cannot parse out {} property'.format(self.property_name))
             return MISSING_ELEMENT
+        return parent.namespace
 
     def _resolve_module_namespace(self) -> str:
         try:
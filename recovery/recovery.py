@@ -159,11 +159,8 @@ class BackupDatabaseData(Recovery):
 
     def _backup_redis_modules(self):
         # Backup content of Redis into JSON file
-        redis_modules_raw = self.redis_connection.get_all_modules()
-        redis_vendors_raw = self.redis_connection.get_all_vendors()
-        redis_modules_dict = json.loads(redis_modules_raw)
-        redis_modules = [module for module in redis_modules_dict.values()]
-        redis_vendors = json.loads(redis_vendors_raw)
+        redis_modules = list(self.redis_connection.get_modules_data().values())
+        redis_vendors = self.redis_connection.get_vendors_dict()
 
         os.makedirs(self.redis_json_backup, exist_ok=True)
         with open(os.path.join(self.redis_json_backup, f'{self.args.file}.json'), 'w') as f:
@@ -200,9 +197,8 @@ class LoadDataFromBackupToDatabase(Recovery):
                 )
                 sys.exit()
             self.args.file = os.path.join(self.redis_json_backup, list_of_backups[-1])
-        redis_modules = self.redis_connection.get_all_modules()
-        yang_catalog_module = self.redis_connection.get_module(self.yang_catalog_module_name)
-        if '{}' in (redis_modules, yang_catalog_module):
+        if (not self.redis_connection.modules_data_exists()
+                or not self.redis_connection.get_module_dict(self.yang_catalog_module_name)):
             self._populate_data_from_redis_backup_to_redis()
 
     def _populate_data_from_redis_backup_to_redis(self):
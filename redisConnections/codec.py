@@ -0,0 +1,144 @@
+# Copyright The IETF Trust 2022, All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Encoding of the module and vendor records stored in Redis.
+Values encoded by msgpack or zstd compressed msgpack start with a header byte identifying the encoding.
+Plain JSON values have no header - they always start with a printable character,
+so records stored before the codec was introduced are still decoded correctly.
+Used encoding is selected by the 'redis-codec' config value, reading is independent on it.
+"""
+
+__copyright__ = 'Copyright The IETF Trust 2022, All Rights Reserved'
+__license__ = 'Apache License, Version 2.0'
+
+import json
+import threading
+import typing as t
+from configparser import ConfigParser
+
+import msgpack
+import zstandard
+
+JSON_CODEC = 'json'
+MSGPACK_CODEC = 'msgpack'
+ZSTD_CODEC = 'zstd'
+CODECS = (JSON_CODEC, MSGPACK_CODEC, ZSTD_CODEC)
+
+MSGPACK_HEADER = b'\x01'
+ZSTD_HEADER = b'\x02'
+ZSTD_DICTIONARY_HEADER = b'\x03'
+HEADERS = (MSGPACK_HEADER, ZSTD_HEADER, ZSTD_DICTIONARY_HEADER)
+DEFAULT_ZSTD_LEVEL = 3
+
+
+class RedisCodecError(Exception):
+    pass
+
+
+class RedisCodec:
+    """ Encoder and decoder of the values stored in Redis.
+    Zstd compressor and decompressor objects are not thread safe, so each thread creates its own.
+    """
+
+    def __init__(self, codec: str = JSON_CODEC, zstd_dictionary: t.Optional[bytes] = None,
+                 zstd_level: int = DEFAULT_ZSTD_LEVEL):
+        if codec not in CODECS:
+            raise RedisCodecError('Unknown Redis codec {}, use one of: {}'.format(codec, ', '.join(CODECS)))
+        self.codec = codec
+        self.zstd_level = zstd_level
+        self._zstd_dictionary = zstandard.ZstdCompressionDict(zstd_dictionary) if zstd_dictionary else None
+        self._local = threading.local()
+
+    def encode(self, data: t.Any) -> bytes:
+        """ Encode 'data' using the configured codec. """
+        if self.codec == JSON_CODEC:
+            return json.dumps(data).encode('utf-8')
+        packed = msgpack.packb(data, use_bin_type=True)
+        if self.codec == MSGPACK_CODEC:
+            return MSGPACK_HEADER + packed
+        header = ZSTD_HEADER if self._zstd_dictionary is None else ZSTD_DICTIONARY_HEADER
+        return header + self._compressor().compress(packed)
+
+    def decode(self, raw: t.Union[bytes, str, None]) -> t.Any:
+        """ Decode value read from Redis. Encoding is detected from the header byte, so values encoded
+        by any codec can be decoded. None is returned if there is no value.
+        """
+        if raw is None:
+            return None
+        if isinstance(raw, str):
+            return json.loads(raw)
+        header = raw[:1]
+        if header == MSGPACK_HEADER:
+            return msgpack.unpackb(raw[1:], raw=False)
+        if header == ZSTD_HEADER:
+            return msgpack.unpackb(self._decompressor(False).decompress(raw[1:]), raw=False)
+        if header == ZSTD_DICTIONARY_HEADER:
+            return msgpack.unpackb(self._decompressor(True).decompress(raw[1:]), raw=False)
+        return json.loads(raw)
+
+    def to_json(self, raw: t.Union[bytes, str, None], default: str = '{}') -> str:
+        """ Return value read from Redis as JSON string. JSON values are returned without decoding them.
+
+        Arguments:
+            :param raw      (bytes) value read from Redis
+            :param default  (str) JSON string returned if there is no value
+            :return         (str) JSON string
+        """
+        if raw is None:
+            return default
+        if isinstance(raw, str):
+            return raw
+        if raw[:1] in HEADERS:
+            return json.dumps(self.decode(raw))
+        return raw.decode('utf-8')
+
+    def _compressor(self) -> zstandard.ZstdCompressor:
+        compressor = getattr(self._local, 'compressor', None)
+        if compressor is None:
+            compressor = zstandard.ZstdCompressor(level=self.zstd_level, dict_data=self._zstd_dictionary)
+            self._local.compressor = compressor
+        return compressor
+
+    def _decompressor(self, with_dictionary: bool) -> zstandard.ZstdDecompressor:
+        attribute = 'dictionary_decompressor' if with_dictionary else 'decompressor'
+        decompressor = getattr(self._local, attribute, None)
+        if decompressor is None:
+            if with_dictionary and self._zstd_dictionary is None:
+                raise RedisCodecError('Value is compressed with zstd dictionary, but no dictionary is configured')
+            decompressor = zstandard.ZstdDecompressor(dict_data=self._zstd_dictionary if with_dictionary else None)
+            setattr(self._local, attribute, decompressor)
+        return decompressor
+
+
+_codecs: t.Dict[t.Tuple[str, str, int], RedisCodec] = {}
+_codecs_lock = threading.Lock()
+
+
+def get_codec(config: ConfigParser) -> RedisCodec:
+    """ Return codec configured by the 'redis-codec', 'redis-zstd-dictionary' and 'redis-zstd-level' config values.
+    Codecs are shared within the process, so the dictionary file is only read once.
+    """
+    codec = config.get('DB-Section', 'redis-codec', fallback=JSON_CODEC)
+    dictionary_path = config.get('DB-Section', 'redis-zstd-dictionary', fallback='')
+    level = int(config.get('DB-Section', 'redis-zstd-level', fallback=DEFAULT_ZSTD_LEVEL))
+    key = (codec, dictionary_path, level)
+    with _codecs_lock:
+        if key not in _codecs:
+            dictionary = None
+            if dictionary_path:
+                with open(dictionary_path, 'rb') as f:
+                    dictionary = f.read()
+            _codecs[key] = RedisCodec(codec, dictionary, level)
+        return _codecs[key]
@@ -20,17 +20,29 @@ __email__ = 'slavomir.mazur@pantheon.tech'
 
 import json
 import os
+import time
 import typing as t
 from urllib.parse import quote, unquote
 
 import utility.log as log
 from redis import Redis
+from redisConnections.codec import RedisCodec, get_codec
+from redisConnections.redis_pool import get_redis
 from utility.create_config import create_config
 
 DEFAULT_VALUES = {
     'compilation-status': 'unknown',
     'compilation-result': ''
 }
+DEFAULT_POPULATE_BATCH_SIZE = 500
+# Hash of all the modules stored under their keys, maintained incrementally on each module change
+MODULES_DATA_KEY = 'modules-data'
+MODULES_DATA_GENERATION_KEY = 'modules-data:generation'
+VENDORS_DATA_KEY = 'vendors-data'
+# Sets of child names for each level of the vendor -> platform -> software-version -> software-flavor hierarchy,
+# stored under 'vendors-index:<quoted path of the parent>', root level under 'vendors-index' itself
+VENDORS_INDEX_KEY = 'vendors-index'
+VENDOR_LEVELS = ('vendor', 'platform', 'software-version', 'software-flavor')
 
 
 class RedisConnection:
@@ -39,15 +51,18 @@ class RedisConnection:
                  vendors_db: t.Optional[t.Union[int, str]] = None):
         config = create_config()
         self.log_directory = config.get('Directory-Section', 'logs')
-        self._redis_host = config.get('DB-Section', 'redis-host')
-        self._redis_port = int(config.get('DB-Section', 'redis-port'))
         if modules_db is None:
             modules_db = config.get('DB-Section', 'redis-modules-db', fallback=1)
         if vendors_db is None:
             vendors_db = config.get('DB-Section', 'redis-vendors-db', fallback=4)
-        self.modulesDB = Redis(host=self._redis_host, port=self._redis_port, db=modules_db)  # pyright: ignore
-        self.vendorsDB = Redis(host=self._redis_host, port=self._redis_port, db=vendors_db)  # pyright: ignore
-        self.temp_modulesDB = Redis(host=self._redis_host, port=self._redis_port, db=5)
+        self.populate_batch_size = int(
+            config.get('DB-Section', 'redis-populate-batch-size', fallback=DEFAULT_POPULATE_BATCH_SIZE)
+        )
+        self.modulesDB: Redis = get_redis(modules_db, config)
+        self.vendorsDB: Redis = get_redis(vendors_db, config)
+        self.temp_modulesDB: Redis = get_redis(5, config)
+        self.codec: RedisCodec = get_codec(config)
+        self._modules_data_checked = False
 
         self.LOGGER = log.get_logger('redisModules', os.path.join(self.log_directory, 'redisModulesConnection.log'))
 
@@ -87,45 +102,137 @@ class RedisConnection:
 
         return existing_module
 
-    def populate_modules(self, new_modules: list):
+    def populate_modules(self, new_modules: list, batch_size: t.Optional[int] = None):
         """ Merge new data of each module in 'new_modules' list with existing data already stored in Redis.
         Set updated data to Redis under created key in format: <name>@<revision>/<organization>
+        Modules are processed in batches - existing and temporary data of the whole batch are fetched at once
+        with MGET, merged locally and written back in a single transaction.
 
-        Argument:
+        Arguments:
             :param new_modules  (list) list of modules which need to be stored into Redis cache
+            :param batch_size   (int) Optional - number of modules processed at once,
+                'redis-populate-batch-size' config value is used by default
         """
-        new_merged_modules = {}
-
-        for new_module in new_modules:
-            redis_key = self._create_module_key(new_module)
-            redis_module = self.get_module(redis_key)
-            temp_module_data = self.get_temp_module(redis_key)
-            if redis_module == '{}':
-                updated_module = new_module
-            else:
-                updated_module = self.update_module_properties(new_module, json.loads(redis_module))
+        batch_size = batch_size or self.populate_batch_size
+        for start in range(0, len(new_modules), batch_size):
+            start_time = time.perf_counter()
+            batch = new_modules[start:start + batch_size]
+            redis_keys = [self._create_module_key(new_module) for new_module in batch]
+            unique_keys = list(dict.fromkeys(redis_keys))
+            merged_modules = {
+                redis_key: module
+                for redis_key, module in zip(unique_keys, map(self.codec.decode, self.modulesDB.mget(unique_keys)))
+                if module
+            }
+            temp_modules = {
+                redis_key: module
+                for redis_key, module in zip(unique_keys, map(self.codec.decode, self.temp_modulesDB.mget(unique_keys)))
+                if module
+            }
+            temp_keys_to_delete = list(temp_modules.keys())
+
+            for redis_key, new_module in zip(redis_keys, batch):
+                existing_module = merged_modules.get(redis_key)
+                if existing_module is None:
+                    updated_module = new_module
+                else:
+                    updated_module = self.update_module_properties(new_module, existing_module)
+                temp_module = temp_modules.pop(redis_key, None)
+                if temp_module is not None:
+                    updated_module = self.update_module_properties(temp_module, updated_module)
+                merged_modules[redis_key] = updated_module
+
+            encoded_modules = {redis_key: self.codec.encode(merged_modules[redis_key]) for redis_key in unique_keys}
+            self._ensure_modules_data_hash()
+            pipeline = self.modulesDB.pipeline(transaction=True)
+            pipeline.mset(encoded_modules)
+            pipeline.hset(MODULES_DATA_KEY, mapping=encoded_modules)
+            pipeline.incr(MODULES_DATA_GENERATION_KEY)
+            pipeline.execute()
+            if temp_keys_to_delete:
+                self.delete_temporary(temp_keys_to_delete)
+            self.LOGGER.info('Batch of {} modules populated in {:.3f} seconds'
+                             .format(len(unique_keys), time.perf_counter() - start_time))
+
+    def get_all_modules(self) -> str:
+        """ Return JSON string of the modules-data aggregate - dict of all the modules stored under their keys.
+        Values stored in the hash as JSON are only joined without decoding.
+        """
+        data = self.modulesDB.hgetall(MODULES_DATA_KEY)
+        items = (
+            '{}: {}'.format(json.dumps(key.decode('utf-8')), self.codec.to_json(value)) for key, value in data.items()
+        )
+        return '{{{}}}'.format(', '.join(items))
+
+    def iter_modules_json(self, batch_size: t.Optional[int] = None) -> t.Iterator[t.List[str]]:
+        """ Iterate over the modules-data aggregate using HSCAN and yield JSON strings of the modules in batches,
+        so the whole aggregate never has to be held in memory. Values stored as JSON are yielded without decoding.
+        Empty batches are skipped, so no batch is yielded if the aggregate is empty.
 
-            if temp_module_data != '{}':
-                updated_module = self.update_module_properties(json.loads(temp_module_data), updated_module)
-                self.delete_temporary([redis_key])
+        Argument:
+            :param batch_size   (int) Optional - number of modules requested by each HSCAN call,
+                'redis-populate-batch-size' config value is used by default
+            :return             (Iterator) iterator of lists of JSON strings
+        """
+        batch_size = batch_size or self.populate_batch_size
+        # HSCAN can return the same field more than once if the hash is resized during the iteration
+        seen_keys = set()
+        cursor = 0
+        while True:
+            cursor, data = self.modulesDB.hscan(MODULES_DATA_KEY, cursor, count=batch_size)
+            batch = [self.codec.to_json(value) for key, value in data.items() if key not in seen_keys]
+            seen_keys.update(data.keys())
+            if batch:
+                yield batch
+            if not cursor:
+                break
 
-            self.set_redis_module(updated_module, redis_key)
-            new_merged_modules[redis_key] = updated_module
+    def get_modules_data(self) -> t.Dict[str, dict]:
+        """ Return decoded modules-data aggregate - dict of all the modules stored under their keys. """
+        data = self.modulesDB.hgetall(MODULES_DATA_KEY)
+        return {key.decode('utf-8'): self.codec.decode(value) for key, value in data.items()}
 
-    def get_all_modules(self):
-        data = self.modulesDB.get('modules-data')
-        return (data or b'{}').decode('utf-8')
+    def modules_data_exists(self) -> bool:
+        return self.modulesDB.type(MODULES_DATA_KEY) == b'hash'
+
+    def get_modules_data_generation(self) -> t.Optional[int]:
+        """ Return the generation counter of the 'modules-data' aggregate.
+        Counter is incremented each time the aggregate changes, so readers holding a decoded copy
+        of the aggregate can cheaply check whether their copy is still up to date.
+        None is returned if the counter was not set yet.
+        """
+        data = self.modulesDB.get(MODULES_DATA_GENERATION_KEY)
+        return None if data is None else int(data)
 
     def get_module(self, key: str):
         data = self.modulesDB.get(key)
-        return (data or b'{}').decode('utf-8')
+        return self.codec.to_json(data)
+
+    def get_module_dict(self, key: str) -> dict:
+        """ Return decoded module stored under the 'key', empty dict if there is no such module.
+        Use get_module() only to pass the module on as a JSON string.
+        """
+        return self.codec.decode(self.modulesDB.get(key)) or {}
+
+    def get_modules(self, keys: t.List[str]) -> t.List[t.Optional[dict]]:
+        """ Return decoded modules stored under the 'keys' using a single MGET, None for the missing ones. """
+        if not keys:
+            return []
+        return [self.codec.decode(data) for data in self.modulesDB.mget(keys)]
 
     def get_temp_module(self, key: str):
         data = self.temp_modulesDB.get(key)
-        return (data or b'{}').decode('utf-8')
+        return self.codec.to_json(data)
 
     def set_redis_module(self, module: dict, redis_key: str):
-        result = self.modulesDB.set(redis_key, json.dumps(module))
+        """ Store module under 'redis_key' and update its entry in the modules-data aggregate. """
+        encoded_module = self.codec.encode(module)
+        self._ensure_modules_data_hash()
+        pipeline = self.modulesDB.pipeline()
+        pipeline.set(redis_key, encoded_module)
+        pipeline.hset(MODULES_DATA_KEY, redis_key, encoded_module)
+        pipeline.incr(MODULES_DATA_GENERATION_KEY)
+        result = pipeline.execute()[0]
         if result:
             self.LOGGER.info('{} key updated'.format(redis_key))
         else:
@@ -134,23 +241,55 @@ class RedisConnection:
         return result
 
     def reload_modules_cache(self):
+        """ Rebuild the whole modules-data aggregate from the individual module keys.
+        Aggregate is maintained incrementally, so a full rebuild is only needed to repair it
+        or to convert it from the previous format. New aggregate is built under a temporary key
+        and renamed at the end, so readers never see a partially built aggregate.
+        """
+        temp_key = '{}:rebuild'.format(MODULES_DATA_KEY)
+        self.modulesDB.delete(temp_key)
         modules_data = {}
         for key in self.modulesDB.scan_iter():
             redis_key = key.decode('utf-8')
-            if redis_key != 'modules-data' and ':' not in redis_key:
-                modules_data[redis_key] = json.loads(self.get_module(redis_key))
-        result = self.set_redis_module(modules_data, 'modules-data')
+            if redis_key != MODULES_DATA_KEY and ':' not in redis_key:
+                modules_data[redis_key] = self.modulesDB.get(redis_key) or self.codec.encode({})
+        pipeline = self.modulesDB.pipeline()
+        if modules_data:
+            pipeline.hset(temp_key, mapping=modules_data)
+            pipeline.rename(temp_key, MODULES_DATA_KEY)
+        else:
+            pipeline.delete(MODULES_DATA_KEY)
+        pipeline.incr(MODULES_DATA_GENERATION_KEY)
+        pipeline.execute()
+        self.LOGGER.info('{} aggregate rebuilt with {} modules'.format(MODULES_DATA_KEY, len(modules_data)))
 
-        return result
+        return True
 
     def delete_modules(self, modules_keys: list):
-        result = self.modulesDB.delete(*modules_keys)
+        """ Delete modules stored under 'modules_keys' together with their modules-data aggregate entries. """
+        self._ensure_modules_data_hash()
+        pipeline = self.modulesDB.pipeline()
+        pipeline.delete(*modules_keys)
+        pipeline.hdel(MODULES_DATA_KEY, *modules_keys)
+        pipeline.incr(MODULES_DATA_GENERATION_KEY)
+        result = pipeline.execute()[0]
         return result
 
+    def _ensure_modules_data_hash(self):
+        """ Convert the modules-data aggregate stored in the previous format - a single JSON string,
+        so that the writes to its hash fields do not fail with WRONGTYPE, e.g. when populate runs
+        after an upgrade before the API rebuilds the aggregate. Type is checked once per connection.
+        """
+        if self._modules_data_checked:
+            return
+        if self.modulesDB.type(MODULES_DATA_KEY) not in (b'hash', b'none'):
+            self.LOGGER.warning('{} aggregate is stored in the previous format, rebuilding it'.format(MODULES_DATA_KEY))
+            self.reload_modules_cache()
+        self._modules_data_checked = True
+
     def delete_dependent(self, redis_key: str, dependent_name: str):
         result = False
-        redis_module_raw = self.get_module(redis_key)
-        redis_module = json.loads(redis_module_raw)
+        redis_module = self.codec.decode(self.modulesDB.get(redis_key)) or {}
         dependents_list = redis_module.get('dependents', [])
         dependent_to_remove = None
         for dependent in dependents_list:
@@ -166,8 +305,7 @@ class RedisConnection:
     def delete_implementation(self, redis_key: str, implemntation_key: str):
         impl_param_names = ['vendor', 'platform', 'software-version', 'software-flavor']
         result = False
-        redis_module_raw = self.get_module(redis_key)
-        redis_module = json.loads(redis_module_raw)
+        redis_module = self.codec.decode(self.modulesDB.get(redis_key)) or {}
         implementations = redis_module.get('implementations', {}).get('implementation', [])
         for impl in implementations:
             imp_data = [impl[prop] for prop in impl_param_names]
@@ -182,8 +320,7 @@ class RedisConnection:
     def delete_expires(self, module: dict):
         result = False
         redis_key = self._create_module_key(module)
-        redis_module_raw = self.get_module(redis_key)
-        redis_module = json.loads(redis_module_raw)
+        redis_module = self.codec.decode(self.modulesDB.get(redis_key)) or {}
         redis_module.pop('expires', None)
         result = self.set_redis_module(redis_module, redis_key)
 
@@ -202,17 +339,24 @@ class RedisConnection:
 
     # VENDORS DATABASE COMMUNICATION ###
     def get_all_vendors(self):
-        data = self.vendorsDB.get('vendors-data')
-        return (data or b'{}').decode('utf-8')
+        data = self.vendorsDB.get(VENDORS_DATA_KEY)
+        return self.codec.to_json(data)
+
+    def get_vendors_dict(self) -> dict:
+        """ Return decoded vendors-data aggregate, empty dict if it is not stored.
+        Use get_all_vendors() only to pass the vendors on as a JSON string.
+        """
+        return self.codec.decode(self.vendorsDB.get(VENDORS_DATA_KEY)) or {}
 
     def get_implementation(self, key: str):
         data = self.vendorsDB.get(key)
-        return (data or b'{}').decode('utf-8')
+        return self.codec.to_json(data)
 
     def populate_implementation(self, new_implemenetation: list):
         """ Merge new data of each implementaion in 'new_implementaions' list with existing data already stored in Redis.
         Set updated data to Redis under created key in format:
         <vendors>/<platform>/<software-version>/<software-flavor>
+        and add each part of the key to the vendors index.
 
         Argument:
             :param new_implemenetation  (list) list of modules which need to be stored into Redis cache
@@ -235,56 +379,154 @@ class RedisConnection:
                             data[key]['modules'] = {'module': []}
                         data[key]['modules']['module'] += software_flavor.get('modules', {}).get('module', [])
 
-        for key, new_data in data.items():
-            existing_json = self.get_implementation(key)
-            if existing_json == '{}':
-                merged_data = new_data
-            else:
-                existing_data = json.loads(existing_json)
-                self.merge_data(existing_data.get('modules'), new_data.get('modules'))
-                merged_data = existing_data
-            self.vendorsDB.set(key, json.dumps(merged_data))
+        self._ensure_vendors_index()
+        keys = list(data.keys())
+        for start in range(0, len(keys), self.populate_batch_size):
+            batch_keys = keys[start:start + self.populate_batch_size]
+            pipeline = self.vendorsDB.pipeline(transaction=False)
+            for key, existing_data in zip(batch_keys, map(self.codec.decode, self.vendorsDB.mget(batch_keys))):
+                new_data = data[key]
+                if not existing_data:
+                    merged_data = new_data
+                else:
+                    self.merge_data(existing_data.get('modules'), new_data.get('modules'))
+                    merged_data = existing_data
+                pipeline.set(key, self.codec.encode(merged_data))
+                self._add_to_vendors_index(pipeline, key)
+            pipeline.execute()
 
     def reload_vendors_cache(self):
+        self.rebuild_vendors_index()
         vendors_data = self.create_vendors_data_dict()
 
-        self.vendorsDB.set('vendors-data', json.dumps({'vendor': vendors_data}))
+        self.vendorsDB.set(VENDORS_DATA_KEY, self.codec.encode({'vendor': vendors_data}))
 
     def create_vendors_data_dict(self, searched_key: str = '') -> list:
-        vendors_data = {'yang-catalog:vendor': []}
-        for vendor_key in self.vendorsDB.scan_iter():
-            key = vendor_key.decode('utf-8')
-            if key != 'vendors-data' and searched_key in key:
+        """ Create list of vendors with all their platforms, software-versions and software-flavors
+        stored under the 'searched_key' path. Only keys of the searched subtree are read using vendors index.
+
+        Argument:
+            :param searched_key     (str) Optional - quoted path in format <vendor>/<platform>/<software-version>/<software-flavor>,
+                any number of trailing parts can be omitted
+            :return                 (list) list of vendors in the searched subtree
+        """
+        parts = [part for part in searched_key.split('/') if part]
+        keys = self.get_implementation_keys(parts)
+        tree = {}
+        for start in range(0, len(keys), self.populate_batch_size):
+            batch_keys = keys[start:start + self.populate_batch_size]
+            for key, data in zip(batch_keys, self.vendorsDB.mget(batch_keys)):
                 try:
-                    data = self.vendorsDB.get(key)
-                    redis_vendors_raw = (data or b'{}').decode('utf-8')
-                    redis_vendor_data = json.loads(redis_vendors_raw)
-                    vendor_name, platform_name, software_version_name, software_flavor_name = \
-                        (unquote(part) for part in key.split('/'))
-                    # Build up an object from bottom
-                    software_flavor = {'name': software_flavor_name, **redis_vendor_data}
-                    software_version = {'name': software_version_name, 'software-flavors': {'software-flavor': [software_flavor]}}
-                    platform = {'name': platform_name, 'software-versions': {'software-version': [software_version]}}
-                    vendor = {'name': vendor_name, 'platforms': {'platform': [platform]}}
-                    new_data = {'yang-catalog:vendor': [vendor]}
-                    self.merge_data(vendors_data, new_data)
+                    redis_vendor_data = self.codec.decode(data) or {}
+                    *parent_names, software_flavor_name = (unquote(part) for part in key.split('/'))
+                    node = tree
+                    for name in parent_names:
+                        node = node.setdefault(name, {})
+                    node[software_flavor_name] = {'name': software_flavor_name, **redis_vendor_data}
                 except Exception:
                     self.LOGGER.exception('Problem while creating vendor dict')
                     continue
-        return vendors_data['yang-catalog:vendor']
+        return self._vendors_tree_to_list(tree)
+
+    def get_implementation_keys(self, parts: t.List[str]) -> t.List[str]:
+        """ Return keys of all the software-flavors in the subtree defined by quoted 'parts' of the path.
+        Vendors index is traversed level by level, one pipelined request is sent per level.
+
+        Argument:
+            :param parts    (list) quoted vendor, platform, software-version and software-flavor names,
+                any number of trailing parts can be omitted
+            :return         (list) list of keys in format <vendor>/<platform>/<software-version>/<software-flavor>
+        """
+        self._ensure_vendors_index()
+        if parts and not self.vendorsDB.sismember(self._vendors_index_key(parts[:-1]), parts[-1]):
+            return []
+        nodes = [parts]
+        for _ in range(len(parts), len(VENDOR_LEVELS)):
+            pipeline = self.vendorsDB.pipeline(transaction=False)
+            for node in nodes:
+                pipeline.smembers(self._vendors_index_key(node))
+            nodes = [
+                [*node, child.decode('utf-8')]
+                for node, children in zip(nodes, pipeline.execute())
+                for child in sorted(children)
+            ]
+        return ['/'.join(node) for node in nodes]
+
+    def vendor_path_exists(self, parts: t.List[str]) -> bool:
+        """ Check whether the path defined by quoted 'parts' exists in the vendors index. """
+        if not parts:
+            return True
+        self._ensure_vendors_index()
+        return bool(self.vendorsDB.sismember(self._vendors_index_key(parts[:-1]), parts[-1]))
+
+    def rebuild_vendors_index(self):
+        """ Recreate the whole vendors index from the implementation keys stored in Redis. """
+        pipeline = self.vendorsDB.pipeline()
+        index_keys = list(self.vendorsDB.scan_iter(match='{}*'.format(VENDORS_INDEX_KEY)))
+        if index_keys:
+            pipeline.delete(*index_keys)
+        for vendor_key in self.vendorsDB.scan_iter():
+            key = vendor_key.decode('utf-8')
+            if key != VENDORS_DATA_KEY and ':' not in key and not key.startswith(VENDORS_INDEX_KEY):
+                self._add_to_vendors_index(pipeline, key)
+        pipeline.execute()
 
     def delete_vendor(self, vendor_key: str):
-        result = 0
-        keys_to_delete = []
-        for key in self.vendorsDB.scan_iter():
-            redis_key = key.decode('utf-8')
-            if vendor_key in redis_key:
-                keys_to_delete.append(redis_key)
+        """ Delete all the software-flavors in the subtree defined by the quoted 'vendor_key' path
+        and remove the subtree from the vendors index.
 
-        if keys_to_delete:
-            result = self.vendorsDB.delete(*keys_to_delete)
+        Argument:
+            :param vendor_key   (str) quoted path in format <vendor>/<platform>/<software-version>/<software-flavor>,
+                any number of trailing parts can be omitted
+            :return             (int) number of deleted software-flavors
+        """
+        parts = [part for part in vendor_key.split('/') if part]
+        keys_to_delete = self.get_implementation_keys(parts)
+        if not keys_to_delete:
+            return 0
+
+        index_keys_to_delete = set()
+        for key in keys_to_delete:
+            key_parts = key.split('/')
+            for level in range(len(parts), len(VENDOR_LEVELS)):
+                index_keys_to_delete.add(self._vendors_index_key(key_parts[:level]))
+        pipeline = self.vendorsDB.pipeline()
+        pipeline.delete(*keys_to_delete)
+        if index_keys_to_delete:
+            pipeline.delete(*index_keys_to_delete)
+        if parts:
+            pipeline.srem(self._vendors_index_key(parts[:-1]), parts[-1])
+        result = pipeline.execute()[0]
+
+        # Remove parents which were left without any children
+        for level in range(len(parts) - 1, 0, -1):
+            if self.vendorsDB.scard(self._vendors_index_key(parts[:level])):
+                break
+            self.vendorsDB.srem(self._vendors_index_key(parts[:level - 1]), parts[level - 1])
         return result
 
+    def _ensure_vendors_index(self):
+        if not self.vendorsDB.exists(VENDORS_INDEX_KEY):
+            self.rebuild_vendors_index()
+
+    def _add_to_vendors_index(self, pipeline, key: str):
+        parts = key.split('/')
+        for level, part in enumerate(parts):
+            pipeline.sadd(self._vendors_index_key(parts[:level]), part)
+
+    def _vendors_index_key(self, parts: t.List[str]) -> str:
+        return '{}:{}'.format(VENDORS_INDEX_KEY, '/'.join(parts)) if parts else VENDORS_INDEX_KEY
+
+    def _vendors_tree_to_list(self, tree: dict, level: int = 0) -> list:
+        """ Convert nested dictionaries of names into the vendors data structure. """
+        if level == len(VENDOR_LEVELS) - 1:
+            return list(tree.values())
+        child_level = VENDOR_LEVELS[level + 1]
+        return [
+            {'name': name, '{}s'.format(child_level): {child_level: self._vendors_tree_to_list(subtree, level + 1)}}
+            for name, subtree in tree.items()
+        ]
+
     def merge_data(self, old: dict, new: dict):
         # we're expecting a dict in this shape: {<some string>: [...]}
         data_type, old_data_list = next(iter(old.items()))
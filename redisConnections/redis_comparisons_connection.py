@@ -0,0 +1,72 @@
+# Copyright The IETF Trust 2022, All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Store of the comparisons between two revisions of the yang modules, e.g. outputs of the
+check-update-from, diff-tree and diff-file services. Outputs for one pair of the modules are stored
+in a single Redis hash 'comparison:<pyang version>:<name1>@<revision1>:<name2>@<revision2>'
+with a field per service. Yang files of the name@revision are never changed, so stored outputs
+only depend on the pyang version, which is therefore part of the key.
+Pairs of the modules come from the request parameters, so each hash expires after the configured time
+since its last update to keep the number of stored comparisons bounded.
+"""
+
+__copyright__ = 'Copyright The IETF Trust 2022, All Rights Reserved'
+__license__ = 'Apache License, Version 2.0'
+
+import os
+import typing as t
+
+import pyang
+from redis import Redis
+
+import utility.log as log
+from redisConnections.redis_pool import get_redis
+from utility.create_config import create_config
+
+CHECK_UPDATE_FROM = 'check-update-from'
+DIFF_FILE = 'diff-file'
+DIFF_TREE = 'diff-tree'
+DEFAULT_TTL = 7 * 24 * 60 * 60
+
+
+class RedisComparisonsConnection:
+
+    def __init__(self, db: t.Optional[t.Union[int, str]] = None):
+        config = create_config()
+        if db is None:
+            db = config.get('DB-Section', 'redis-comparisons-db', fallback=6)
+        self.redis: Redis = get_redis(db, config)
+        self.ttl = int(config.get('DB-Section', 'comparisons-ttl', fallback=DEFAULT_TTL))
+
+        self.log_directory = config.get('Directory-Section', 'logs')
+        self.LOGGER = log.get_logger('redis_comparisons_connection',
+                                     os.path.join(self.log_directory, 'redis_comparisons_connection.log'))
+
+    def get(self, service: str, name1: str, revision1: str, name2: str, revision2: str) -> t.Optional[str]:
+        """ Return stored output of the 'service' comparing name1@revision1 with name2@revision2, or None. """
+        output = self.redis.hget(self._key(name1, revision1, name2, revision2), service)
+        if output is None:
+            return None
+        return output.decode('utf-8')
+
+    def set(self, service: str, name1: str, revision1: str, name2: str, revision2: str, output: str):
+        key = self._key(name1, revision1, name2, revision2)
+        pipeline = self.redis.pipeline()
+        pipeline.hset(key, service, output)
+        pipeline.expire(key, self.ttl)
+        pipeline.execute()
+
+    def _key(self, name1: str, revision1: str, name2: str, revision2: str) -> str:
+        return 'comparison:{}:{}@{}:{}@{}'.format(pyang.__version__, name1, revision1, name2, revision2)
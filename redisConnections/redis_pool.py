@@ -0,0 +1,67 @@
+# Copyright The IETF Trust 2022, All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Process-wide registry of Redis connection pools.
+All the clients returned by get_redis() for the same host, port and database
+share one connection pool, so sockets are reused instead of being opened by each new client.
+"""
+
+__copyright__ = 'Copyright The IETF Trust 2022, All Rights Reserved'
+__license__ = 'Apache License, Version 2.0'
+
+import threading
+import typing as t
+from configparser import ConfigParser
+
+from redis import BlockingConnectionPool, Redis
+
+from utility.create_config import create_config
+
+DEFAULT_MAX_CONNECTIONS = 50
+DEFAULT_POOL_TIMEOUT = 20
+
+_pools: t.Dict[t.Tuple[str, int, int], BlockingConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_redis(db: t.Union[int, str] = 0, config: t.Optional[ConfigParser] = None) -> Redis:
+    """ Return Redis client for the database 'db' backed by connection pool shared within the process.
+    Number of connections of each pool is limited by 'redis-max-connections' config value.
+    Once all of them are in use, client waits up to 'redis-pool-timeout' seconds for a released one
+    instead of failing - under gevent only the current greenlet is suspended while waiting.
+    Pools reset their connections after fork, so clients created before forking workers stay usable.
+
+    Arguments:
+        :param db       (int | str) number of the Redis database
+        :param config   (ConfigParser) Optional - loaded configuration, loaded from the config file if not provided
+        :return         (Redis) Redis client using shared connection pool
+    """
+    config = config or create_config()
+    host = config.get('DB-Section', 'redis-host')
+    port = int(config.get('DB-Section', 'redis-port'))
+    key = (host, port, int(db))
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                pool = BlockingConnectionPool(
+                    host=host, port=port, db=int(db),
+                    max_connections=int(config.get('DB-Section', 'redis-max-connections',
+                                                   fallback=DEFAULT_MAX_CONNECTIONS)),
+                    timeout=int(config.get('DB-Section', 'redis-pool-timeout', fallback=DEFAULT_POOL_TIMEOUT))
+                )
+                _pools[key] = pool
+    return Redis(connection_pool=pool)
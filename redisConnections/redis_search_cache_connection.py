@@ -0,0 +1,155 @@
+# Copyright The IETF Trust 2022, All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Cache of the yang-search results shared by all the API workers. Results are stored under
+'search-cache:<generation>:<hash of the searched term and normalized search parameters>' for a limited time.
+Generation is increased whenever the indexed documents or the module metadata change,
+so the results stored before are never returned again and just expire.
+Number of the stored results is limited, the oldest ones are removed first.
+Each lookup is a single round trip: the entry of the last seen generation is read together with the current
+generation, and the hit and miss counts of the previous lookups are added to the statistics on the way.
+The generation read by the lookup is returned with the results, and the results of the search are stored
+under it, so results of a search started before the generation was increased are never returned.
+"""
+
+__copyright__ = 'Copyright The IETF Trust 2022, All Rights Reserved'
+__license__ = 'Apache License, Version 2.0'
+
+import hashlib
+import json
+import os
+import time
+import typing as t
+from collections import Counter
+
+from redis import Redis
+from redis.client import Pipeline
+
+import utility.log as log
+from redisConnections.redis_pool import get_redis
+from utility.create_config import create_config
+
+GENERATION_KEY = 'search-cache:generation'
+ENTRIES_KEY = 'search-cache:entries'
+HITS_KEY = 'search-cache:hits'
+MISSES_KEY = 'search-cache:misses'
+DEFAULT_TTL = 3600
+DEFAULT_MAX_ENTRIES = 10000
+DEFAULT_MAX_ENTRY_BYTES = 4 * 1024 * 1024
+
+
+class RedisSearchCacheConnection:
+
+    def __init__(self, db: t.Optional[t.Union[int, str]] = None):
+        config = create_config()
+        if db is None:
+            db = config.get('DB-Section', 'redis-search-cache-db', fallback=7)
+        self.redis: Redis = get_redis(db, config)
+        self.ttl = int(config.get('DB-Section', 'search-cache-ttl', fallback=DEFAULT_TTL))
+        self.max_entries = int(config.get('DB-Section', 'search-cache-max-entries', fallback=DEFAULT_MAX_ENTRIES))
+        self.max_entry_bytes = int(config.get('DB-Section', 'search-cache-max-entry-bytes',
+                                              fallback=DEFAULT_MAX_ENTRY_BYTES))
+        self._generation = 0
+        self._pending_stats: t.Counter[str] = Counter()
+
+        self.log_directory = config.get('Directory-Section', 'logs')
+        self.LOGGER = log.get_logger('redis_search_cache_connection',
+                                     os.path.join(self.log_directory, 'redis_search_cache_connection.log'))
+
+    def key(self, searched_term: str, search_params: dict) -> str:
+        """ Return key of the search results, which does not depend on the order of the search parameters
+        and the order of the values in their lists.
+
+        Arguments:
+            :param searched_term    (str) String that we are searching for
+            :param search_params    (dict) Search parameters as a dictionary, e.g. from dataclasses.asdict()
+        """
+        normalized = {
+            name: sorted(set(value)) if isinstance(value, list) and all(isinstance(v, str) for v in value) else value
+            for name, value in search_params.items()
+        }
+        serialized = json.dumps([searched_term, normalized], sort_keys=True)
+        return hashlib.sha256(serialized.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> t.Tuple[t.Optional[dict], int]:
+        """ Return the stored search results of the current generation, or None, together with the generation
+        which has to be passed to set() when the results are stored.
+        """
+        generation = self._generation
+        pipeline = self.redis.pipeline(transaction=False)
+        pipeline.get(GENERATION_KEY)
+        pipeline.get(self._entry_key(key, generation))
+        self._add_pending_stats(pipeline)
+        current_generation, result = pipeline.execute()[:2]
+        current_generation = int(current_generation or 0)
+        if current_generation != generation:
+            # Results were stored for an older generation
+            self._generation = current_generation
+            result = None
+        self._pending_stats[HITS_KEY if result is not None else MISSES_KEY] += 1
+        if result is None:
+            return None, current_generation
+        return json.loads(result), current_generation
+
+    def set(self, key: str, generation: int, result: dict):
+        """ Store the search results for the generation returned by get(), unless they are too large.
+
+        Arguments:
+            :param key          (str) Key of the search results returned by key()
+            :param generation   (int) Generation returned by get() before the search started
+            :param result       (dict) Search results
+        """
+        serialized = json.dumps(result)
+        if len(serialized) > self.max_entry_bytes:
+            self.LOGGER.info('Search results of {} bytes are too large to be cached'.format(len(serialized)))
+            return
+        entry_key = self._entry_key(key, generation)
+        now = time.time()
+        pipeline = self.redis.pipeline()
+        pipeline.set(entry_key, serialized, ex=self.ttl)
+        pipeline.zadd(ENTRIES_KEY, {entry_key: now})
+        # Forget the entries which already expired and remove the oldest ones over the limit
+        pipeline.zremrangebyscore(ENTRIES_KEY, '-inf', now - self.ttl)
+        pipeline.zcard(ENTRIES_KEY)
+        entries = pipeline.execute()[3]
+        if entries > self.max_entries:
+            oldest = [entry for entry, _ in self.redis.zpopmin(ENTRIES_KEY, entries - self.max_entries)]
+            if oldest:
+                self.redis.delete(*oldest)
+
+    def increase_generation(self):
+        """ Invalidate all the stored search results. """
+        self.redis.incr(GENERATION_KEY)
+
+    def stats(self) -> t.Dict[str, int]:
+        pipeline = self.redis.pipeline(transaction=False)
+        self._add_pending_stats(pipeline)
+        pipeline.mget(HITS_KEY, MISSES_KEY, GENERATION_KEY)
+        pipeline.zcard(ENTRIES_KEY)
+        (hits, misses, generation), entries = pipeline.execute()[-2:]
+        return {
+            'hits': int(hits or 0),
+            'misses': int(misses or 0),
+            'entries': entries,
+            'generation': int(generation or 0),
+        }
+
+    def _add_pending_stats(self, pipeline: Pipeline):
+        pending_stats, self._pending_stats = self._pending_stats, Counter()
+        for stats_key, count in pending_stats.items():
+            pipeline.incrby(stats_key, count)
+
+    def _entry_key(self, key: str, generation: int) -> str:
+        return 'search-cache:{}:{}'.format(generation, key)
@@ -24,6 +24,7 @@ import typing as t
 from redis import Redis
 
 import utility.log as log
+from redisConnections.redis_pool import get_redis
 from utility.create_config import create_config
 
 
@@ -40,11 +41,9 @@ class RedisUsersConnection:
 
     def __init__(self, db: t.Optional[t.Union[int, str]] = None):
         config = create_config()
-        self._redis_host = config.get('DB-Section', 'redis-host')
-        self._redis_port = config.get('DB-Section', 'redis-port')
         if db is None:
             db = config.get('DB-Section', 'redis-users-db', fallback=2)
-        self.redis = Redis(host=self._redis_host, port=self._redis_port, db=db)  # pyright: ignore
+        self.redis: Redis = get_redis(db, config)
 
         self.log_directory = config.get('Directory-Section', 'logs')
         self.LOGGER = log.get_logger('redis_users_connection', f'{self.log_directory}/redis_users_connection.log')
@@ -0,0 +1,97 @@
+# Copyright The IETF Trust 2022, All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+__copyright__ = 'Copyright The IETF Trust 2022, All Rights Reserved'
+__license__ = 'Apache License, Version 2.0'
+
+import json
+import os
+import unittest
+
+import zstandard
+
+from redisConnections.codec import (MSGPACK_HEADER, ZSTD_DICTIONARY_HEADER, ZSTD_HEADER, RedisCodec,
+                                    RedisCodecError)
+
+
+class TestRedisCodecClass(unittest.TestCase):
+    def setUp(self):
+        resources_path = os.path.join(os.environ['BACKEND'], 'redisConnections/tests/resources')
+        with open(os.path.join(resources_path, 'ietf-bgp@2021-10-25.json'), 'r') as f:
+            self.module = json.load(f)
+
+    def test_json_codec(self):
+        codec = RedisCodec('json')
+
+        encoded = codec.encode(self.module)
+
+        self.assertEqual(json.loads(encoded), self.module)
+        self.assertEqual(codec.decode(encoded), self.module)
+
+    def test_msgpack_codec(self):
+        codec = RedisCodec('msgpack')
+
+        encoded = codec.encode(self.module)
+
+        self.assertTrue(encoded.startswith(MSGPACK_HEADER))
+        self.assertEqual(codec.decode(encoded), self.module)
+
+    def test_zstd_codec(self):
+        codec = RedisCodec('zstd')
+
+        encoded = codec.encode(self.module)
+
+        self.assertTrue(encoded.startswith(ZSTD_HEADER))
+        self.assertLess(len(encoded), len(json.dumps(self.module)))
+        self.assertEqual(codec.decode(encoded), self.module)
+
+    def test_zstd_codec_with_dictionary(self):
+        samples = [json.dumps({**self.module, 'revision': '2021-10-{:02d}'.format(i)}).encode() for i in range(100)]
+        dictionary = zstandard.train_dictionary(4096, samples).as_bytes()
+        codec = RedisCodec('zstd', dictionary)
+
+        encoded = codec.encode(self.module)
+
+        self.assertTrue(encoded.startswith(ZSTD_DICTIONARY_HEADER))
+        self.assertEqual(codec.decode(encoded), self.module)
+
+    def test_zstd_dictionary_not_configured(self):
+        samples = [json.dumps({**self.module, 'revision': '2021-10-{:02d}'.format(i)}).encode() for i in range(100)]
+        dictionary = zstandard.train_dictionary(4096, samples).as_bytes()
+        encoded = RedisCodec('zstd', dictionary).encode(self.module)
+
+        with self.assertRaises(RedisCodecError):
+            RedisCodec('zstd').decode(encoded)
+
+    def test_decode_legacy_json_with_any_codec(self):
+        legacy = json.dumps(self.module).encode()
+
+        for codec_name in ('json', 'msgpack', 'zstd'):
+            self.assertEqual(RedisCodec(codec_name).decode(legacy), self.module)
+
+    def test_to_json(self):
+        legacy = json.dumps(self.module).encode()
+        codec = RedisCodec('msgpack')
+
+        self.assertEqual(codec.to_json(legacy), legacy.decode())
+        self.assertEqual(json.loads(codec.to_json(codec.encode(self.module))), self.module)
+        self.assertEqual(codec.to_json(None), '{}')
+
+    def test_unknown_codec(self):
+        with self.assertRaises(RedisCodecError):
+            RedisCodec('pickle')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+# Copyright The IETF Trust 2022, All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+__copyright__ = 'Copyright The IETF Trust 2022, All Rights Reserved'
+__license__ = 'Apache License, Version 2.0'
+
+import unittest
+from unittest import mock
+
+from redisConnections.redis_comparisons_connection import (CHECK_UPDATE_FROM, DIFF_TREE,
+                                                           RedisComparisonsConnection)
+
+
+class TestRedisComparisonsConnectionClass(unittest.TestCase):
+    def setUp(self):
+        self.comparisons = RedisComparisonsConnection(db=13)
+
+    def tearDown(self):
+        self.comparisons.redis.flushdb()
+
+    def test_set_get(self):
+        self.assertIsNone(self.comparisons.get(CHECK_UPDATE_FROM, 'ietf-bgp', '2021-10-25', 'ietf-bgp', '2020-06-28'))
+
+        self.comparisons.set(CHECK_UPDATE_FROM, 'ietf-bgp', '2021-10-25', 'ietf-bgp', '2020-06-28', 'output')
+
+        self.assertEqual(
+            self.comparisons.get(CHECK_UPDATE_FROM, 'ietf-bgp', '2021-10-25', 'ietf-bgp', '2020-06-28'), 'output'
+        )
+        self.assertIsNone(self.comparisons.get(DIFF_TREE, 'ietf-bgp', '2021-10-25', 'ietf-bgp', '2020-06-28'))
+        self.assertIsNone(self.comparisons.get(CHECK_UPDATE_FROM, 'ietf-bgp', '2020-06-28', 'ietf-bgp', '2021-10-25'))
+
+    def test_set_expires(self):
+        self.comparisons.ttl = 60
+
+        self.comparisons.set(DIFF_TREE, 'ietf-bgp', '2021-10-25', 'ietf-bgp', '2020-06-28', 'output')
+
+        key = self.comparisons._key('ietf-bgp', '2021-10-25', 'ietf-bgp', '2020-06-28')
+        self.assertTrue(0 < self.comparisons.redis.ttl(key) <= 60)
+
+    def test_pyang_upgrade_invalidates_outputs(self):
+        self.comparisons.set(CHECK_UPDATE_FROM, 'ietf-bgp', '2021-10-25', 'ietf-bgp', '2020-06-28', 'output')
+
+        with mock.patch('pyang.__version__', '0.0.0'):
+            self.assertIsNone(
+                self.comparisons.get(CHECK_UPDATE_FROM, 'ietf-bgp', '2021-10-25', 'ietf-bgp', '2020-06-28')
+            )
+
+
+if __name__ == '__main__':
+    unittest.main()
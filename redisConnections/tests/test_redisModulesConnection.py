@@ -24,6 +24,7 @@ from copy import deepcopy
 from unittest import mock
 
 from redis import Redis
+from redisConnections.codec import MSGPACK_HEADER, RedisCodec
 from redisConnections.redisConnection import RedisConnection
 from utility.create_config import create_config
 
@@ -44,7 +45,7 @@ class TestRedisModulesConnectionClass(unittest.TestCase):
         with open('{}/ietf-bgp@2021-10-25.json'.format(self.resources_path), 'r') as f:
             self.original_data = json.load(f)
         self.modulesDB.set(redis_key, json.dumps(self.original_data))
-        self.modulesDB.set('modules-data', json.dumps({redis_key: self.original_data}))
+        self.modulesDB.hset('modules-data', redis_key, json.dumps(self.original_data))
 
     def tearDown(self):
         self.modulesDB.flushdb()
@@ -72,6 +73,27 @@ class TestRedisModulesConnectionClass(unittest.TestCase):
 
         self.assertEqual(data, '{}')
 
+    def test_get_module_dict(self):
+        redis_key = 'ietf-bgp@2021-10-25/ietf'
+
+        with mock.patch.object(self.redisConnection, 'codec', RedisCodec('msgpack')):
+            self.redisConnection.set_redis_module(self.original_data, redis_key)
+            data = self.redisConnection.get_module_dict(redis_key)
+
+        self.assertEqual(data, self.original_data)
+        self.assertEqual(self.redisConnection.get_module_dict('ietf-bgp@1970-01-01/ietf'), {})
+
+    def test_get_modules(self):
+        redis_key = 'ietf-bgp@2021-10-25/ietf'
+
+        modules = self.redisConnection.get_modules([redis_key, 'ietf-bgp@1970-01-01/ietf', redis_key])
+
+        self.assertEqual(len(modules), 3)
+        self.assertEqual(modules[0], json.loads(self.redisConnection.get_module(redis_key)))
+        self.assertIsNone(modules[1])
+        self.assertEqual(modules[2], modules[0])
+        self.assertEqual(self.redisConnection.get_modules([]), [])
+
     def test_get_all_modules(self):
         redis_key = 'ietf-bgp@2021-10-25/ietf'
         raw_data = self.redisConnection.get_all_modules()
@@ -80,9 +102,9 @@ class TestRedisModulesConnectionClass(unittest.TestCase):
         self.assertNotEqual(raw_data, '{}')
         self.assertIn(redis_key, data)
 
-    @mock.patch('redisConnections.redisConnection.Redis.get')
-    def test_get_all_modules_key_not_exists(self, mock_redis_get: mock.MagicMock):
-        mock_redis_get.return_value = None
+    @mock.patch('redisConnections.redisConnection.Redis.hgetall')
+    def test_get_all_modules_key_not_exists(self, mock_redis_hgetall: mock.MagicMock):
+        mock_redis_hgetall.return_value = {}
         data = self.redisConnection.get_all_modules()
 
         self.assertEqual(data, '{}')
@@ -122,6 +144,88 @@ class TestRedisModulesConnectionClass(unittest.TestCase):
         self.assertEqual(data.get('revision'), revision)
         self.assertEqual(data.get('organization'), organization)
 
+    def test_populate_modules_updates_modules_data(self):
+        new_description = 'Updated description'
+        redis_key = 'ietf-bgp@2021-10-25/ietf'
+        module = deepcopy(self.original_data)
+        module['description'] = new_description
+        generation = self.redisConnection.get_modules_data_generation()
+
+        self.redisConnection.populate_modules([module])
+        data = self.redisConnection.get_modules_data()
+
+        self.assertIn(redis_key, data)
+        self.assertEqual(data[redis_key]['description'], new_description)
+        self.assertNotEqual(self.redisConnection.get_modules_data_generation(), generation)
+
+    def test_populate_modules_multiple_batches(self):
+        modules = []
+        for revision in ['2019-01-01', '2020-01-01', '2021-10-25']:
+            module = deepcopy(self.original_data)
+            module['revision'] = revision
+            modules.append(module)
+
+        self.redisConnection.populate_modules(modules, batch_size=2)
+        data = self.redisConnection.get_modules_data()
+
+        for module in modules:
+            redis_key = '{}@{}/{}'.format(module['name'], module['revision'], module['organization'])
+            self.assertIn(redis_key, data)
+            self.assertEqual(json.loads(self.redisConnection.get_module(redis_key))['revision'], module['revision'])
+
+    def test_populate_modules_merge_temporary_data(self):
+        redis_key = 'ietf-bgp@2021-10-25/ietf'
+        temp_data = {'name': 'ietf-bgp', 'revision': '2021-10-25', 'organization': 'ietf',
+                     'compilation-status': 'passed'}
+        self.redisConnection.temp_modulesDB.set(redis_key, json.dumps(temp_data))
+        module = deepcopy(self.original_data)
+
+        self.redisConnection.populate_modules([module])
+        data = json.loads(self.redisConnection.get_module(redis_key))
+
+        self.assertEqual(data['compilation-status'], 'passed')
+        self.assertEqual(self.redisConnection.get_temp_module(redis_key), '{}')
+
+    def test_iter_modules_json(self):
+        modules = []
+        for i in range(1, 6):
+            module = deepcopy(self.original_data)
+            module['revision'] = '2021-10-{:02d}'.format(i)
+            modules.append(module)
+        self.redisConnection.populate_modules(modules)
+
+        batches = list(self.redisConnection.iter_modules_json(batch_size=2))
+        data = [json.loads(module_json) for batch in batches for module_json in batch]
+
+        self.assertTrue(all(batches))
+        self.assertEqual(len(data), 6)
+        expected_revisions = {module['revision'] for module in modules} | {'2021-10-25'}
+        self.assertEqual({module['revision'] for module in data}, expected_revisions)
+
+    def test_iter_modules_json_key_not_exists(self):
+        self.modulesDB.delete('modules-data')
+
+        self.assertEqual(list(self.redisConnection.iter_modules_json()), [])
+
+    def test_set_redis_module_previous_modules_data_format(self):
+        redis_key = 'ietf-bgp@2021-10-25/ietf'
+        self.modulesDB.set('modules-data', json.dumps({'module': [self.original_data]}))
+
+        self.redisConnection.set_redis_module(self.original_data, redis_key)
+
+        self.assertEqual(self.modulesDB.type('modules-data'), b'hash')
+        self.assertEqual(self.redisConnection.get_modules_data(), {redis_key: self.original_data})
+
+    def test_populate_modules_previous_modules_data_format(self):
+        self.modulesDB.set('modules-data', json.dumps({'module': [self.original_data]}))
+        new_module = {'name': 'ietf-routing', 'revision': '2018-03-13', 'organization': 'ietf'}
+
+        self.redisConnection.populate_modules([new_module])
+
+        self.assertEqual(self.modulesDB.type('modules-data'), b'hash')
+        self.assertEqual(set(self.redisConnection.get_modules_data()),
+                         {'ietf-bgp@2021-10-25/ietf', 'ietf-routing@2018-03-13/ietf'})
+
     def test_reload_modules_cache(self):
         redis_key = 'ietf-bgp@2021-10-25/ietf'
         self.modulesDB.delete('modules-data')
@@ -313,6 +417,14 @@ class TestRedisModulesConnectionClass(unittest.TestCase):
         self.assertEqual(all_modules_data, {})
         self.assertNotIn(redis_key, all_modules_data)
 
+    def test_delete_modules_updates_modules_data(self):
+        redis_key = 'ietf-bgp@2021-10-25/ietf'
+
+        self.redisConnection.delete_modules([redis_key])
+        data = self.redisConnection.get_modules_data()
+
+        self.assertNotIn(redis_key, data)
+
     def test_delete_modules_non_existing_key(self):
         redis_key = 'random-key'
 
@@ -386,6 +498,89 @@ class TestRedisModulesConnectionClass(unittest.TestCase):
         self.assertNotEqual(raw_data, '{}')
         self.assertNotIn('expires', data)
 
+    def test_populate_implementation_merge_existing_data(self):
+        def implementation(module_name: str) -> dict:
+            module = {'name': module_name, 'revision': '2021-10-25', 'organization': 'ietf'}
+            software_flavor = {'name': 'ALL', 'protocols': {}, 'modules': {'module': [module]}}
+            software_version = {'name': '7.5.2', 'software-flavors': {'software-flavor': [software_flavor]}}
+            platform = {'name': 'asr9k', 'software-versions': {'software-version': [software_version]}}
+            return {'name': 'cisco', 'platforms': {'platform': [platform]}}
+
+        self.redisConnection.populate_implementation([implementation('ietf-bgp')])
+        self.redisConnection.populate_implementation([implementation('ietf-routing')])
+        data = json.loads(self.redisConnection.get_implementation('cisco/asr9k/7.5.2/ALL'))
+        vendors_data = self.redisConnection.create_vendors_data_dict()
+
+        self.assertEqual({module['name'] for module in data['modules']['module']}, {'ietf-bgp', 'ietf-routing'})
+        self.assertEqual(len(vendors_data), 1)
+        self.assertEqual(vendors_data[0]['name'], 'cisco')
+
+    def test_get_vendors_dict(self):
+        self.assertEqual(self.redisConnection.get_vendors_dict(), {})
+
+        vendors = {'vendor': [{'name': 'cisco'}]}
+        self.vendorsDB.set('vendors-data', json.dumps(vendors))
+
+        self.assertEqual(self.redisConnection.get_vendors_dict(), vendors)
+
+    def test_delete_vendor(self):
+        def implementation(platform_name: str) -> dict:
+            module = {'name': 'ietf-bgp', 'revision': '2021-10-25', 'organization': 'ietf'}
+            software_flavor = {'name': 'ALL', 'protocols': {}, 'modules': {'module': [module]}}
+            software_version = {'name': '7.5.2', 'software-flavors': {'software-flavor': [software_flavor]}}
+            platform = {'name': platform_name, 'software-versions': {'software-version': [software_version]}}
+            return {'name': 'cisco', 'platforms': {'platform': [platform]}}
+
+        self.redisConnection.populate_implementation([implementation('asr9k'), implementation('ncs5k')])
+        result = self.redisConnection.delete_vendor('cisco/asr9k')
+        vendors_data = self.redisConnection.create_vendors_data_dict('cisco')
+
+        self.assertEqual(result, 1)
+        self.assertEqual(self.redisConnection.get_implementation('cisco/asr9k/7.5.2/ALL'), '{}')
+        self.assertFalse(self.redisConnection.vendor_path_exists(['cisco', 'asr9k']))
+        self.assertEqual([platform['name'] for platform in vendors_data[0]['platforms']['platform']], ['ncs5k'])
+
+        self.redisConnection.delete_vendor('cisco/ncs5k')
+
+        self.assertFalse(self.redisConnection.vendor_path_exists(['cisco']))
+        self.assertEqual(self.redisConnection.create_vendors_data_dict(), [])
+
+    def test_delete_vendor_software_flavor(self):
+        module = {'name': 'ietf-bgp', 'revision': '2021-10-25', 'organization': 'ietf'}
+        software_flavors = [
+            {'name': name, 'protocols': {}, 'modules': {'module': [module]}} for name in ['ALL', 'BASE']
+        ]
+        software_version = {'name': '7.5.2', 'software-flavors': {'software-flavor': software_flavors}}
+        platform = {'name': 'asr9k', 'software-versions': {'software-version': [software_version]}}
+
+        self.redisConnection.populate_implementation([{'name': 'cisco', 'platforms': {'platform': [platform]}}])
+        result = self.redisConnection.delete_vendor('cisco/asr9k/7.5.2/ALL')
+
+        self.assertEqual(result, 1)
+        self.assertEqual(self.redisConnection.get_implementation('cisco/asr9k/7.5.2/ALL'), '{}')
+        self.assertNotEqual(self.redisConnection.get_implementation('cisco/asr9k/7.5.2/BASE'), '{}')
+        self.assertEqual(self.vendorsDB.smembers('vendors-index:cisco/asr9k/7.5.2'), {b'BASE'})
+
+        self.redisConnection.delete_vendor('cisco/asr9k/7.5.2/BASE')
+
+        self.assertFalse(self.redisConnection.vendor_path_exists(['cisco']))
+        self.assertEqual(list(self.vendorsDB.scan_iter(match='vendors-index:*')), [])
+
+    def test_populate_modules_msgpack_codec_with_legacy_json_data(self):
+        redis_key = 'ietf-bgp@2021-10-25/ietf'
+        module = deepcopy(self.original_data)
+        module['compilation-status'] = 'passed'
+
+        with mock.patch.object(self.redisConnection, 'codec', RedisCodec('msgpack')):
+            self.redisConnection.populate_modules([module])
+            raw_data = self.modulesDB.get(redis_key)
+            data = json.loads(self.redisConnection.get_module(redis_key))
+            modules_data = json.loads(self.redisConnection.get_all_modules())
+
+        self.assertTrue(raw_data.startswith(MSGPACK_HEADER))
+        self.assertEqual(data['compilation-status'], 'passed')
+        self.assertEqual(modules_data[redis_key], data)
+
 
 if __name__ == "__main__":
     unittest.main()
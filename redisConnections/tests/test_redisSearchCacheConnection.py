@@ -0,0 +1,102 @@
+# Copyright The IETF Trust 2022, All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+__copyright__ = 'Copyright The IETF Trust 2022, All Rights Reserved'
+__license__ = 'Apache License, Version 2.0'
+
+import unittest
+from unittest import mock
+
+from redisConnections.redis_search_cache_connection import RedisSearchCacheConnection
+
+
+class TestRedisSearchCacheConnectionClass(unittest.TestCase):
+    def setUp(self):
+        self.search_cache = RedisSearchCacheConnection()
+        self.search_params = {'latest_revision': True, 'schema_types': ['leaf', 'container'], 'sub_search': []}
+        self.result = {'response': {'rows': [{'name': 'interfaces'}]}, 'search-after': None}
+
+    def tearDown(self):
+        self.search_cache.redis.flushdb()
+
+    def test_key_normalized(self):
+        reordered = {'sub_search': [], 'schema_types': ['container', 'leaf'], 'latest_revision': True}
+
+        self.assertEqual(self.search_cache.key('interface', self.search_params),
+                         self.search_cache.key('interface', reordered))
+        self.assertNotEqual(self.search_cache.key('interface', self.search_params),
+                            self.search_cache.key('interfaces', self.search_params))
+
+    def test_set_get(self):
+        key = self.search_cache.key('interface', self.search_params)
+        result, generation = self.search_cache.get(key)
+        self.assertIsNone(result)
+
+        self.search_cache.set(key, generation, self.result)
+
+        self.assertEqual(self.search_cache.get(key), (self.result, 0))
+        self.assertEqual(self.search_cache.stats(), {'hits': 1, 'misses': 1, 'entries': 1, 'generation': 0})
+
+    def test_get_single_round_trip(self):
+        key = self.search_cache.key('interface', self.search_params)
+        self.search_cache.set(key, 0, self.result)
+        self.search_cache.get(key)
+
+        with mock.patch.object(self.search_cache, 'redis', wraps=self.search_cache.redis) as mock_redis:
+            self.assertEqual(self.search_cache.get(key), (self.result, 0))
+
+        mock_redis.pipeline.assert_called_once()
+        mock_redis.get.assert_not_called()
+        mock_redis.incr.assert_not_called()
+
+    def test_increase_generation_invalidates_results(self):
+        key = self.search_cache.key('interface', self.search_params)
+        self.search_cache.set(key, 0, self.result)
+
+        self.search_cache.increase_generation()
+
+        self.assertEqual(self.search_cache.get(key), (None, 1))
+
+    def test_set_generation_of_started_search(self):
+        key = self.search_cache.key('interface', self.search_params)
+        _, generation = self.search_cache.get(key)
+        # Another request sees the increased generation while the search is running
+        self.search_cache.increase_generation()
+        self.search_cache.get(self.search_cache.key('bgp', self.search_params))
+
+        self.search_cache.set(key, generation, self.result)
+
+        self.assertEqual(self.search_cache.get(key), (None, 1))
+
+    def test_max_entries(self):
+        self.search_cache.max_entries = 2
+        keys = [self.search_cache.key(term, self.search_params) for term in ['bgp', 'interface', 'ospf']]
+        for key in keys:
+            self.search_cache.set(key, 0, self.result)
+
+        self.assertEqual(self.search_cache.get(keys[0]), (None, 0))
+        self.assertEqual(self.search_cache.get(keys[2]), (self.result, 0))
+        self.assertEqual(self.search_cache.stats()['entries'], 2)
+
+    def test_max_entry_bytes(self):
+        self.search_cache.max_entry_bytes = 10
+        key = self.search_cache.key('interface', self.search_params)
+
+        self.search_cache.set(key, 0, self.result)
+
+        self.assertEqual(self.search_cache.get(key), (None, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
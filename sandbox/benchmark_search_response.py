@@ -0,0 +1,59 @@
+# Copyright The IETF Trust 2022, All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Compare time needed to build the search response body from already decoded modules
+with and without the json.dumps() -> OrderedDict decode round trip previously done by ycSearch endpoints.
+Responses are serialized the same way as Flask does it - with sorted keys.
+"""
+
+__copyright__ = 'Copyright The IETF Trust 2022, All Rights Reserved'
+__license__ = 'Apache License, Version 2.0'
+
+import argparse
+import json
+import os
+import timeit
+from collections import OrderedDict
+
+
+def with_round_trip(modules: list) -> str:
+    modules = json.JSONDecoder(object_pairs_hook=OrderedDict).decode(json.dumps(modules))
+    return json.dumps({'yang-catalog:modules': {'module': modules}}, sort_keys=True)
+
+
+def without_round_trip(modules: list) -> str:
+    return json.dumps({'yang-catalog:modules': {'module': modules}}, sort_keys=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--cache-data', type=str,
+                        default=os.path.join(os.environ.get('BACKEND', '.'), 'tests/resources/cache_data.json'),
+                        help='Path to the cache_data.json file with the catalog data')
+    parser.add_argument('--repeat', type=int, default=5, help='Number of measured repetitions')
+    args = parser.parse_args()
+
+    with open(args.cache_data, 'r') as f:
+        modules = json.load(f)['yang-catalog:catalog']['modules']['module']
+    assert with_round_trip(modules) == without_round_trip(modules)
+
+    print('{} modules'.format(len(modules)))
+    for function in (with_round_trip, without_round_trip):
+        times = timeit.repeat(lambda: function(modules), number=1, repeat=args.repeat)
+        print('{:<20} best {:.3f} s, mean {:.3f} s'.format(function.__name__, min(times), sum(times) / len(times)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+# Copyright The IETF Trust 2022, All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Flag documents of the latest revision of each module in the 'yindex' index.
+Search for the latest revisions only relies on the flag, which process-changed-mods.py keeps up to date
+for the modules it indexes or deletes, so this script has to be run once for the documents indexed before.
+The flag is recomputed from the documents, so the script can be run repeatedly.
+"""
+
+__copyright__ = 'Copyright The IETF Trust 2022, All Rights Reserved'
+__license__ = 'Apache License, Version 2.0'
+
+import typing as t
+
+import utility.log as log
+from elasticsearchIndexing.es_manager import DELETE_CHUNK_SIZE, ESManager
+from elasticsearchIndexing.models.es_indices import ESIndices
+from utility.create_config import create_config
+
+
+def module_names(es_manager: ESManager) -> t.Iterator[t.List[str]]:
+    """ Yield names of all the modules in the 'yindex' index in chunks. """
+    names_query = {
+        'aggs': {
+            'names': {
+                'composite': {
+                    'size': DELETE_CHUNK_SIZE,
+                    'sources': [{'name': {'terms': {'field': 'module.keyword'}}}]
+                }
+            }
+        }
+    }
+    while True:
+        response = es_manager.generic_search(ESIndices.YINDEX, names_query)
+        names = response['aggregations']['names']
+        if not names['buckets']:
+            return
+        yield [bucket['key']['name'] for bucket in names['buckets']]
+        names_query['aggs']['names']['composite']['after'] = names['after_key']
+
+
+def main():
+    config = create_config()
+    log_directory = config.get('Directory-Section', 'logs', fallback='/var/yang/logs')
+    LOGGER = log.get_logger('es_flag_latest_revisions', '{}/sandbox.log'.format(log_directory))
+
+    es_manager = ESManager()
+    put_result = es_manager.update_yindex_mapping()
+    LOGGER.info('Put mapping result:\n{}'.format(put_result))
+    total = 0
+    for names in module_names(es_manager):
+        es_manager.update_latest_revisions(names)
+        total += len(names)
+        LOGGER.info('Latest revisions of {} modules flagged'.format(total))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+# Copyright The IETF Trust 2022, All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Set the 'sort-hash-id' field of the documents in the 'yindex' index indexed before it was added.
+Search results are sorted by the field last, so the pages of a search do not skip or repeat
+any documents with the same score. Documents indexed later get the field from the indexer,
+those updated by this script get their document id, which is unique as well.
+Only the documents without the field are updated, so the script can be run repeatedly.
+"""
+
+__copyright__ = 'Copyright The IETF Trust 2022, All Rights Reserved'
+__license__ = 'Apache License, Version 2.0'
+
+import time
+
+import utility.log as log
+from elasticsearchIndexing.es_manager import SORT_ID_FIELD, ESManager
+from elasticsearchIndexing.models.es_indices import ESIndices
+from utility.create_config import create_config
+
+
+def main():
+    config = create_config()
+    log_directory = config.get('Directory-Section', 'logs', fallback='/var/yang/logs')
+    LOGGER = log.get_logger('es_set_sort_hash_ids', '{}/sandbox.log'.format(log_directory))
+
+    es_manager = ESManager()
+    put_result = es_manager.update_yindex_mapping()
+    LOGGER.info('Put mapping result:\n{}'.format(put_result))
+    update_query = {
+        'script': {'source': "ctx._source['{}'] = ctx._id".format(SORT_ID_FIELD), 'lang': 'painless'},
+        'query': {'bool': {'must_not': {'exists': {'field': SORT_ID_FIELD}}}}
+    }
+    update_result = es_manager.es.update_by_query(
+        index=ESIndices.YINDEX.value, body=update_query, conflicts='proceed', wait_for_completion=False)
+    task_id = update_result.get('task')
+    while True:
+        task_info = es_manager.es.tasks.get(task_id=task_id)
+        LOGGER.info('{} out of {}'.format(task_info['task']['status']['updated'],
+                                          task_info['task']['status']['total']))
+        if task_info['completed']:
+            break
+        time.sleep(10)
+    LOGGER.info('Updating by query completed')
+
+
+if __name__ == '__main__':
+    main()
@@ -7,6 +7,8 @@ def main():
     vendors_db = RedisConnection().vendorsDB
     for key in vendors_db.scan_iter():
         key = key.decode()
+        if ':' in key:
+            continue  # vendors index keys
         old_key = key
         key = key.replace('RSP2/RSP3', 'RSP2%2FRSP3')
         key = key.replace('#', ' ')
@@ -0,0 +1,124 @@
+# Copyright The IETF Trust 2022, All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Re-encode module and vendor records stored in Redis using the codec selected by the 'redis-codec' config value.
+Optionally train zstd dictionary from a sample of the stored modules first - the dictionary is saved
+to the path set by the 'redis-zstd-dictionary' config value, which has to be set before the API
+is restarted, otherwise values compressed with the dictionary could not be decoded.
+Values are decoded by the currently configured codec based on their header byte, so the script can be run
+repeatedly, also to retrain the dictionary.
+"""
+
+__copyright__ = 'Copyright The IETF Trust 2022, All Rights Reserved'
+__license__ = 'Apache License, Version 2.0'
+
+import argparse
+import random
+
+import msgpack
+import zstandard
+
+from redisConnections.codec import RedisCodec
+from redisConnections.redisConnection import (MODULES_DATA_GENERATION_KEY, MODULES_DATA_KEY, VENDORS_INDEX_KEY,
+                                              RedisConnection)
+from utility.create_config import create_config
+
+BATCH_SIZE = 500
+
+
+def module_keys(modules_db) -> list:
+    return [key for key in modules_db.scan_iter() if b':' not in key and key != MODULES_DATA_KEY.encode()]
+
+
+def train_dictionary(redis_connection: RedisConnection, dictionary_path: str, dictionary_size: int, samples: int):
+    keys = module_keys(redis_connection.modulesDB)
+    keys = random.sample(keys, min(samples, len(keys)))
+    values = [
+        msgpack.packb(redis_connection.codec.decode(raw), use_bin_type=True)
+        for raw in redis_connection.modulesDB.mget(keys) if raw
+    ]
+    dictionary = zstandard.train_dictionary(dictionary_size, values)
+    with open(dictionary_path, 'wb') as f:
+        f.write(dictionary.as_bytes())
+    print('Dictionary of {} bytes trained from {} modules saved to {}'.format(
+        len(dictionary.as_bytes()), len(values), dictionary_path))
+    return dictionary.as_bytes()
+
+
+def reencode_keys(db, keys: list, current_codec: RedisCodec, codec: RedisCodec):
+    for start in range(0, len(keys), BATCH_SIZE):
+        batch = keys[start:start + BATCH_SIZE]
+        encoded = {
+            key: codec.encode(current_codec.decode(raw)) for key, raw in zip(batch, db.mget(batch)) if raw is not None
+        }
+        if encoded:
+            db.mset(encoded)
+    return len(keys)
+
+
+def reencode_modules_data(modules_db, current_codec: RedisCodec, codec: RedisCodec):
+    count = 0
+    hash_keys = modules_db.hkeys(MODULES_DATA_KEY)
+    for start in range(0, len(hash_keys), BATCH_SIZE):
+        batch = hash_keys[start:start + BATCH_SIZE]
+        values = modules_db.hmget(MODULES_DATA_KEY, batch)
+        encoded = {key: codec.encode(current_codec.decode(raw)) for key, raw in zip(batch, values) if raw is not None}
+        if encoded:
+            modules_db.hset(MODULES_DATA_KEY, mapping=encoded)
+            count += len(encoded)
+    modules_db.incr(MODULES_DATA_GENERATION_KEY)
+    return count
+
+
+def main():
+    config = create_config()
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--codec', type=str, default=config.get('DB-Section', 'redis-codec', fallback='json'),
+                        help='Codec used to encode the values. Default is the "redis-codec" config value')
+    parser.add_argument('--train-dictionary', action='store_true', default=False,
+                        help='Train zstd dictionary and save it to the "redis-zstd-dictionary" config path first')
+    parser.add_argument('--dictionary-size', type=int, default=112640, help='Size of the trained dictionary in bytes')
+    parser.add_argument('--samples', type=int, default=5000, help='Number of modules used to train the dictionary')
+    args = parser.parse_args()
+
+    redis_connection = RedisConnection()
+    dictionary_path = config.get('DB-Section', 'redis-zstd-dictionary', fallback='')
+    dictionary = None
+    if args.train_dictionary:
+        if not dictionary_path:
+            parser.error('"redis-zstd-dictionary" config value has to be set to train the dictionary')
+        dictionary = train_dictionary(redis_connection, dictionary_path, args.dictionary_size, args.samples)
+    elif dictionary_path:
+        with open(dictionary_path, 'rb') as f:
+            dictionary = f.read()
+    codec = RedisCodec(args.codec, dictionary, redis_connection.codec.zstd_level)
+    # Values compressed with the previous dictionary can only be decoded with the configured codec
+    current_codec = redis_connection.codec
+
+    modules_db = redis_connection.modulesDB
+    print('{} modules re-encoded'.format(reencode_keys(modules_db, module_keys(modules_db), current_codec, codec)))
+    count = reencode_modules_data(modules_db, current_codec, codec)
+    print('{} entries of {} re-encoded'.format(count, MODULES_DATA_KEY))
+
+    vendors_db = redis_connection.vendorsDB
+    vendor_keys = [
+        key for key in vendors_db.scan_iter()
+        if b':' not in key and not key.startswith(VENDORS_INDEX_KEY.encode())
+    ]
+    print('{} vendor keys re-encoded'.format(reencode_keys(vendors_db, vendor_keys, current_codec, codec)))
+
+
+if __name__ == '__main__':
+    main()
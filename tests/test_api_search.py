@@ -17,7 +17,6 @@ __copyright__ = "Copyright The IETF Trust 2021, All Rights Reserved"
 __license__ = "Apache License, Version 2.0"
 __email__ = "slavomir.mazur@pantheon.tech"
 
-import collections
 import json
 import os
 import unittest
@@ -92,10 +91,11 @@ class TestApiSearchClass(unittest.TestCase):
         self.assertEqual(data['description'], 'No module found using provided input data')
         self.assertEqual(data['error'], 'Not found -- in api code')
 
+    @mock.patch('api.my_flask.Redis.hgetall', mock.MagicMock(return_value={}))
     @mock.patch('api.my_flask.Redis.get')
     def test_search_no_modules_loaded(self, mock_redis_get: mock.MagicMock):
-        """Redis get() method patched to return None.
-        Then empty OrderedDict is returned from modules_data() method.
+        """Redis get() and hgetall() methods patched to return no data.
+        Then the modules catalog has no generation counter and reloads an empty modules-data aggregate.
         Test error response when no modules loaded from Redis and 404 status code was returned.
         """
         # Patch mock to return None while getting value from Redis
@@ -200,10 +200,11 @@ class TestApiSearchClass(unittest.TestCase):
         self.assertEqual(data['description'], 'No module found using provided input data')
         self.assertEqual(data['error'], 'Not found -- in api code')
 
+    @mock.patch('api.my_flask.Redis.hgetall', mock.MagicMock(return_value={}))
     @mock.patch('api.my_flask.Redis.get')
     def test_rpc_search_get_one_no_modules_loaded(self, mock_redis_get: mock.MagicMock):
-        """Redis get() method patched to return None.
-        Then empty OrderedDict is returned from modules_data() method.
+        """Redis get() and hgetall() methods patched to return no data.
+        Then the modules catalog has no generation counter and reloads an empty modules-data aggregate.
         Test error response when no modules loaded from Redis and 404 status code was returned.
         """
         # Patch mock to return None while getting value from Redis
@@ -352,10 +353,11 @@ class TestApiSearchClass(unittest.TestCase):
         self.assertIn('contributors', payload)
         self.assertNotEqual(len(contributors_list), 0)
 
+    @mock.patch('api.my_flask.Redis.hgetall', mock.MagicMock(return_value={}))
     @mock.patch('api.my_flask.Redis.get')
     def test_get_organizations_no_modules(self, mock_redis_get: mock.MagicMock):
-        """Redis get() method patched to return None.
-        Then empty OrderedDict is returned from modules_data() method.
+        """Redis get() and hgetall() methods patched to return no data.
+        Then the modules catalog has no generation counter and reloads an empty modules-data aggregate.
         This should result into empty 'contributors' list.
         """
         mock_redis_get.return_value = None
@@ -385,6 +387,20 @@ class TestApiSearchClass(unittest.TestCase):
 
         self.assertEqual(desired_output, response_text)
 
+    def test_create_update_from_stored(self):
+        """Test if the stored output is returned without the pyang validation.
+        """
+        stored_output = '<html><body><pre>stored output</pre></body></html>'
+        with mock.patch.object(app.comparisons, 'get', return_value=stored_output) as mock_get, \
+                mock.patch('api.views.ycSearch.ycSearch.context_check_update_from') as mock_check:
+            result = self.client.get('api/services/file1=yang-catalog@2018-04-03/check-update-from/'
+                                     'file2=yang-catalog@2017-09-26')
+
+        self.assertEqual(result.status_code, 200)
+        self.assertEqual(result.data.decode(), stored_output)
+        mock_get.assert_called_with('check-update-from', 'yang-catalog', '2018-04-03', 'yang-catalog', '2017-09-26')
+        mock_check.assert_not_called()
+
     def test_get_common_by_implementation(self):
         """Test if json payload has correct form (should not contain empty 'output' list)
         Based on request body, each module in 'output' list should not contain empty 'implementations' list.
@@ -507,6 +523,20 @@ class TestApiSearchClass(unittest.TestCase):
             reason = module['reason-to-show']
             self.assertIn(reason, reasons)
 
+    def test_compare_does_not_modify_catalog(self):
+        """Modules returned from rpc_search() are shared with the in-memory catalog,
+        so 'reason-to-show' property must not be added to them.
+        """
+        with open(os.path.join(self.resources_path, 'payloads.json'), 'r') as f:
+            content = json.load(f)
+        body = content.get('compare')
+
+        result = self.client.post('api/compare', json=body)
+
+        self.assertEqual(result.status_code, 200)
+        for module in app.modules_catalog.modules():
+            self.assertNotIn('reason-to-show', module)
+
     def test_compare_no_body(self):
         """Test error response when no body was send with request.
         """
@@ -879,10 +909,12 @@ class TestApiSearchClass(unittest.TestCase):
         self.assertIn('module', payload)
         self.assertNotEqual(len(modules), 0)
 
+    @mock.patch('api.my_flask.Redis.hscan', mock.MagicMock(return_value=(0, {})))
+    @mock.patch('api.my_flask.Redis.hgetall', mock.MagicMock(return_value={}))
     @mock.patch('api.my_flask.Redis.get')
     def test_get_modules_no_modules(self, mock_redis_get: mock.MagicMock):
-        """Redis get() method patched to return None.
-        Then empty OrderedDict is returned from modules_data() method.
+        """Redis hscan() method patched to return no data, so no modules batch is yielded from iter_modules_json().
+        get() and hgetall() are patched as well, but the endpoint only reads them with the latest-revision argument.
         Test error response when no modules found and 404 status code was returned.
         """
         # Patch mock to return None while getting value from Redis
@@ -897,6 +929,17 @@ class TestApiSearchClass(unittest.TestCase):
         self.assertEqual(data['description'], 'No module is loaded')
         self.assertEqual(data['error'], 'Not found -- in api code')
 
+    def test_get_modules_latest_revision(self):
+        """Test that not streamed response is returned when latest revision filter is applied.
+        """
+        result = self.client.get('api/search/modules?latest-revision=True')
+        payload = json.loads(result.data)
+        names = [module['name'] for module in payload]
+
+        self.assertEqual(result.status_code, 200)
+        self.assertNotEqual(len(names), 0)
+        self.assertEqual(len(names), len(set(names)))
+
     def test_get_vendors(self):
         """Test if vendors json payload has correct form (should not contain empty 'vendor' list)
         """
@@ -912,7 +955,7 @@ class TestApiSearchClass(unittest.TestCase):
     @mock.patch('api.my_flask.Redis.get')
     def test_get_vendors_no_vendors(self, mock_redis_get: mock.MagicMock):
         """Redis get() method patched to return None.
-        Then empty OrderedDict is returned from vendors_data() method.
+        Then empty dictionary is returned from vendors_data() method.
         Test error response when no modules found and 404 status code was returned.
         """
         # Patch mock to return None while getting value from Redis
@@ -940,10 +983,12 @@ class TestApiSearchClass(unittest.TestCase):
         self.assertIn('modules', yang_catalog_data)
         self.assertIn('vendors', yang_catalog_data)
 
+    @mock.patch('api.my_flask.Redis.hscan', mock.MagicMock(return_value=(0, {})))
+    @mock.patch('api.my_flask.Redis.hgetall', mock.MagicMock(return_value={}))
     @mock.patch('api.my_flask.Redis.get')
     def test_get_catalog_no_catalog_data(self, mock_redis_get: mock.MagicMock):
-        """Redis get() method patched to return None.
-        Then empty OrderedDict is returned from catalog_data() method.
+        """Redis get(), hgetall() and hscan() methods patched to return no data.
+        Then neither modules nor vendors are found.
         Test error response when no modules found and 404 status code was returned.
         """
         # Patch mock to return None while getting value from Redis
@@ -974,6 +1019,20 @@ class TestApiSearchClass(unittest.TestCase):
 
         self.assertEqual(yang_tree_data, response_text)
 
+    def test_create_tree_not_modified(self):
+        """Test if responded with code 304 if the ETag of the cached tree is sent in If-None-Match header.
+        """
+        url = 'api/services/tree/yang-catalog@2018-04-03.yang'
+
+        result = self.client.get(url)
+        etag = result.headers.get('ETag')
+        cached_result = self.client.get(url, headers={'If-None-Match': etag})
+
+        self.assertEqual(result.status_code, 200)
+        self.assertIsNotNone(etag)
+        self.assertEqual(cached_result.status_code, 304)
+        self.assertEqual(cached_result.headers.get('ETag'), etag)
+
     def test_create_tree_incorrect_yang(self):
         """Test if responded with code 400 if the input arguments are not correct (incorrect yang module name).
         """
@@ -1035,24 +1094,24 @@ class TestApiSearchClass(unittest.TestCase):
         self.assertIn(expected_message, data)
 
     @mock.patch('api.views.ycSearch.ycSearch.ac', ac)
+    @mock.patch('api.my_flask.Redis.hgetall', mock.MagicMock(return_value={}))
     @mock.patch('api.my_flask.Redis.get')
     def test_modules_data_no_value(self, mock_redis_get: mock.MagicMock):
-        """Redis get() method patched to return None.
-        Then empty OrderedDict is returned from modules_data() method
+        """Redis get() and hgetall() methods patched to return no data.
+        Then empty dictionary is returned from modules_data() method
         """
         # Patch mock to return None while getting value from Redis
         mock_redis_get.return_value = None
         with app.app_context():
             result = search_bp.modules_data()
 
-        self.assertEqual(len(result), 0)
-        self.assertIsInstance(result, collections.OrderedDict)
+        self.assertEqual(result, {})
 
     @mock.patch('api.views.ycSearch.ycSearch.ac', ac)
     @mock.patch('api.my_flask.Redis.get')
     def test_vendors_data_no_value(self, mock_redis_get: mock.MagicMock):
         """Redis get() method patched to return None.
-        Then empty OrderedDict is returned from vendors_data() method
+        Then empty dictionary is returned from vendors_data() method
         """
         # Patch mock to return None while getting value from Redis
         mock_redis_get.return_value = None
@@ -1060,12 +1119,13 @@ class TestApiSearchClass(unittest.TestCase):
             result = search_bp.vendors_data()
 
         self.assertEqual(len(result), 0)
-        self.assertIsInstance(result, collections.OrderedDict)
+        self.assertIsInstance(result, dict)
 
+    @mock.patch('api.my_flask.Redis.hgetall', mock.MagicMock(return_value={}))
     @mock.patch('api.my_flask.Redis.get')
     def test_catalog_data_no_value(self, mock_redis_get: mock.MagicMock):
-        """Redis get() method patched to return None.
-        Then empty OrderedDict is returned from catalog_data() method
+        """Redis get() and hgetall() methods patched to return no data.
+        Then empty dictionary is returned from catalog_data() method
         """
         search_bp.ac = ac
         # Patch mock to return None while getting value from Redis
@@ -1074,7 +1134,7 @@ class TestApiSearchClass(unittest.TestCase):
             result = search_bp.catalog_data()
 
         self.assertEqual(len(result), 0)
-        self.assertIsInstance(result, collections.OrderedDict)
+        self.assertIsInstance(result, dict)
 
 
 if __name__ == '__main__':
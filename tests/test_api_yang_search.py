@@ -0,0 +1,106 @@
+# Copyright The IETF Trust 2022, All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+__copyright__ = 'Copyright The IETF Trust 2022, All Rights Reserved'
+__license__ = 'Apache License, Version 2.0'
+
+import unittest
+from unittest import mock
+
+from api.yangCatalogApi import app
+from elasticsearch import ConnectionTimeout
+from elasticsearchIndexing.es_manager import yindex_metadata
+from parseAndPopulate.populate import Populate
+
+ac = app.config
+METADATA = yindex_metadata({'maturity-level': 'ratified', 'dependents': [], 'compilation-status': 'passed',
+                            'namespace': 'urn:test', 'yang-version': '1.1'})
+
+
+def hit(number: int) -> dict:
+    source = {
+        'argument': 'leaf-{}'.format(number),
+        'revision': '2022-01-01',
+        'statement': 'leaf',
+        'path': '/test/leaf-{}'.format(number),
+        'module': 'module-{}'.format(number % 3),
+        'organization': 'ietf',
+        'description': '',
+        **METADATA
+    }
+    return {'_source': source, 'sort': [True, 1.0, '{:04}'.format(number)]}
+
+
+def point_in_time_search(query: dict, pit_id: str, keep_alive: str, response_size: int, search_after=None) -> dict:
+    hits = [hit(number) for number in range(25)]
+    hits = [hit for hit in hits if search_after is None or hit['sort'] > search_after]
+    return {'pit_id': pit_id, 'hits': {'hits': hits[:response_size]}}
+
+
+class TestApiYangSearchClass(unittest.TestCase):
+
+    def setUp(self):
+        self.client = app.test_client()
+        self.es_manager = mock.MagicMock()
+        self.es_manager.open_point_in_time.return_value = 'pit-id'
+        self.es_manager.point_in_time_search.side_effect = point_in_time_search
+        es_manager_patcher = mock.patch.object(ac, 'es_manager', self.es_manager)
+        es_manager_patcher.start()
+        self.addCleanup(es_manager_patcher.stop)
+        self.payload = {'searched-term': 'leaf', 'searched-fields': ['argument'], 'page-size': 10}
+
+    def tearDown(self):
+        app.search_cache.redis.flushdb()
+
+    def search(self, payload: dict) -> dict:
+        response = self.client.post('api/yang-search/v2/search', json=payload)
+        self.assertEqual(response.status_code, 200)
+        return response.json
+
+    def test_search_cached(self):
+        first = self.search(self.payload)
+        second = self.search(self.payload)
+
+        self.assertEqual(self.es_manager.point_in_time_search.call_count, 1)
+        self.assertEqual(second['rows'], first['rows'])
+        self.assertTrue(second['max-hits'])
+        self.assertIsNotNone(second['continuation-token'])
+        self.assertEqual(self.es_manager.open_point_in_time.call_count, 2)
+
+        next_page = self.search({**self.payload, 'continuation-token': second['continuation-token']})
+
+        self.assertEqual([row['name'] for row in next_page['rows']],
+                         ['leaf-{}'.format(number) for number in range(10, 20)])
+
+    def test_search_cached_point_in_time_timeout(self):
+        first = self.search(self.payload)
+        self.es_manager.open_point_in_time.side_effect = ConnectionTimeout('TIMEOUT', 'timed out', None)
+
+        second = self.search(self.payload)
+
+        self.assertEqual(second['rows'], first['rows'])
+        self.assertIsNone(second['continuation-token'])
+        self.assertTrue(second['timeout'])
+
+    def test_search_cache_invalidated(self):
+        self.search(self.payload)
+
+        Populate._invalidate_search_cache(mock.MagicMock())
+        self.search(self.payload)
+
+        self.assertEqual(self.es_manager.point_in_time_search.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+# Copyright The IETF Trust 2022, All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+__copyright__ = 'Copyright The IETF Trust 2022, All Rights Reserved'
+__license__ = 'Apache License, Version 2.0'
+
+import tempfile
+import unittest
+from unittest import mock
+
+from api.views.yangSearch.elkSearch import ElkSearch, InvalidContinuationToken
+from api.views.yangSearch.search_params import SearchParams
+from elasticsearch import ConnectionTimeout, NotFoundError
+from elasticsearchIndexing.es_manager import yindex_metadata
+from utility.staticVariables import OUTPUT_COLUMNS
+
+METADATA = yindex_metadata({'maturity-level': 'ratified', 'dependents': [], 'compilation-status': 'passed',
+                            'namespace': 'urn:test', 'yang-version': '1.1'})
+
+
+def hit(number: int) -> dict:
+    source = {
+        'argument': 'leaf-{}'.format(number),
+        'revision': '2022-01-01',
+        'statement': 'leaf',
+        'path': '/test/leaf-{}'.format(number),
+        'module': 'module-{}'.format(number % 3),
+        'organization': 'ietf',
+        'description': '',
+        **METADATA
+    }
+    return {'_source': source, 'sort': [True, 1.0, '{:04}'.format(number)]}
+
+
+class FakePointInTime:
+    """Serves sorted hits after the search_after values, like a point in time of the index."""
+
+    def __init__(self, hits: list):
+        self.hits = hits
+        self.closed = False
+
+    def search(self, query: dict, pit_id: str, keep_alive: str, response_size: int, search_after=None) -> dict:
+        if self.closed:
+            raise NotFoundError(404, 'search_context_missing_exception')
+        hits = [hit for hit in self.hits if search_after is None or hit['sort'] > search_after]
+        return {'pit_id': pit_id, 'hits': {'hits': hits[:response_size]}}
+
+
+class TestElkSearchClass(unittest.TestCase):
+
+    def setUp(self):
+        self.point_in_time = FakePointInTime([hit(number) for number in range(25)])
+        self.es_manager = mock.MagicMock()
+        self.es_manager.open_point_in_time.return_value = 'pit-id'
+        self.es_manager.point_in_time_search.side_effect = self.point_in_time.search
+        self.es_manager.close_point_in_time.side_effect = lambda _: setattr(self.point_in_time, 'closed', True)
+        self.logs_dir = tempfile.mkdtemp()
+
+    def elk_search(self, searched_term: str = 'leaf') -> ElkSearch:
+        search_params = SearchParams(
+            case_sensitive=False, query_type='term', include_mibs=False, latest_revision=True,
+            searched_fields=['argument'], yang_versions=['1.0', '1.1'], schema_types=['leaf'],
+            output_columns=OUTPUT_COLUMNS, sub_search=[]
+        )
+        elk_search = ElkSearch(searched_term, self.logs_dir, self.es_manager, mock.MagicMock(), search_params)
+        elk_search.construct_query()
+        return elk_search
+
+    def test_search_pages(self):
+        names = []
+        continuation_token = None
+        for _ in range(3):
+            rows, continuation_token = self.elk_search().search(10, continuation_token)
+            names.extend(row['name'] for row in rows)
+
+        self.assertIsNone(continuation_token)
+        self.assertEqual(names, ['leaf-{}'.format(number) for number in range(25)])
+        self.es_manager.open_point_in_time.assert_called_once()
+        self.es_manager.close_point_in_time.assert_called_once_with('pit-id')
+
+    def test_search_invalid_continuation_token(self):
+        with self.assertRaises(InvalidContinuationToken):
+            self.elk_search().search(10, 'invalid')
+
+    def test_search_continuation_token_of_different_search(self):
+        _, continuation_token = self.elk_search().search(10)
+
+        with self.assertRaises(InvalidContinuationToken):
+            self.elk_search('other').search(10, continuation_token)
+
+    def test_search_expired(self):
+        _, continuation_token = self.elk_search().search(10)
+        self.point_in_time.closed = True
+
+        with self.assertRaises(InvalidContinuationToken):
+            self.elk_search().search(10, continuation_token)
+
+    def test_search_point_in_time_timeout(self):
+        self.es_manager.open_point_in_time.side_effect = ConnectionTimeout('TIMEOUT', 'timed out', None)
+        elk_search = self.elk_search()
+
+        self.assertEqual(elk_search.search(10), ([], None))
+        self.assertTrue(elk_search.timeout)
+        self.es_manager.point_in_time_search.assert_not_called()
+
+    def test_continuation_token_point_in_time_timeout(self):
+        self.es_manager.open_point_in_time.side_effect = ConnectionTimeout('TIMEOUT', 'timed out', None)
+        elk_search = self.elk_search()
+
+        self.assertIsNone(elk_search.continuation_token(['sort']))
+        self.assertTrue(elk_search.timeout)
+
+
+if __name__ == '__main__':
+    unittest.main()
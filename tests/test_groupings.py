@@ -27,7 +27,7 @@ from api.globalConfig import yc_gc
 from parseAndPopulate.dir_paths import DirPaths
 from parseAndPopulate.dumper import Dumper
 from parseAndPopulate.file_hasher import FileHasher
-from parseAndPopulate.groupings import (SdoDirectory, VendorCapabilities,
+from parseAndPopulate.groupings import (SchemasSnapshot, SdoDirectory, VendorCapabilities,
                                         VendorGrouping, VendorYangLibrary)
 from parseAndPopulate.modules import SdoModule
 from sandbox import generate_schema_urls
@@ -89,6 +89,49 @@ class TestGroupingsClass(unittest.TestCase):
         self.assertListEqual(sorted(sdo_directory.dumper.yang_modules),
                              ['sdo-first@2022-08-05/ietf', 'sdo-second@2022-08-05/ietf', 'sdo-third@2022-08-05/ietf'])
 
+    @mock.patch('parseAndPopulate.groupings.repoutil.RepoUtil.get_commit_hash')
+    def test_sdo_directory_parse_and_load_workers(self, mock_hash: mock.MagicMock):
+        """
+        Test whether modules parsed by multiple worker processes are dumped
+        exactly the same way as the modules parsed serially.
+
+        Arguments:
+            :param mock_hash        (mock.MagicMock) get_commit_hash() method is patched, to always return 'master'
+        """
+        mock_hash.return_value = 'master'
+        path = self.resource('owner/repo/sdo')
+        api = False
+        path_to_name_rev = {
+            self.resource('owner/repo/sdo/sdo-first.yang'): ('first', '2022-08-05'),
+            self.resource('owner/repo/sdo/sdo-second.yang'): ('second', '2022-08-05'),
+            self.resource('owner/repo/sdo/subdir/sdo-third.yang'): ('third', '2022-08-05')
+        }
+
+        dumps = []
+        for workers in (1, 2):
+            dumper = Dumper(yc_gc.logs_dir, '{}-workers-{}'.format(self.prepare_output_filename, workers))
+            sdo_directory = SdoDirectory(path, dumper, self.file_hasher, api, self.dir_paths, path_to_name_rev,
+                                         workers=workers)
+            sdo_directory.parse_and_load()
+            dumper.dump_modules(yc_gc.temp_dir)
+            with open(os.path.join(yc_gc.temp_dir, '{}.json'.format(dumper.file_name))) as f:
+                dumps.append(f.read())
+
+        self.assertIn('sdo-first', dumps[0])
+        self.assertEqual(dumps[0], dumps[1])
+
+    def test_schemas_snapshot(self):
+        schemas = {'first@2022-08-05': 'first-url', 'second@2022-08-05': None, 'third@2022-08-05': 'third-url'}
+        positions = {name_revision: position for position, name_revision in enumerate(schemas)}
+
+        snapshot = SchemasSnapshot(schemas, positions, 2)
+
+        self.assertEqual(snapshot['first@2022-08-05'], 'first-url')
+        self.assertIn('second@2022-08-05', snapshot)
+        self.assertNotIn('third@2022-08-05', snapshot)
+        self.assertNotIn('fourth@2022-08-05', snapshot)
+        self.assertEqual(dict(snapshot), {'first@2022-08-05': 'first-url', 'second@2022-08-05': None})
+
     @mock.patch('parseAndPopulate.groupings.repoutil.RepoUtil.get_commit_hash')
     def test_sdo_directory_parse_and_load_api(self, mock_hash: mock.MagicMock):
         """
@@ -0,0 +1,110 @@
+# Copyright The IETF Trust 2022, All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+__copyright__ = 'Copyright The IETF Trust 2022, All Rights Reserved'
+__license__ = 'Apache License, Version 2.0'
+
+import json
+import os
+import unittest
+from unittest import mock
+
+from api.modules_catalog import ModulesCatalog, ModulesIndex
+from redisConnections.redisConnection import RedisConnection
+
+
+class TestModulesCatalogClass(unittest.TestCase):
+
+    def __init__(self, *args, **kwargs):
+        super(TestModulesCatalogClass, self).__init__(*args, **kwargs)
+        self.resources_path = os.path.join(os.environ['BACKEND'], 'redisConnections/tests/resources')
+        self.redis_connection = RedisConnection(modules_db=6, vendors_db=9)
+        self.redis_key = 'ietf-bgp@2021-10-25/ietf'
+
+    def setUp(self):
+        with open(os.path.join(self.resources_path, 'ietf-bgp@2021-10-25.json'), 'r') as f:
+            self.module = json.load(f)
+        self.redis_connection.set_redis_module(self.module, self.redis_key)
+        self.catalog = ModulesCatalog(self.redis_connection)
+
+    def tearDown(self):
+        self.redis_connection.modulesDB.flushdb()
+
+    def test_modules(self):
+        modules = self.catalog.modules()
+
+        self.assertEqual(len(modules), 1)
+        self.assertEqual(modules[0]['name'], 'ietf-bgp')
+
+    def test_modules_decoded_only_once(self):
+        self.catalog.modules()
+        with mock.patch.object(self.redis_connection, 'get_modules_data') as mock_get_modules_data:
+            self.catalog.modules()
+
+        mock_get_modules_data.assert_not_called()
+
+    def test_modules_reloaded_after_module_deletion(self):
+        self.catalog.modules()
+        self.redis_connection.delete_modules([self.redis_key])
+
+        self.assertEqual(self.catalog.modules(), [])
+
+    def test_modules_missing_generation(self):
+        self.catalog.modules()
+        self.redis_connection.modulesDB.flushdb()
+
+        self.assertEqual(self.catalog.modules(), [])
+
+
+class TestModulesIndexClass(unittest.TestCase):
+
+    def setUp(self):
+        self.modules = [
+            {
+                'name': 'ietf-interfaces', 'organization': 'ietf', 'ietf': {'ietf-wg': 'netmod'},
+                'implementations': {'implementation': [{'vendor': 'cisco', 'platform': 'asr9k'}]}
+            },
+            {
+                'name': 'openconfig-interfaces', 'organization': 'openconfig',
+                'implementations': {'implementation': [{'vendor': 'cisco', 'platform': 'ncs5k'},
+                                                       {'vendor': 'huawei', 'platform': 'ne40e'}]}
+            },
+            {'name': 'ietf-routing', 'organization': 'ietf', 'ietf': {'ietf-wg': 'netmod'}}
+        ]
+        self.index = ModulesIndex(self.modules)
+
+    def test_lookup(self):
+        self.assertEqual(self.index.lookup('organization', 'ietf'), {0, 2})
+        self.assertEqual(self.index.lookup('ietf/ietf-wg', 'netmod'), {0, 2})
+        self.assertEqual(self.index.lookup('implementations/implementation/vendor', 'huawei'), {1})
+        self.assertEqual(self.index.lookup('organization', 'random-organization'), set())
+
+    def test_lookup_partial(self):
+        self.assertEqual(self.index.lookup('name', 'interfaces', partial=True), {0, 1})
+        self.assertEqual(self.index.lookup('name', 'ro', partial=True), {2})
+
+    def test_candidates(self):
+        body = {
+            'organization': 'openconfig',
+            'implementations': {'implementation': [{'vendor': 'cisco', 'platform': 'ncs5k'}]}
+        }
+
+        self.assertEqual(self.index.candidates(body), {1})
+
+    def test_candidates_no_indexed_leaf(self):
+        self.assertIsNone(self.index.candidates({'description': 'Interfaces'}))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -17,6 +17,8 @@ __copyright__ = 'Copyright The IETF Trust 2021, All Rights Reserved'
 __license__ = 'Apache License, Version 2.0'
 __email__ = 'slavomir.mazur@pantheon.tech'
 
+import glob
+import json
 import os
 import shutil
 import unittest
@@ -76,6 +78,50 @@ class TestParseDirectoryClass(unittest.TestCase):
             }
         )
 
+    def test_save_files_incremental(self):
+        save_file_dir = self.resource('all_modules')
+        shutil.rmtree(save_file_dir, ignore_errors=True)
+        os.mkdir(save_file_dir)
+        manifest_path = os.path.join(save_file_dir, '.manifest.json')
+        logger = mock.MagicMock()
+
+        first = pd.save_files(self.resource('sdo'), save_file_dir, manifest_path, True, logger)
+        os.remove(os.path.join(save_file_dir, 'sdo-third@2022-08-05.yang'))
+        with mock.patch('parseAndPopulate.parse_directory.resolve_name_revision') as mock_resolve:
+            second = pd.save_files(self.resource('sdo'), save_file_dir, manifest_path, True, logger)
+        shutil.rmtree(save_file_dir)
+
+        self.assertEqual(first, second)
+        mock_resolve.assert_not_called()
+        self.assertEqual(logger.info.call_args_list, [
+            mock.call('Yang files scanned: 3, copied: 0, linked: 3, skipped: 0'),
+            mock.call('Yang files scanned: 3, copied: 0, linked: 1, skipped: 2'),
+        ])
+
+    def test_save_files_manifest_keeps_only_current_files(self):
+        save_file_dir = self.resource('all_modules')
+        shutil.rmtree(save_file_dir, ignore_errors=True)
+        os.mkdir(save_file_dir)
+        manifest_path = os.path.join(save_file_dir, '.manifest.json')
+        with open(manifest_path, 'w') as f:
+            json.dump({'/removed/dir/removed.yang': [0, 0, 'removed', '2020-01-01']}, f)
+
+        pd.save_files(self.resource('sdo'), save_file_dir, manifest_path, True)
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        shutil.rmtree(save_file_dir)
+
+        self.assertEqual(sorted(manifest), sorted(glob.glob(os.path.join(self.resource('sdo'), '**/*.yang'),
+                                                            recursive=True)))
+
+    def test_manifest_path_for(self):
+        first = pd.manifest_path_for('/var/yang/cache', self.resource('sdo'))
+        second = pd.manifest_path_for('/var/yang/cache', self.resource('sdo/subdir'))
+
+        self.assertNotEqual(first, second)
+        self.assertEqual(first, pd.manifest_path_for('/var/yang/cache', '{}/'.format(self.resource('sdo'))))
+        self.assertEqual(os.path.dirname(first), '/var/yang/cache')
+
     @mock.patch('parseAndPopulate.parse_directory.SdoDirectory')
     def test_parse_sdo_generic(self, mock_sdo_directory_cls: mock.MagicMock):
         dumper = mock.MagicMock()
@@ -88,7 +134,8 @@ class TestParseDirectoryClass(unittest.TestCase):
             e.args = (*e.args, 'This probably means the constructor of IanaDirectory was called.')
             raise e
 
-        mock_sdo_directory_cls.assert_called_with(self.resource('sdo'), dumper, file_hasher, False, self.dir_paths, {})
+        mock_sdo_directory_cls.assert_called_with(self.resource('sdo'), dumper, file_hasher, False, self.dir_paths, {},
+                                                  workers=1)
         mock_sdo_directory = mock_sdo_directory_cls.return_value
         mock_sdo_directory.parse_and_load.assert_called()
 
@@ -104,7 +151,8 @@ class TestParseDirectoryClass(unittest.TestCase):
             e.args = (*e.args, 'This probably means the constructor of SdoDirectory was called.')
             raise e
 
-        mock_iana_directory_cls.assert_called_with(self.resource('iana'), dumper, file_hasher, False, self.dir_paths, {})
+        mock_iana_directory_cls.assert_called_with(self.resource('iana'), dumper, file_hasher, False, self.dir_paths, {},
+                                                   workers=1)
         mock_iana_directory = mock_iana_directory_cls.return_value
         mock_iana_directory.parse_and_load.assert_called()
 
@@ -119,13 +167,13 @@ class TestParseDirectoryClass(unittest.TestCase):
 
         root = self.resource('vendor/yang_lib')
         filename = os.path.join(root, 'ietf-yang-library.xml')
-        mock_yang_lib_cls.assert_called_with(root, filename, dumper, file_hasher, False, self.dir_paths, {})
+        mock_yang_lib_cls.assert_called_with(root, filename, dumper, file_hasher, False, self.dir_paths, {}, workers=1)
         mock_yang_lib = mock_yang_lib_cls.return_value
         mock_yang_lib.parse_and_load.assert_called()
 
         root = self.resource('vendor/capabilities')
         filename = os.path.join(root, 'capabilities.xml')
-        mock_capabilities_cls.assert_called_with(root, filename, dumper, file_hasher, False, self.dir_paths, {})
+        mock_capabilities_cls.assert_called_with(root, filename, dumper, file_hasher, False, self.dir_paths, {}, workers=1)
         mock_capabilities = mock_capabilities_cls.return_value
         mock_capabilities.parse_and_load.assert_called()
 
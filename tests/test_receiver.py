@@ -26,6 +26,8 @@ from unittest import mock
 from api.receiver import Receiver
 from api.status_message import StatusMessage
 from ddt import data, ddt
+from elasticsearchIndexing.es_manager import yindex_metadata
+from elasticsearchIndexing.models.es_indices import ESIndices
 from redis import Redis
 from redisConnections.redisConnection import RedisConnection
 from utility.create_config import create_config
@@ -267,6 +269,31 @@ class TestReceiverClass(TestReceiverBaseClass):
             dependents_list = [f'{dep["name"]}@{dep.get("revision")}' for dep in module.get('dependents', [])]
             self.assertNotIn('another-yang-module@2020-03-01', dependents_list)
 
+    @mock.patch('api.receiver.prepare_for_es_removal', mock.MagicMock)
+    @mock.patch('utility.util.ESManager')
+    def test_process_module_deletion_updates_dependents_in_es(self, es_manager_mock: mock.MagicMock):
+        module_to_populate = self.test_data.get('module-deletion-tests')
+        self.redisConnection.populate_modules(module_to_populate)
+        self.redisConnection.reload_modules_cache()
+
+        modules_to_delete = {
+            'modules': [
+                {
+                    'name': 'another-yang-module',
+                    'revision': '2020-03-01',
+                    'organization': 'ietf'
+                }
+            ]}
+        arguments = ['DELETE-MODULES', *self.credentials, json.dumps(modules_to_delete)]
+        status, _ = self.receiver.process_module_deletion(arguments)
+
+        self.assertEqual(status, StatusMessage.SUCCESS)
+        es_manager_mock.return_value.update_module_metadata.assert_called_once()
+        index, es_modules = es_manager_mock.return_value.update_module_metadata.call_args.args
+        self.assertEqual(index, ESIndices.YINDEX)
+        self.assertEqual([module['name'] for module in es_modules], ['yang-module'])
+        self.assertEqual(yindex_metadata(es_modules[0])['dependents'], 0)
+
     @mock.patch('api.receiver.prepare_for_es_removal', mock.MagicMock)
     def test_process_module_deletion_cannot_delete(self):
         module_to_populate = self.test_data.get('module-deletion-tests')
@@ -0,0 +1,68 @@
+# Copyright The IETF Trust 2022, All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+__copyright__ = 'Copyright The IETF Trust 2022, All Rights Reserved'
+__license__ = 'Apache License, Version 2.0'
+
+import json
+import os
+import unittest
+
+import zstandard
+
+from redisConnections.codec import RedisCodec
+from redisConnections.redisConnection import MODULES_DATA_KEY, RedisConnection
+from sandbox.reencode_redis_values import module_keys, reencode_keys, reencode_modules_data
+
+
+class TestReencodeRedisValuesClass(unittest.TestCase):
+    def setUp(self):
+        resources_path = os.path.join(os.environ['BACKEND'], 'redisConnections/tests/resources')
+        with open(os.path.join(resources_path, 'ietf-bgp@2021-10-25.json'), 'r') as f:
+            module = json.load(f)
+        self.modules = {
+            'ietf-bgp@2021-10-{:02d}/ietf'.format(day): {**module, 'revision': '2021-10-{:02d}'.format(day)}
+            for day in range(1, 6)
+        }
+        self.modules_db = RedisConnection(modules_db=6, vendors_db=9).modulesDB
+
+    def tearDown(self):
+        self.modules_db.flushdb()
+
+    def dictionary_codec(self, dictionary_size: int) -> RedisCodec:
+        samples = [
+            json.dumps({**module, 'description': 'Sample {}'.format(i)}).encode()
+            for module in self.modules.values() for i in range(20)
+        ]
+        return RedisCodec('zstd', zstandard.train_dictionary(dictionary_size, samples).as_bytes())
+
+    def test_reencode_with_retrained_dictionary(self):
+        current_codec = self.dictionary_codec(4096)
+        codec = self.dictionary_codec(2048)
+        encoded = {key: current_codec.encode(module) for key, module in self.modules.items()}
+        self.modules_db.mset(encoded)
+        self.modules_db.hset(MODULES_DATA_KEY, mapping=encoded)
+        with self.assertRaises(zstandard.ZstdError):
+            codec.decode(next(iter(encoded.values())))
+
+        reencode_keys(self.modules_db, module_keys(self.modules_db), current_codec, codec)
+        reencode_modules_data(self.modules_db, current_codec, codec)
+
+        for key, module in self.modules.items():
+            self.assertEqual(codec.decode(self.modules_db.get(key)), module)
+            self.assertEqual(codec.decode(self.modules_db.hget(MODULES_DATA_KEY, key)), module)
+
+
+if __name__ == '__main__':
+    unittest.main()
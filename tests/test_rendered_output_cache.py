@@ -0,0 +1,93 @@
+# Copyright The IETF Trust 2022, All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+__copyright__ = 'Copyright The IETF Trust 2022, All Rights Reserved'
+__license__ = 'Apache License, Version 2.0'
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from api.rendered_output_cache import RenderedOutputCache
+
+
+class TestRenderedOutputCacheClass(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache = RenderedOutputCache(os.path.join(self.temp_dir, 'rendered-output'), max_entries=10)
+        self.yang_file = os.path.join(self.temp_dir, 'module@2022-01-01.yang')
+        self.write_file(self.yang_file, 'module module { }')
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_set_get(self):
+        key = self.cache.key('tree', self.yang_file)
+        assert key
+
+        self.assertIsNone(self.cache.get(key))
+        self.cache.set(key, '<html></html>')
+        self.assertEqual(self.cache.get(key), '<html></html>')
+
+    def test_key_file_not_exists(self):
+        self.assertIsNone(self.cache.key('tree', os.path.join(self.temp_dir, 'missing@2022-01-01.yang')))
+
+    def test_key_changes_with_content_renderer_and_pyang_version(self):
+        key = self.cache.key('tree', self.yang_file)
+
+        self.assertNotEqual(key, self.cache.key('reference', self.yang_file))
+        with mock.patch('pyang.__version__', '0.0.0'):
+            self.assertNotEqual(key, RenderedOutputCache(self.cache.cache_dir).key('tree', self.yang_file))
+        self.write_file(self.yang_file, 'module module { prefix m; }')
+        self.assertNotEqual(key, self.cache.key('tree', self.yang_file))
+
+    def test_least_recently_used_evicted(self):
+        keys = []
+        for i in range(11):
+            path = os.path.join(self.temp_dir, 'module@2022-01-{:02d}.yang'.format(i + 1))
+            self.write_file(path, 'module module-{} {{ }}'.format(i))
+            keys.append(self.cache.key('tree', path))
+        for i, key in enumerate(keys[:10]):
+            self.cache.set(key, 'output {}'.format(i))
+            os.utime(os.path.join(self.cache.cache_dir, '{}.html'.format(key)), (i, i))
+        # Use the first output, so the second one is the least recently used
+        self.cache.get(keys[0])
+
+        self.cache.set(keys[10], 'output 10')
+
+        self.assertIsNotNone(self.cache.get(keys[0]))
+        self.assertIsNone(self.cache.get(keys[1]))
+        self.assertIsNone(self.cache.get(keys[2]))
+        self.assertIsNotNone(self.cache.get(keys[10]))
+        # Tenth of the maximum is evicted at once
+        self.assertEqual(len(os.listdir(self.cache.cache_dir)), 9)
+
+    def test_directory_listed_after_tenth_of_maximum_stored(self):
+        cache = RenderedOutputCache(self.cache.cache_dir, max_entries=100)
+
+        with mock.patch('api.rendered_output_cache.os.scandir', wraps=os.scandir) as mock_scandir:
+            for i in range(25):
+                cache.set('key-{}'.format(i), 'output {}'.format(i))
+
+        self.assertEqual(mock_scandir.call_count, 2)
+
+    def write_file(self, path: str, content: str):
+        with open(path, 'w') as f:
+            f.write(content)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -23,7 +23,6 @@ __copyright__ = 'Copyright The IETF Trust 2021, All Rights Reserved'
 __license__ = 'Apache License, Version 2.0'
 __email__ = 'slavomir.mazur@pantheon.tech'
 
-import json
 import os
 import random
 import string
@@ -59,8 +58,7 @@ if __name__ == '__main__':
     job_log(start_time, temp_dir, status=JobLogStatuses.IN_PROGRESS, filename=current_file_basename)
     try:
         redisConnection = RedisConnection()
-        yang_catalog_module = redisConnection.get_module('yang-catalog@2018-04-03/ietf')
-        module = json.loads(yang_catalog_module)
+        module = redisConnection.get_module_dict('yang-catalog@2018-04-03/ietf')
         error = confdService.patch_modules([module])
 
         if error:
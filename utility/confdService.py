@@ -26,8 +26,12 @@ __email__ = 'slavomir.mazur@pantheon.tech'
 
 import json
 import os
+import time
+import typing as t
+from concurrent.futures import ThreadPoolExecutor
 
 import requests
+from requests.adapters import HTTPAdapter
 
 import utility.log as log
 from utility import message_factory
@@ -35,12 +39,31 @@ from utility.create_config import create_config
 from utility.staticVariables import confd_headers
 
 
+class PatchMetric(t.NamedTuple):
+    """Latency of a single PATCH request sent to the ConfD."""
+    size: int
+    status_code: int
+    seconds: float
+
+
 class ConfdService:
+    chunk_size = 500
+
     def __init__(self):
         config = create_config()
         self.credentials = config.get('Secrets-Section', 'confd-credentials').strip('"').split(' ')
         self.log_directory = config.get('Directory-Section', 'logs')
         self.confd_prefix = config.get('Web-Section', 'confd-prefix')
+        self.patch_workers = int(config.get('Web-Section', 'confd-patch-workers', fallback=4))
+        self.patch_metrics: t.List[PatchMetric] = []
+
+        # Keep-alive connections reused by the bulk PATCH requests
+        self.session = requests.Session()
+        self.session.auth = (self.credentials[0], self.credentials[1])
+        self.session.headers.update(confd_headers)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.patch_workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
 
         self.LOGGER = log.get_logger('confdService', '{}/confdService.log'.format(self.log_directory))
 
@@ -76,56 +99,75 @@ class ConfdService:
 
     def _patch(self, data: list, type: str, log_file: str) -> bool:
         """Attempts to patch a list of JSON objects to confd in chunks.
-        Fall back to patching one by one on error. Data that causes errors
-        is recorded to a log file along with the errors.
-        
+        Chunks are sent concurrently by at most patch_workers threads sharing pooled connections.
+        Chunks rejected by confd are split in halves until the objects causing errors are isolated.
+        Data that causes errors is recorded to a log file along with the errors.
+        Latency of each sent request is kept in patch_metrics.
+
         Arguments:
             :param data     (list) List of JSON objects to be patched to confd.
             :param type     (str) Type of the JSON objects. This should be either "modules" or "vendors"
             :param log_file (str) Log file to record errors to.
             :return         (bool) Whether errors were encountered.
         """
-        errors = False
-        chunk_size = 500
-        failed_data = {}
-        chunks = [data[i:i + chunk_size] for i in range(0, len(data), chunk_size)]
+        self.patch_metrics = []
+        if not data:
+            return False
+        chunks = [data[i:i + self.chunk_size] for i in range(0, len(data), self.chunk_size)]
         path = '{}/restconf/data/yang-catalog:catalog/{}/'.format(self.confd_prefix, type)
-        self.LOGGER.debug('Sending PATCH request to patch multiple {}'.format(type))
-        for i, chunk in enumerate(chunks, start=1):
-            self.LOGGER.debug('Processing chunk {} out of {}'.format(i, len(chunks)))
-            patch_data = {type: {type.rstrip('s'): chunk}}
-            patch_json = json.dumps(patch_data)
-            response = requests.patch(path, patch_json, auth=(self.credentials[0], self.credentials[1]), headers=confd_headers)
-            if response.status_code == 400:
-                self.LOGGER.warning('Failed to batch patch {}, falling back to patching individually'.format(type))
-                for datum in chunk:
-                    patch_data = {type: {type.rstrip('s'): [datum]}}
-                    patch_json = json.dumps(patch_data)
-                    response = requests.patch(path, patch_json, auth=(self.credentials[0], self.credentials[1]), headers=confd_headers)
-                    if response.status_code == 400:
-                        errors = True
-                        with open(os.path.join(self.log_directory, log_file), 'a') as f:
-                            if type == 'modules':
-                                name_revision = '{}@{}'.format(datum['name'], datum['revision'])
-                                self.LOGGER.error('Failed to patch {} {}'.format(type.rstrip('s'), name_revision))
-                                try:
-                                    failed_data[name_revision] = json.loads(response.text)
-                                except json.decoder.JSONDecodeError:
-                                    self.LOGGER.exception('No test in response')
-                                f.write('{}@{} error: {}\n'.format(datum['name'], datum['revision'], response.text))
-                            elif type == 'vendors':
-                                platform_name = datum['platforms']['platform'][0]['name']
-                                vendor_platform = '{} {}'.format(datum['name'], platform_name)
-                                self.LOGGER.error('Failed to patch {} {}'.format(type.rstrip('s'), vendor_platform))
-                                try:
-                                    failed_data[vendor_platform] = json.loads(response.text)
-                                except json.decoder.JSONDecodeError:
-                                    self.LOGGER.exception('No test in response')
-                                f.write('{} {} error: {}\n'.format(datum['name'], platform_name, response.text))
+        self.LOGGER.debug('Sending PATCH request to patch {} {} in {} chunks'.format(len(data), type, len(chunks)))
+        with ThreadPoolExecutor(max_workers=min(self.patch_workers, len(chunks))) as executor:
+            failures = [failure for chunk_failures in
+                        executor.map(lambda chunk: self._patch_chunk(path, type, chunk), chunks)
+                        for failure in chunk_failures]
+        self._log_patch_metrics(type)
+
+        failed_data = {}
+        for datum, response in failures:
+            with open(os.path.join(self.log_directory, log_file), 'a') as f:
+                if type == 'modules':
+                    name_revision = '{}@{}'.format(datum['name'], datum['revision'])
+                    self.LOGGER.error('Failed to patch {} {}'.format(type.rstrip('s'), name_revision))
+                    try:
+                        failed_data[name_revision] = json.loads(response.text)
+                    except json.decoder.JSONDecodeError:
+                        self.LOGGER.exception('No test in response')
+                    f.write('{}@{} error: {}\n'.format(datum['name'], datum['revision'], response.text))
+                elif type == 'vendors':
+                    platform_name = datum['platforms']['platform'][0]['name']
+                    vendor_platform = '{} {}'.format(datum['name'], platform_name)
+                    self.LOGGER.error('Failed to patch {} {}'.format(type.rstrip('s'), vendor_platform))
+                    try:
+                        failed_data[vendor_platform] = json.loads(response.text)
+                    except json.decoder.JSONDecodeError:
+                        self.LOGGER.exception('No test in response')
+                    f.write('{} {} error: {}\n'.format(datum['name'], platform_name, response.text))
         if failed_data:
             mf = message_factory.MessageFactory()
             mf.send_confd_writing_failures(type, failed_data)
-        return errors
+        return bool(failures)
+
+    def _patch_chunk(self, path: str, type: str, chunk: list) -> t.List[t.Tuple[dict, requests.Response]]:
+        """Patch the chunk, bisect it on error. Return objects which confd refused together with the responses."""
+        patch_json = json.dumps({type: {type.rstrip('s'): chunk}})
+        start = time.perf_counter()
+        response = self.session.patch(path, patch_json)
+        seconds = time.perf_counter() - start
+        self.patch_metrics.append(PatchMetric(len(chunk), response.status_code, seconds))
+        self.LOGGER.debug('PATCH of {} {} returned {} in {:.3f} seconds'.format(
+            len(chunk), type, response.status_code, seconds))
+        if response.status_code != 400:
+            return []
+        if len(chunk) == 1:
+            return [(chunk[0], response)]
+        self.LOGGER.warning('Failed to batch patch {} {}, splitting the chunk'.format(len(chunk), type))
+        middle = len(chunk) // 2
+        return self._patch_chunk(path, type, chunk[:middle]) + self._patch_chunk(path, type, chunk[middle:])
+
+    def _log_patch_metrics(self, type: str):
+        seconds = [metric.seconds for metric in self.patch_metrics]
+        self.LOGGER.info('Sent {} PATCH requests of {} in {:.3f} seconds, average {:.3f}, maximum {:.3f}'.format(
+            len(seconds), type, sum(seconds), sum(seconds) / len(seconds), max(seconds)))
 
     def patch_modules(self, modules: list) -> bool:
         return self._patch(modules, 'modules', 'confd-failed-patch-modules.log')
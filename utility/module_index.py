@@ -0,0 +1,237 @@
+# Copyright The IETF Trust 2022, All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+SQLite index of the yang files stored in the save-file-dir. The list of files is synchronized
+with the directory whenever the directory's modification time changes, so the latest revision
+of a module can be found without listing the whole directory. A directory modified within the last second
+is listed once more after the second passes, changes made within that second may be found only then.
+Header metadata of each file (name, revision, organization, namespace, prefix, belongs-to, imports,
+includes and content hash) is parsed when it is first requested and kept until the file's modification
+time or size changes.
+The index is shared by all the processes using the same save-file-dir, each process has its own connection.
+"""
+
+__copyright__ = 'Copyright The IETF Trust 2022, All Rights Reserved'
+__license__ = 'Apache License, Version 2.0'
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import typing as t
+from configparser import ConfigParser
+
+from parseAndPopulate.resolvers.organization import OrganizationResolver
+from utility import yangParser
+from utility.create_config import create_config
+
+BLOCK_SIZE = 65536
+# Directory modified less than a second ago may be modified again without changing its modification time,
+# so it is listed once more after the second passes
+RACY_INTERVAL_NS = 1_000_000_000
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS files (
+    filename TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    metadata_mtime_ns INTEGER,
+    metadata_size INTEGER,
+    module_name TEXT,
+    revision TEXT,
+    organization TEXT,
+    namespace TEXT,
+    prefix TEXT,
+    belongs_to TEXT,
+    imports TEXT,
+    includes TEXT,
+    hash TEXT
+);
+CREATE INDEX IF NOT EXISTS files_name ON files (name, filename);
+'''
+
+
+class IndexedModule(t.NamedTuple):
+    """Header metadata of an indexed yang file."""
+    path: str
+    name: str
+    revision: t.Optional[str]
+    organization: str
+    namespace: t.Optional[str]
+    prefix: t.Optional[str]
+    belongs_to: t.Optional[str]
+    imports: t.List[str]
+    includes: t.List[str]
+    hash: str
+
+
+class ModuleIndex:
+
+    def __init__(self, save_file_dir: str, index_path: str):
+        """
+        Arguments:
+            :param save_file_dir    (str) directory with the yang files saved as <name>@<revision>.yang
+            :param index_path       (str) path to the SQLite database file of the index
+        """
+        self.save_file_dir = save_file_dir
+        self.index_path = index_path
+        self._lock = threading.Lock()
+        self._pid = None
+        self._connection: t.Optional[sqlite3.Connection] = None
+        self._directory_mtime_ns = None
+        self._directory_settled = False
+        os.makedirs(os.path.dirname(os.path.abspath(index_path)), exist_ok=True)
+
+    def latest(self, name: str) -> t.Optional[str]:
+        """ Return path to the latest revision of the module, the same file as the maximum
+        of the files matching '<name>@*.yang' glob in the save-file-dir. None is returned if there is no such file.
+        """
+        with self._lock:
+            self._refresh()
+            row = self._connect().execute(
+                'SELECT filename FROM files WHERE name = ? ORDER BY filename DESC LIMIT 1', (name,)
+            ).fetchone()
+        if row is None:
+            return None
+        return os.path.join(self.save_file_dir, row[0])
+
+    def metadata(self, name: str, revision: t.Optional[str] = None) -> t.Optional[IndexedModule]:
+        """ Return header metadata of the module's file, the latest revision is used if no revision is specified.
+        Metadata are parsed and stored if they are not in the index yet, or the file was changed since then.
+        None is returned if there is no such file or it can not be parsed.
+        """
+        if revision is None:
+            path = self.latest(name)
+            if path is None:
+                return None
+            filename = os.path.basename(path)
+        else:
+            filename = '{}@{}.yang'.format(name, revision)
+        path = os.path.join(self.save_file_dir, filename)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        with self._lock:
+            row = self._connect().execute(
+                'SELECT module_name, revision, organization, namespace, prefix, belongs_to, imports, includes, hash '
+                'FROM files WHERE filename = ? AND metadata_mtime_ns = ? AND metadata_size = ?',
+                (filename, stat.st_mtime_ns, stat.st_size)
+            ).fetchone()
+        if row is not None:
+            module_name, revision, organization, namespace, prefix, belongs_to, imports, includes, file_hash = row
+            return IndexedModule(path, module_name, revision, organization, namespace, prefix, belongs_to,
+                                 json.loads(imports), json.loads(includes), file_hash)
+        try:
+            module = self._parse_metadata(path)
+        except yangParser.ParseException:
+            return None
+        with self._lock, self._connect() as connection:
+            connection.execute(
+                'INSERT INTO files (filename, name, mtime_ns, size) VALUES (?, ?, ?, ?) '
+                'ON CONFLICT (filename) DO UPDATE SET mtime_ns = excluded.mtime_ns, size = excluded.size',
+                (filename, name, stat.st_mtime_ns, stat.st_size)
+            )
+            connection.execute(
+                'UPDATE files SET metadata_mtime_ns = ?, metadata_size = ?, module_name = ?, revision = ?, '
+                'organization = ?, namespace = ?, prefix = ?, belongs_to = ?, imports = ?, includes = ?, hash = ? '
+                'WHERE filename = ?',
+                (stat.st_mtime_ns, stat.st_size, module.name, module.revision, module.organization, module.namespace,
+                 module.prefix, module.belongs_to, json.dumps(module.imports), json.dumps(module.includes),
+                 module.hash, filename)
+            )
+        return module
+
+    def refresh(self):
+        """ Synchronize the list of the indexed files with the save-file-dir. """
+        with self._lock:
+            self._directory_mtime_ns = None
+            self._refresh()
+
+    def _refresh(self):
+        try:
+            directory_mtime_ns = os.stat(self.save_file_dir).st_mtime_ns
+        except FileNotFoundError:
+            return
+        scan_ns = time.time_ns()
+        if directory_mtime_ns == self._directory_mtime_ns and (
+                self._directory_settled or scan_ns - directory_mtime_ns <= RACY_INTERVAL_NS):
+            return
+        files = {}
+        with os.scandir(self.save_file_dir) as entries:
+            for entry in entries:
+                if '@' not in entry.name or not entry.name.endswith('.yang') or entry.name.startswith('.'):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                files[entry.name] = (stat.st_mtime_ns, stat.st_size)
+        with self._connect() as connection:
+            indexed = {filename: (mtime_ns, size) for filename, mtime_ns, size
+                       in connection.execute('SELECT filename, mtime_ns, size FROM files')}
+            removed = indexed.keys() - files.keys()
+            connection.executemany('DELETE FROM files WHERE filename = ?', ((filename,) for filename in removed))
+            connection.executemany(
+                'INSERT INTO files (filename, name, mtime_ns, size) VALUES (?, ?, ?, ?) '
+                'ON CONFLICT (filename) DO UPDATE SET mtime_ns = excluded.mtime_ns, size = excluded.size',
+                ((filename, filename.split('@', 1)[0], mtime_ns, size)
+                 for filename, (mtime_ns, size) in files.items() if indexed.get(filename) != (mtime_ns, size))
+            )
+        self._directory_mtime_ns = directory_mtime_ns
+        self._directory_settled = scan_ns - directory_mtime_ns > RACY_INTERVAL_NS
+
+    def _connect(self) -> sqlite3.Connection:
+        # SQLite connections must not be shared with the forked processes
+        if self._connection is None or self._pid != os.getpid():
+            self._connection = sqlite3.connect(self.index_path, timeout=60, check_same_thread=False)
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.executescript(SCHEMA)
+            self._pid = os.getpid()
+            self._directory_mtime_ns = None
+        return self._connection
+
+    def _parse_metadata(self, path: str) -> IndexedModule:
+        header = yangParser.parse_header(path)
+        organization = OrganizationResolver(yangParser.parse(path), logging.getLogger(__name__),
+                                            header.namespace).resolve()
+        file_hash = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(BLOCK_SIZE), b''):
+                file_hash.update(block)
+        return IndexedModule(path, header.name, header.revision, organization, header.namespace, header.prefix,
+                             header.belongs_to, header.imports, header.includes, file_hash.hexdigest())
+
+
+_indexes: t.Dict[t.Tuple[str, str], ModuleIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_module_index(config: t.Optional[ConfigParser] = None) -> ModuleIndex:
+    """ Return index of the configured save-file-dir shared by the whole process.
+    The index is stored in Directory-Section module-index, <cache>/module_index.sqlite by default.
+    """
+    config = config or create_config()
+    save_file_dir = config.get('Directory-Section', 'save-file-dir')
+    index_path = config.get('Directory-Section', 'module-index',
+                            fallback=os.path.join(config.get('Directory-Section', 'cache'), 'module_index.sqlite'))
+    with _indexes_lock:
+        index = _indexes.get((save_file_dir, index_path))
+        if index is None:
+            index = _indexes[save_file_dir, index_path] = ModuleIndex(save_file_dir, index_path)
+    return index
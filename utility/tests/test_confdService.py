@@ -0,0 +1,125 @@
+# Copyright The IETF Trust 2022, All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+__copyright__ = 'Copyright The IETF Trust 2022, All Rights Reserved'
+__license__ = 'Apache License, Version 2.0'
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+from utility.confdService import ConfdService
+
+
+class ConfdStandIn(BaseHTTPRequestHandler):
+    """Accepts PATCH of the catalog modules unless there is a module named 'invalid' in the request."""
+    protocol_version = 'HTTP/1.1'
+    requests = []
+    lock = threading.Lock()
+
+    def do_PATCH(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        modules = body['modules']['module']
+        with self.lock:
+            self.requests.append(([module['name'] for module in modules], self.client_address))
+        if any(module['name'] == 'invalid' for module in modules):
+            content = json.dumps({'errors': {'error': [{'error-message': 'invalid module'}]}}).encode('utf-8')
+            self.send_response(400)
+            self.send_header('Content-Type', 'application/yang-data+json')
+        else:
+            content = b''
+            self.send_response(204)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestConfdServiceClass(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), ConfdStandIn)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        ConfdStandIn.requests = []
+        self.confd_service = ConfdService()
+        self.confd_service.confd_prefix = 'http://127.0.0.1:{}'.format(self.server.server_address[1])
+        self.confd_service.chunk_size = 8
+        self.confd_service.log_directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        self.confd_service.session.close()
+        shutil.rmtree(self.confd_service.log_directory)
+
+    def test_patch_modules(self):
+        modules = [self.module('module-{}'.format(i)) for i in range(20)]
+
+        errors = self.confd_service.patch_modules(modules)
+
+        self.assertFalse(errors)
+        self.assertEqual(sorted(len(names) for names, _ in ConfdStandIn.requests), [4, 8, 8])
+        self.assertEqual(sorted(name for names, _ in ConfdStandIn.requests for name in names),
+                         sorted(module['name'] for module in modules))
+        self.assertEqual(sorted(metric.size for metric in self.confd_service.patch_metrics), [4, 8, 8])
+
+    @mock.patch('utility.confdService.message_factory.MessageFactory')
+    def test_patch_modules_invalid_module_isolated(self, mock_message_factory: mock.MagicMock):
+        modules = [self.module('module-{}'.format(i)) for i in range(8)]
+        modules[5] = self.module('invalid')
+
+        errors = self.confd_service.patch_modules(modules)
+
+        self.assertTrue(errors)
+        # The chunk of 8, its halves, quarters of the invalid half and the single modules of the invalid quarter
+        self.assertEqual(len(ConfdStandIn.requests), 7)
+        accepted = [name for names, _ in ConfdStandIn.requests if 'invalid' not in names for name in names]
+        self.assertEqual(sorted(accepted), sorted(module['name'] for module in modules if module['name'] != 'invalid'))
+        mock_message_factory.return_value.send_confd_writing_failures.assert_called_once_with(
+            'modules', {'invalid@2022-01-01': {'errors': {'error': [{'error-message': 'invalid module'}]}}}
+        )
+        with open(os.path.join(self.confd_service.log_directory, 'confd-failed-patch-modules.log')) as f:
+            self.assertTrue(f.read().startswith('invalid@2022-01-01 error:'))
+
+    def test_patch_modules_connections_reused(self):
+        self.confd_service.patch_workers = 1
+        modules = [self.module('module-{}'.format(i)) for i in range(32)]
+
+        self.confd_service.patch_modules(modules)
+
+        self.assertEqual(len(ConfdStandIn.requests), 4)
+        self.assertEqual(len({client_address for _, client_address in ConfdStandIn.requests}), 1)
+
+    def test_patch_modules_empty(self):
+        self.assertFalse(self.confd_service.patch_modules([]))
+        self.assertEqual(ConfdStandIn.requests, [])
+
+    def module(self, name: str) -> dict:
+        return {'name': name, 'revision': '2022-01-01', 'organization': 'ietf'}
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+# Copyright The IETF Trust 2022, All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+__copyright__ = 'Copyright The IETF Trust 2022, All Rights Reserved'
+__license__ = 'Apache License, Version 2.0'
+
+import io
+import os
+import unittest
+
+from pyang.plugins.tree import emit_tree
+
+from utility.yangParser import ContextPool
+
+
+class TestContextPoolClass(unittest.TestCase):
+    def __init__(self, *args, **kwargs):
+        super(TestContextPoolClass, self).__init__(*args, **kwargs)
+        self.modules_path = os.path.join(os.environ['BACKEND'], 'tests/resources/all_modules')
+        self.yang_catalog = os.path.join(self.modules_path, 'yang-catalog@2018-04-03.yang')
+
+    def test_context_reset(self):
+        """ Modules parsed and options set while the context was borrowed are dropped once it is returned,
+        preloaded modules are kept.
+        """
+        pool = ContextPool(self.modules_path, size=1)
+
+        with pool.context() as ctx:
+            self.add_module(ctx, self.yang_catalog)
+            ctx.validate()
+            ctx.opts.check_update_from = 'old-schema.yang'
+            ctx.lax_quote_checks = True
+            first_ctx = ctx
+        with pool.context() as ctx:
+            modules = [name for name, _ in ctx.modules]
+
+            self.assertIs(ctx, first_ctx)
+            self.assertIn('ietf-inet-types', modules)
+            self.assertNotIn('yang-catalog', modules)
+            self.assertNotIn('ietf-yang-library', modules)
+            self.assertIsNone(ctx.opts.check_update_from)
+            self.assertFalse(ctx.lax_quote_checks)
+            self.assertEqual(ctx.errors, [])
+
+    def test_tree_same_for_reused_context(self):
+        pool = ContextPool(self.modules_path, size=1)
+
+        trees = []
+        for _ in range(2):
+            with pool.context() as ctx:
+                module = self.add_module(ctx, self.yang_catalog)
+                ctx.validate()
+                output = io.StringIO()
+                emit_tree(ctx, [module], output, None, None, None)
+                trees.append(output.getvalue())
+
+        self.assertNotEqual(trees[0], '')
+        self.assertEqual(trees[0], trees[1])
+
+    def test_context_discarded_after_exception(self):
+        pool = ContextPool(self.modules_path, size=1)
+
+        with self.assertRaises(ValueError):
+            with pool.context() as ctx:
+                first_ctx = ctx
+                raise ValueError
+        with pool.context() as ctx:
+            self.assertIsNot(ctx, first_ctx)
+
+    def test_context_recycled_after_max_uses(self):
+        pool = ContextPool(self.modules_path, size=1, max_uses=2)
+
+        contexts = []
+        for _ in range(3):
+            with pool.context() as ctx:
+                contexts.append(ctx)
+
+        self.assertIs(contexts[0], contexts[1])
+        self.assertIsNot(contexts[1], contexts[2])
+
+    def add_module(self, ctx, path: str):
+        with open(path, 'r') as f:
+            return ctx.add_module(path, f.read())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+# Copyright The IETF Trust 2022, All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+__copyright__ = 'Copyright The IETF Trust 2022, All Rights Reserved'
+__license__ = 'Apache License, Version 2.0'
+
+import glob
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from utility.module_index import RACY_INTERVAL_NS, ModuleIndex
+
+MODULE = '''module {name} {{
+  namespace "urn:ietf:params:xml:ns:yang:{name}";
+  prefix {prefix};
+  import ietf-inet-types {{ prefix inet; }}
+  include {name}-sub;
+  revision {revision};
+}}
+'''
+
+
+class TestModuleIndexClass(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.save_file_dir = os.path.join(self.temp_dir, 'all_modules')
+        os.mkdir(self.save_file_dir)
+        for revision in ('2020-01-01', '2022-01-01', '2021-01-01'):
+            self.write_module('test-module', revision)
+        self.write_module('test-module-other', '2023-01-01')
+        self.index = ModuleIndex(self.save_file_dir, os.path.join(self.temp_dir, 'cache/module_index.sqlite'))
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_latest(self):
+        expected = max(glob.glob(os.path.join(self.save_file_dir, 'test-module@*.yang')))
+
+        self.assertEqual(self.index.latest('test-module'), expected)
+        self.assertIsNone(self.index.latest('missing-module'))
+
+    def test_latest_after_directory_change(self):
+        self.index.latest('test-module')
+
+        self.write_module('test-module', '2023-01-01')
+        os.remove(os.path.join(self.save_file_dir, 'test-module-other@2023-01-01.yang'))
+
+        self.assertEqual(self.index.latest('test-module'), os.path.join(self.save_file_dir, 'test-module@2023-01-01.yang'))
+        self.assertIsNone(self.index.latest('test-module-other'))
+
+    def test_recently_modified_directory_listed_again_once(self):
+        now_ns = time.time_ns()
+        os.utime(self.save_file_dir, ns=(now_ns, now_ns))
+        with mock.patch('time.time_ns', return_value=now_ns):
+            self.index.latest('test-module')
+            with mock.patch('os.scandir', wraps=os.scandir) as mock_scandir:
+                self.index.latest('test-module')
+        mock_scandir.assert_not_called()
+
+        with mock.patch('time.time_ns', return_value=now_ns + 2 * RACY_INTERVAL_NS), \
+                mock.patch('os.scandir', wraps=os.scandir) as mock_scandir:
+            self.index.latest('test-module')
+            self.index.latest('test-module')
+
+        mock_scandir.assert_called_once()
+
+    def test_directory_not_listed_if_not_changed(self):
+        os.utime(self.save_file_dir, (0, 0))
+        self.index.latest('test-module')
+
+        with mock.patch('os.scandir') as mock_scandir:
+            self.index.latest('test-module')
+
+        mock_scandir.assert_not_called()
+
+    def test_metadata(self):
+        module = self.index.metadata('test-module')
+
+        assert module
+        self.assertEqual(module.name, 'test-module')
+        self.assertEqual(module.revision, '2022-01-01')
+        self.assertEqual(module.organization, 'ietf')
+        self.assertEqual(module.namespace, 'urn:ietf:params:xml:ns:yang:test-module')
+        self.assertEqual(module.prefix, 'tm')
+        self.assertIsNone(module.belongs_to)
+        self.assertEqual(module.imports, ['ietf-inet-types'])
+        self.assertEqual(module.includes, ['test-module-sub'])
+
+    def test_metadata_stored(self):
+        self.index.metadata('test-module', '2021-01-01')
+        index = ModuleIndex(self.save_file_dir, self.index.index_path)
+
+        with mock.patch.object(ModuleIndex, '_parse_metadata') as mock_parse:
+            module = index.metadata('test-module', '2021-01-01')
+
+        mock_parse.assert_not_called()
+        assert module
+        self.assertEqual(module.revision, '2021-01-01')
+
+    def test_metadata_file_changed(self):
+        first = self.index.metadata('test-module', '2021-01-01')
+        path = os.path.join(self.save_file_dir, 'test-module@2021-01-01.yang')
+        with open(path, 'w') as f:
+            f.write(MODULE.format(name='test-module', prefix='changed', revision='2021-01-01'))
+
+        second = self.index.metadata('test-module', '2021-01-01')
+
+        assert first and second
+        self.assertEqual(second.prefix, 'changed')
+        self.assertNotEqual(first.hash, second.hash)
+
+    def test_metadata_missing_file(self):
+        self.assertIsNone(self.index.metadata('test-module', '1970-01-01'))
+
+    def write_module(self, name: str, revision: str):
+        with open(os.path.join(self.save_file_dir, '{}@{}.yang'.format(name, revision)), 'w') as f:
+            f.write(MODULE.format(name=name, prefix='tm', revision=revision))
+
+
+if __name__ == '__main__':
+    unittest.main()
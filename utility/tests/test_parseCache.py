@@ -0,0 +1,104 @@
+# Copyright The IETF Trust 2022, All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+__copyright__ = 'Copyright The IETF Trust 2022, All Rights Reserved'
+__license__ = 'Apache License, Version 2.0'
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from utility import yangParser
+from utility.util import resolve_name_revision
+from utility.yangParser import FileCache, HeaderMetadata
+
+MODULE = '''module test-module {
+  yang-version 1.1;
+  namespace "urn:test:module";
+  prefix tm;
+  import ietf-inet-types { prefix inet; }
+  include test-submodule;
+  revision 2022-08-05;
+}
+'''
+
+
+class TestParseCacheClass(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.yang_file = os.path.join(self.temp_dir, 'test-module.yang')
+        self.write_file(self.yang_file, MODULE)
+        yangParser._parsed_files.clear()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_parse_file_once(self):
+        with mock.patch('utility.yangParser._parse_file', wraps=yangParser._parse_file) as mock_parse_file:
+            first = yangParser.parse(self.yang_file)
+            second = yangParser.parse(self.yang_file)
+
+        self.assertIs(first, second)
+        mock_parse_file.assert_called_once()
+
+    def test_parse_changed_file(self):
+        first = yangParser.parse(self.yang_file)
+        self.write_file(self.yang_file, MODULE.replace('revision 2022-08-05;', 'revision 2022-09-01;'))
+
+        second = yangParser.parse(self.yang_file)
+
+        self.assertIsNot(first, second)
+        self.assertEqual(second.search('revision')[0].arg, '2022-09-01')
+
+    def test_parse_header(self):
+        header = yangParser.parse_header(self.yang_file)
+
+        self.assertEqual(header, HeaderMetadata(
+            name='test-module', revision='2022-08-05', namespace='urn:test:module', prefix='tm',
+            belongs_to=None, imports=['ietf-inet-types'], includes=['test-submodule']
+        ))
+
+    def test_file_cache_least_recently_used_evicted(self):
+        cache = FileCache(2)
+        paths = []
+        for i in range(3):
+            path = os.path.join(self.temp_dir, 'file-{}.txt'.format(i))
+            self.write_file(path, str(i))
+            paths.append(path)
+        compute = mock.MagicMock(side_effect=lambda path: path)
+
+        cache.get(paths[0], compute)
+        cache.get(paths[1], compute)
+        cache.get(paths[0], compute)
+        cache.get(paths[2], compute)
+        cache.get(paths[0], compute)
+        cache.get(paths[1], compute)
+
+        self.assertEqual([call.args[0] for call in compute.call_args_list], [paths[0], paths[1], paths[2], paths[1]])
+
+    def test_resolve_name_revision(self):
+        self.assertEqual(resolve_name_revision(self.yang_file), ('test-module', '2022-08-05'))
+
+    def write_file(self, path: str, content: str):
+        with open(path, 'w') as f:
+            f.write(content)
+        # Make sure the modification is noticed even on file systems with coarse timestamps
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000))
+
+
+if __name__ == '__main__':
+    unittest.main()
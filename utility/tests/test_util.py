@@ -19,6 +19,7 @@ __email__ = 'slavomir.mazur@pantheon.tech'
 
 import json
 import os
+import sqlite3
 import time
 import unittest
 from unittest import mock
@@ -194,6 +195,26 @@ class TestUtilClass(unittest.TestCase):
         with self.assertRaises(Exception):
             util.context_check_update_from(old_schema, new_schema, yc_gc.yang_models, yc_gc.save_file_dir)
 
+    def test_get_yang_metadata(self):
+        module = util.get_yang_metadata('ietf-inet-types')
+
+        assert module
+        self.assertEqual(module.name, 'ietf-inet-types')
+        self.assertEqual(module.namespace, 'urn:ietf:params:xml:ns:yang:ietf-inet-types')
+        self.assertEqual(module.path, util.get_yang('ietf-inet-types'))
+
+    @mock.patch('utility.util.get_module_index')
+    def test_get_yang_metadata_index_not_available(self, mock_get_module_index: mock.MagicMock):
+        mock_get_module_index.return_value.metadata.side_effect = sqlite3.Error()
+        mock_get_module_index.return_value.latest.side_effect = sqlite3.Error()
+
+        module = util.get_yang_metadata('ietf-inet-types')
+
+        assert module
+        self.assertEqual(module.name, 'ietf-inet-types')
+        self.assertEqual(module.namespace, 'urn:ietf:params:xml:ns:yang:ietf-inet-types')
+        self.assertIsNone(util.get_yang_metadata('non-existing-module'))
+
     ##########################
     ### HELPER DEFINITIONS ###
     ##########################
@@ -25,6 +25,7 @@ import logging
 import optparse
 import os
 import re
+import sqlite3
 import stat
 import time
 import typing as t
@@ -36,19 +37,22 @@ import requests
 from Crypto.Hash import HMAC, SHA
 from elasticsearchIndexing.es_manager import ESManager
 from elasticsearchIndexing.models.es_indices import ESIndices
-from pyang import plugin
+from pyang import error, plugin
 from pyang.plugins.check_update import check_update
 from redisConnections.redisConnection import RedisConnection
 
 from utility import message_factory
 from utility.create_config import create_config
+from utility.module_index import IndexedModule, get_module_index
 from utility.staticVariables import JobLogStatuses, backup_date_format, json_headers
-from utility.yangParser import create_context
+from utility.yangParser import FileCache, HeaderMetadata, OptsContext, ParseException, create_context, parse_header
 
 single_line_re = re.compile(r'//.*')
 multi_line_re = re.compile(r'/\*.*?\*/', flags=re.MULTILINE)
 name_re = re.compile(r'(sub)?module[\s\n\r]+"?([\w_\-\.]+)')
 revision_re = re.compile(r'revision[\s\n\r]+"?(\d{4}-\d{2}-\d{2})')
+# Names and revisions of the yang files found by regular expressions
+_names_revisions = FileCache(10000)
 
 
 def strip_comments(text: str):
@@ -67,11 +71,42 @@ def parse_revision(text: str):
     return match.groups()[0] if match else '1970-01-01'
 
 
-def resolve_revision(filename: str):
+def resolve_name_revision(filename: str) -> t.Tuple[str, str]:
+    """ Return name and revision of the yang file found by parse_name() and parse_revision().
+    Results are cached while the file is not changed.
+    """
+    return _names_revisions.get(filename, _resolve_name_revision)
+
+
+def _resolve_name_revision(filename: str) -> t.Tuple[str, str]:
     with open(filename) as f:
-        text = f.read()
-        text = strip_comments(text)
-        return parse_revision(text)
+        text = strip_comments(f.read())
+    return parse_name(text), parse_revision(text)
+
+
+def resolve_revision(filename: str):
+    return resolve_name_revision(filename)[1]
+
+
+def get_yang_metadata(name: str) -> t.Optional[t.Union[IndexedModule, HeaderMetadata]]:
+    """ Return header metadata of the latest revision of the module stored in the save-file-dir, as kept
+    by the module index. If the index is not available, the header of the file is parsed instead.
+    None is returned if there is no such file or it can not be parsed.
+
+    Argument:
+        :param name         (str) name of the yang module
+    """
+    try:
+        return get_module_index().metadata(name)
+    except sqlite3.Error:
+        logging.getLogger(__name__).exception('Module index is not available, parsing the header of {}'.format(name))
+    path = get_yang(name)
+    if path is None:
+        return None
+    try:
+        return parse_header(path)
+    except ParseException:
+        return None
 
 
 def find_files(directory: str, pattern: str):
@@ -104,6 +139,10 @@ def get_yang(name: str, revision: t.Optional[str] = None) -> t.Optional[str]:
 
     if revision:
         return os.path.join(save_file_dir, '{}@{}.yang'.format(name, revision))
+    try:
+        return get_module_index(config).latest(name)
+    except sqlite3.Error:
+        logging.getLogger(__name__).exception('Module index is not available, searching the save-file-dir')
     files = glob.glob(os.path.join(save_file_dir,'{}@*.yang'.format(name)))
     if not files:
         return None
@@ -195,6 +234,22 @@ def send_for_es_indexing(body_to_send: dict, LOGGER: logging.Logger, paths: dict
     os.unlink(paths['lock_path'])
 
 
+def update_modules_metadata_in_es(redis_connection: RedisConnection, module_keys: t.Iterable[str]):
+    """ Copy module-level fields of the modules, as stored in Redis, to their documents in index: yindex.
+
+    Arguments:
+        :param redis_connection     (RedisConnection) connection to the Redis with the modules
+        :param module_keys          (Iterable[str]) name@revision/organization keys of the modules
+    """
+    es_modules = []
+    for module in redis_connection.get_modules(sorted(set(module_keys))):
+        if not module:
+            continue
+        es_modules.append({**module, 'revision': validate_revision(module['revision'])})
+    if es_modules:
+        ESManager().update_module_metadata(ESIndices.YINDEX, es_modules)
+
+
 def prepare_for_es_removal(yc_api_prefix: str, modules_to_delete: list, save_file_dir: str, LOGGER: logging.Logger):
     """Makes an API request to identify dependencies of the modules to be deleted.
     Updates metadata of dependencies in Redis no longer list the modules to be
@@ -208,6 +263,7 @@ def prepare_for_es_removal(yc_api_prefix: str, modules_to_delete: list, save_fil
         :param LOOGER               (Logger) formated logger with the specified name
     """
     redisConnection = RedisConnection()
+    updated_modules = set()
     for mod_to_delete in modules_to_delete:
         name, revision_organization = mod_to_delete.split('@')
         revision = revision_organization.split('/')[0]
@@ -220,9 +276,14 @@ def prepare_for_es_removal(yc_api_prefix: str, modules_to_delete: list, save_fil
             modules = data['yang-catalog:modules']['module']
             for mod in modules:
                 redis_key = '{}@{}/{}'.format(mod['name'], mod['revision'], mod['organization'])
-                redisConnection.delete_dependent(redis_key, name)
+                if redisConnection.delete_dependent(redis_key, name):
+                    updated_modules.add(redis_key)
         if os.path.exists(path_to_delete_local):
             os.remove(path_to_delete_local)
+    try:
+        update_modules_metadata_in_es(redisConnection, updated_modules)
+    except Exception:
+        LOGGER.exception('Failed to update dependents of the modules in Elasticsearch')
 
     post_body = {}
     if modules_to_delete:
@@ -359,7 +420,8 @@ def fetch_module_by_schema(schema: t.Optional[str], dst_path: str) -> bool:
     return file_exist
 
 
-def context_check_update_from(old_schema: str, new_schema: str, yang_models: str, save_file_dir: str):
+def context_check_update_from(old_schema: str, new_schema: str, yang_models: str, save_file_dir: str,
+                              ctx: t.Optional[OptsContext] = None):
     """ Perform pyang --check-update-from validation using context.
 
     Argumets:
@@ -367,17 +429,20 @@ def context_check_update_from(old_schema: str, new_schema: str, yang_models: str
         :param new_schema       (str) full path to the yang file with newer revision
         :param yang_models      (str) path to the directory where YangModels/yang repo is cloned
         :param save_file_dir    (str) path to the directory where all the yang files will be saved
+        :param ctx              (OptsContext) Optional - already set up context, e.g. borrowed from ContextPool,
+            new context is created if not provided
     """
-    plugin.plugins = []
-    plugin.init([])
-    ctx = create_context(
-        '{}:{}'.format(os.path.abspath(yang_models), save_file_dir))
-    ctx.opts.lint_namespace_prefixes = []
-    ctx.opts.lint_modulename_prefixes = []
-    optParser = optparse.OptionParser('', add_help_option=False)
-    for plug in plugin.plugins:
-        plug.setup_ctx(ctx)
-        plug.add_opts(optParser)
+    if ctx is None:
+        plugin.plugins = []
+        plugin.init([])
+        ctx = create_context(
+            '{}:{}'.format(os.path.abspath(yang_models), save_file_dir))
+        ctx.opts.lint_namespace_prefixes = []
+        ctx.opts.lint_modulename_prefixes = []
+        optParser = optparse.OptionParser('', add_help_option=False)
+        for plug in plugin.plugins:
+            plug.setup_ctx(ctx)
+            plug.add_opts(optParser)
     with open(new_schema, 'r', errors='ignore') as reader:
         new_schema_ctx = ctx.add_module(new_schema, reader.read())
     ctx.opts.check_update_from = old_schema
@@ -401,6 +466,21 @@ def context_check_update_from(old_schema: str, new_schema: str, yang_models: str
     return ctx, new_schema_ctx
 
 
+def check_update_from_output(ctx: OptsContext) -> str:
+    """ Create preformatted HTML from the errors found by the pyang --check-update-from validation.
+
+    Argumets:
+        :param ctx      (OptsContext) context used by context_check_update_from()
+        :return         (str) preformatted HTML with one error per line
+    """
+    errors = []
+    for ctx_err in ctx.errors:
+        ref = '{}:{}:'.format(ctx_err[0].ref, ctx_err[0].line)
+        err_message = error.err_to_str(ctx_err[1], ctx_err[2])
+        errors.append('{} {}\n'.format(ref, err_message))
+    return '<html><body><pre>{}</pre></body></html>'.format(''.join(errors))
+
+
 def get_list_of_backups(directory: str) -> t.List[str]:
     """Get a sorted list of backup file or directory names in a directory.
     Backups are identified by matching backup date format.
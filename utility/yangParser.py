@@ -21,11 +21,17 @@ __license__ = 'Apache License, Version 2.0'
 __email__ = 'miroslav.kovac@pantheon.tech'
 
 import json
+import os
+import threading
+import time
 import typing as t
+from collections import OrderedDict
+from contextlib import contextmanager
 from os.path import isfile
 
+from pyang import plugin
 from pyang.context import Context
-from pyang.error import error_codes
+from pyang.error import Position, error_codes
 from pyang.repository import FileRepository
 from pyang.statements import Statement
 from pyang.yang_parser import YangParser
@@ -63,6 +69,13 @@ _COPY_OPTIONS = [
 ]
 """copy options to pyang context options"""
 
+PRELOADED_MODULES = ('ietf-yang-types', 'ietf-inet-types')
+"""modules imported by most of the modules, parsed and validated once for each pooled context"""
+DEFAULT_POOL_SIZE = 4
+DEFAULT_MAX_CONTEXT_USES = 100
+DEFAULT_MAX_CONTEXT_AGE = 600
+DEFAULT_PARSE_CACHE_SIZE = 256
+
 
 class objectify(object):  # pylint: disable=invalid-name
     """Utility for providing object access syntax (.attr) to dicts"""
@@ -170,6 +183,108 @@ def create_context(path: str = '.') -> OptsContext:
     return ctx
 
 
+class _PooledContext:
+    """Pyang context together with the state it is reset to after each use."""
+
+    def __init__(self, path: str, preloaded_modules: t.Iterable[str]):
+        _init_plugins()
+        ctx = create_context(path)
+        ctx.opts.lint_namespace_prefixes = []
+        ctx.opts.lint_modulename_prefixes = []
+        for plug in plugin.plugins:
+            plug.setup_ctx(ctx)
+        for module_name in preloaded_modules:
+            ctx.search_module(Position(module_name), module_name)
+        ctx.validate()
+        ctx.errors = []
+        self.ctx = ctx
+        self.uses = 0
+        self.created = time.monotonic()
+        self._opts = dict(vars(ctx.opts))
+        self._state = {
+            attr: value.copy() if isinstance(value, (dict, list)) else value for attr, value in vars(ctx).items()
+        }
+        self._revs = {name: list(revs) for name, revs in ctx.revs.items()}
+
+    def reset(self):
+        """Drop all the modules parsed since the context was created and restore its options.
+        Repository scan and preloaded modules are kept.
+        """
+        ctx = self.ctx
+        for attr in set(vars(ctx)) - set(self._state):
+            delattr(ctx, attr)
+        for attr, value in self._state.items():
+            if isinstance(value, (dict, list)):
+                value = value.copy()
+            setattr(ctx, attr, value)
+        ctx.revs = {name: list(revs) for name, revs in self._revs.items()}
+        ctx.opts = objectify(self._opts)
+
+
+class ContextPool:
+    """Bounded pool of pyang contexts for the same module search path.
+
+    Creating a context scans all the directories on the path and each new context
+    parses all the imported modules again. Pooled contexts keep the repository scan
+    and the preloaded modules, everything else is reset when the context is returned.
+    Contexts are recycled after 'max_uses' uses or 'max_age' seconds,
+    so the modules added to the directories later are found as well.
+    """
+
+    def __init__(self, path: str, size: int = DEFAULT_POOL_SIZE,
+                 preloaded_modules: t.Iterable[str] = PRELOADED_MODULES,
+                 max_uses: int = DEFAULT_MAX_CONTEXT_USES, max_age: float = DEFAULT_MAX_CONTEXT_AGE):
+        self.path = path
+        self.preloaded_modules = tuple(preloaded_modules)
+        self.max_uses = max_uses
+        self.max_age = max_age
+        self._semaphore = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._idle: t.List[_PooledContext] = []
+
+    @contextmanager
+    def context(self) -> t.Iterator[OptsContext]:
+        """Borrow a context from the pool, waiting if all of them are in use.
+        Context which raised an exception is not returned to the pool, as its state is unknown.
+        """
+        with self._semaphore:
+            with self._lock:
+                pooled = self._idle.pop() if self._idle else None
+            if pooled is None:
+                pooled = _PooledContext(self.path, self.preloaded_modules)
+            yield pooled.ctx
+            pooled.uses += 1
+            if pooled.uses < self.max_uses and time.monotonic() - pooled.created < self.max_age:
+                pooled.reset()
+                with self._lock:
+                    self._idle.append(pooled)
+
+
+_context_pools: t.Dict[str, ContextPool] = {}
+_context_pools_lock = threading.Lock()
+_plugins_lock = threading.Lock()
+
+
+def _init_plugins():
+    with _plugins_lock:
+        if not plugin.plugins:
+            plugin.init([])
+
+
+def get_context_pool(path: str) -> ContextPool:
+    """Return pool of pyang contexts for the module search 'path' shared within the process.
+
+    Arguments:
+        :param path     (str) location of YANG modules, multiple locations joined by ':'
+        :return         (ContextPool) pool of the contexts
+    """
+    with _context_pools_lock:
+        pool = _context_pools.get(path)
+        if pool is None:
+            pool = _context_pools[path] = ContextPool(path)
+        return pool
+
+
 class ParseException(Exception):
 
     def __init__(self, path: t.Optional[str]):
@@ -189,8 +304,63 @@ class ParseException(Exception):
                 json.dump(modules, f)
 
 
+class FileCache:
+    """
+    Bounded LRU cache of values computed from files. Values are kept under the path, modification time
+    and size of the file, so a changed file is never served from the cache. Exceptions raised
+    while computing the value are not cached.
+    """
+
+    def __init__(self, max_entries: int):
+        """
+        Arguments:
+            :param max_entries  (int) maximum number of the cached values
+        """
+        self.max_entries = max_entries
+        self._entries: t.OrderedDict[t.Tuple[str, int, int], t.Any] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path: str, compute: t.Callable[[str], t.Any]) -> t.Any:
+        """ Return value computed by 'compute' from the file on 'path', compute it only on a miss. """
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return compute(path)
+        key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        value = compute(path)
+        with self._lock:
+            self._entries[key] = value
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_parsed_files = FileCache(DEFAULT_PARSE_CACHE_SIZE)
+
+
+class HeaderMetadata(t.NamedTuple):
+    """Metadata from the header of a yang (sub)module."""
+    name: str
+    revision: t.Optional[str]
+    namespace: t.Optional[str]
+    prefix: t.Optional[str]
+    belongs_to: t.Optional[str]
+    imports: t.List[str]
+    includes: t.List[str]
+
+
 def parse(text: str) -> Statement:
     """Parse a YANG statement into an Abstract Syntax subtree.
+    Files are parsed only once while they are not changed, the same subtree is returned for the following calls,
+    so the returned subtree must not be modified.
 
     Arguments:
         text (str): file name for a YANG module or text
@@ -209,16 +379,43 @@ def parse(text: str) -> Statement:
     Note II:
         pyang.Context removed as optional parameter as it was not used anymore.
     """
-    parser = YangParser()  # Similar names, but, this one is from PYANG library
+    if isfile(text):
+        return _parsed_files.get(text, _parse_file)
+    return _parse_text(text)
 
-    filename = 'parser-input'
 
-    ctx_ = create_context()
+def parse_header(path: str) -> HeaderMetadata:
+    """Return metadata from the header of the yang file on 'path', parsed by the parse() function.
 
-    if isfile(text):
-        filename = text
-        with open(filename) as f:
-            text = f.read()
+    Raises:
+        ParseException: if the file can not be parsed
+    """
+    parsed_yang = parse(path)
+
+    def first_arg(keyword: str) -> t.Optional[str]:
+        results = parsed_yang.search(keyword)
+        return results[0].arg if results else None
+
+    return HeaderMetadata(
+        name=parsed_yang.arg,
+        revision=first_arg('revision'),
+        namespace=first_arg('namespace'),
+        prefix=first_arg('prefix'),
+        belongs_to=first_arg('belongs-to'),
+        imports=[statement.arg for statement in parsed_yang.search('import')],
+        includes=[statement.arg for statement in parsed_yang.search('include')],
+    )
+
+
+def _parse_file(filename: str) -> Statement:
+    with open(filename) as f:
+        return _parse_text(f.read(), filename)
+
+
+def _parse_text(text: str, filename: str = 'parser-input') -> Statement:
+    parser = YangParser()  # Similar names, but, this one is from PYANG library
+
+    ctx_ = create_context()
 
     # ensure reported errors are just from parsing
     # old_errors = ctx_.errors